@@ -0,0 +1,105 @@
+"""
+Benchmark the feed list read path.
+
+Compares the ORM path (hydrate `Feed` instances, validate each through
+`FeedResponse`, serialize) with the lean path used by `GET /api/feeds`
+(select column tuples, serialize directly) on an in-memory SQLite catalog.
+
+Run with:
+
+    python benchmarks/feed_list.py [--feeds 100000] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from showstock.api import FeedResponse
+from showstock.bulk import insert_feeds
+from showstock.db import Base
+from showstock.models import Brand, Feed
+from showstock.models.feed import FeedType
+from showstock.serialize import serializer_for
+
+FEED_LIST_ADAPTER = TypeAdapter(List[FeedResponse])
+FEED_SERIALIZER = serializer_for(FeedResponse)
+
+
+async def orm_path(db: AsyncSession) -> bytes:
+    """Serialize every feed the way the original endpoint did."""
+    result = await db.execute(select(Feed).order_by(Feed.id))
+    feeds = [FeedResponse.model_validate(feed) for feed in result.scalars().all()]
+    return FEED_LIST_ADAPTER.dump_json(feeds)
+
+
+async def lean_path(db: AsyncSession) -> bytes:
+    """Serialize every feed from column tuples."""
+    result = await db.execute(select(*FEED_SERIALIZER.columns(Feed)).order_by(Feed.id))
+    return FEED_SERIALIZER.dump(result.all())
+
+
+async def measure(
+    factory: async_sessionmaker,
+    path: Callable[[AsyncSession], Awaitable[bytes]],
+    rounds: int,
+) -> float:
+    """Return the best time in seconds over several rounds."""
+    best = float("inf")
+    for _ in range(rounds):
+        async with factory() as db:
+            started = time.perf_counter()
+            await path(db)
+            best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def main(feed_count: int, rounds: int) -> None:
+    """Load a synthetic catalog and time both read paths."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with factory() as db:
+        brand = Brand(name="Benchmark Brand")
+        db.add(brand)
+        await db.flush()
+        await insert_feeds(
+            db,
+            [
+                {
+                    "brand_id": brand.id,
+                    "name": f"Feed {i}",
+                    "density": 1.0 + i % 7 / 10,
+                    "feed_type": FeedType.PELLET if i % 2 else FeedType.PULVERIZED,
+                    "weight": 50.0,
+                    "cost": 10.0 + i % 100,
+                }
+                for i in range(feed_count)
+            ],
+        )
+        await db.commit()
+
+    async with factory() as db:
+        assert await orm_path(db) == await lean_path(db)
+
+    for label, path in [("orm", orm_path), ("lean", lean_path)]:
+        elapsed = await measure(factory, path, rounds)
+        print(
+            f"{label:>5}: {elapsed:.3f}s for {feed_count} feeds "
+            f"({feed_count / elapsed:,.0f} rows/s)"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--feeds", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.feeds, args.rounds))
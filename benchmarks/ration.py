@@ -0,0 +1,63 @@
+"""
+Benchmark least-cost ration formulation.
+
+Solves randomly generated problems of the size the ration endpoint is meant
+for: a catalog of 2,000 feeds with minimums on every profiled nutrient plus
+maximums on a few, 15 nutrient constraints in all, under an intake limit.
+
+Run with:
+
+    python benchmarks/ration.py [--feeds 2000] [--rounds 20]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from showstock.models.nutrition import NUTRIENTS
+from showstock.ration import solve_ration
+
+# Nutrients capped as well as required, for 15 constraints with the minimums
+CAPPED_NUTRIENTS = ["crude_fat", "crude_fiber", "copper"]
+
+
+def make_problem(feed_count: int, rng: np.random.Generator) -> tuple:
+    """Build a feasible random problem."""
+    costs = rng.uniform(0.2, 2.0, feed_count)
+    contents = rng.uniform(0.0, 1.0, (feed_count, len(NUTRIENTS)))
+    # Requirements a typical feed meets at 60% of the intake limit
+    max_intake = 12.0
+    typical = contents.mean(axis=0) * max_intake
+    minimums = typical * 0.6
+    maximums = np.full(len(NUTRIENTS), np.inf)
+    for nutrient in CAPPED_NUTRIENTS:
+        maximums[NUTRIENTS.index(nutrient)] = typical[NUTRIENTS.index(nutrient)]
+    return costs, contents, minimums, maximums, max_intake
+
+
+def main(feed_count: int, rounds: int) -> None:
+    """Time solving several random problems."""
+    rng = np.random.default_rng(0)
+    constraints = len(NUTRIENTS) + len(CAPPED_NUTRIENTS)
+    timings = []
+    for _ in range(rounds):
+        problem = make_problem(feed_count, rng)
+        started = time.perf_counter()
+        amounts = solve_ration(*problem)
+        timings.append(time.perf_counter() - started)
+        assert amounts.sum() <= problem[-1] + 1e-6
+
+    print(
+        f"{feed_count} feeds, {constraints} constraints: "
+        f"median {np.median(timings) * 1000:.1f} ms, "
+        f"max {max(timings) * 1000:.1f} ms over {rounds} problems"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--feeds", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    main(args.feeds, args.rounds)
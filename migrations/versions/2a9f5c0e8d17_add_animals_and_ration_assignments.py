@@ -0,0 +1,80 @@
+"""Add animals and ration assignments
+
+Revision ID: 2a9f5c0e8d17
+Revises: b6e13f4a7c20
+Create Date: 2026-10-17 17:05:52.118730
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "2a9f5c0e8d17"
+down_revision: Union[str, None] = "b6e13f4a7c20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The users table predates migrations, so it may not exist yet
+    if not sa.inspect(op.get_bind()).has_table("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("given_name", sa.String(), nullable=False),
+            sa.Column("family_name", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.create_table(
+        "animals",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column(
+            "species",
+            sa.Enum("CATTLE", "SHEEP", "GOAT", "SWINE", name="species"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_animals_owner_id", "animals", ["owner_id"])
+    op.create_table(
+        "ration_assignments",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("animal_id", sa.Integer(), nullable=False),
+        sa.Column("feed_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(["animal_id"], ["animals.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["feed_id"], ["feeds.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_ration_assignments_animal_id", "ration_assignments", ["animal_id"]
+    )
+    op.create_index("ix_ration_assignments_feed_id", "ration_assignments", ["feed_id"])
+    op.create_index(
+        "ix_ration_assignments_start_date_end_date",
+        "ration_assignments",
+        ["start_date", "end_date"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_ration_assignments_start_date_end_date", table_name="ration_assignments"
+    )
+    op.drop_index("ix_ration_assignments_feed_id", table_name="ration_assignments")
+    op.drop_index("ix_ration_assignments_animal_id", table_name="ration_assignments")
+    op.drop_table("ration_assignments")
+    op.drop_index("ix_animals_owner_id", table_name="animals")
+    op.drop_table("animals")
+    sa.Enum(name="species").drop(op.get_bind(), checkfirst=True)
+    # The users table is left in place, since it may predate this revision
@@ -0,0 +1,30 @@
+"""Add feed pagination indexes
+
+Revision ID: 3f9a2c71d4b8
+Revises: e06e8b695a7b
+Create Date: 2026-10-17 09:12:40.517392
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9a2c71d4b8"
+down_revision: Union[str, None] = "e06e8b695a7b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Composite indexes backing keyset pagination of filtered feed listings
+    op.create_index("ix_feeds_brand_id_id", "feeds", ["brand_id", "id"])
+    op.create_index("ix_feeds_feed_type_id", "feeds", ["feed_type", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_feeds_feed_type_id", table_name="feeds")
+    op.drop_index("ix_feeds_brand_id_id", table_name="feeds")
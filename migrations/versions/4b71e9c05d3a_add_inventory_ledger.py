@@ -0,0 +1,73 @@
+"""Add inventory ledger
+
+Revision ID: 4b71e9c05d3a
+Revises: c3d8f61a2e95
+Create Date: 2026-10-17 19:24:11.640372
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4b71e9c05d3a"
+down_revision: Union[str, None] = "c3d8f61a2e95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "inventory_locations",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("owner_id", "name"),
+    )
+    op.create_table(
+        "inventory_events",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("location_id", sa.Integer(), nullable=False),
+        sa.Column("feed_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "kind",
+            sa.Enum("RECEIPT", "USAGE", "ADJUSTMENT", name="inventoryeventkind"),
+            nullable=False,
+        ),
+        sa.Column("quantity", sa.Float(), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("balance", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["location_id"], ["inventory_locations.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["feed_id"], ["feeds.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_inventory_events_location_id", "inventory_events", ["location_id"]
+    )
+    op.create_table(
+        "inventory_balances",
+        sa.Column("location_id", sa.Integer(), nullable=False),
+        sa.Column("feed_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["location_id"], ["inventory_locations.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["feed_id"], ["feeds.id"]),
+        sa.PrimaryKeyConstraint("location_id", "feed_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("inventory_balances")
+    op.drop_index("ix_inventory_events_location_id", table_name="inventory_events")
+    op.drop_table("inventory_events")
+    op.drop_table("inventory_locations")
+    sa.Enum(name="inventoryeventkind").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,43 @@
+"""Add name trigram indexes
+
+Revision ID: 5d27e8b1c9a4
+Revises: 8c41e7a09b25
+Create Date: 2026-10-17 14:22:41.508113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d27e8b1c9a4"
+down_revision: Union[str, None] = "8c41e7a09b25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Trigram GIN indexes backing name search and autocomplete
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_feeds_name_trgm",
+        "feeds",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_brands_name_trgm",
+        "brands",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_brands_name_trgm", table_name="brands")
+    op.drop_index("ix_feeds_name_trgm", table_name="feeds")
@@ -0,0 +1,36 @@
+"""Add catalog row versions
+
+Revision ID: 6f0c3a85d2e7
+Revises: 9d52a7c4e1b8
+Create Date: 2026-10-17 22:11:05.482913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "6f0c3a85d2e7"
+down_revision: Union[str, None] = "9d52a7c4e1b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "brands",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.add_column(
+        "feeds",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("feeds", "version")
+    op.drop_column("brands", "version")
@@ -0,0 +1,32 @@
+"""Add animal weigh-in targets
+
+Revision ID: 7e4b0d92a6f1
+Revises: 2a9f5c0e8d17
+Create Date: 2026-10-17 18:12:40.503117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7e4b0d92a6f1"
+down_revision: Union[str, None] = "2a9f5c0e8d17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("animals", sa.Column("weight", sa.Float(), nullable=True))
+    op.add_column("animals", sa.Column("target_weight", sa.Float(), nullable=True))
+    op.add_column("animals", sa.Column("show_date", sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("animals", "show_date")
+    op.drop_column("animals", "target_weight")
+    op.drop_column("animals", "weight")
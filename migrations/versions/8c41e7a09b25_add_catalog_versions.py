@@ -0,0 +1,33 @@
+"""Add catalog versions
+
+Revision ID: 8c41e7a09b25
+Revises: 3f9a2c71d4b8
+Create Date: 2026-10-17 11:03:17.284906
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "8c41e7a09b25"
+down_revision: Union[str, None] = "3f9a2c71d4b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "catalog_versions",
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("table_name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("catalog_versions")
@@ -0,0 +1,56 @@
+"""Add catalog changefeed
+
+Revision ID: 9d52a7c4e1b8
+Revises: 4b71e9c05d3a
+Create Date: 2026-10-17 21:02:47.318205
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9d52a7c4e1b8"
+down_revision: Union[str, None] = "4b71e9c05d3a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("brands", sa.Column("change_seq", sa.BigInteger(), nullable=True))
+    op.add_column("feeds", sa.Column("change_seq", sa.BigInteger(), nullable=True))
+    # Existing rows enter the changefeed once, brands before feeds, and the
+    # counter starts after the last number handed out
+    op.execute("UPDATE brands SET change_seq = id")
+    op.execute(
+        "UPDATE feeds SET change_seq = id + "
+        "(SELECT COALESCE(MAX(id), 0) FROM brands)"
+    )
+    op.execute(
+        "INSERT INTO catalog_versions (table_name, version) SELECT "
+        "'catalog_changes', "
+        "(SELECT COALESCE(MAX(id), 0) FROM brands) + "
+        "(SELECT COALESCE(MAX(id), 0) FROM feeds)"
+    )
+    op.create_index("ix_brands_change_seq", "brands", ["change_seq"])
+    op.create_index("ix_feeds_change_seq", "feeds", ["change_seq"])
+    op.create_table(
+        "catalog_tombstones",
+        sa.Column("change_seq", sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("change_seq"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("catalog_tombstones")
+    op.drop_index("ix_feeds_change_seq", table_name="feeds")
+    op.drop_index("ix_brands_change_seq", table_name="brands")
+    op.execute("DELETE FROM catalog_versions WHERE table_name = 'catalog_changes'")
+    op.drop_column("feeds", "change_seq")
+    op.drop_column("brands", "change_seq")
@@ -0,0 +1,45 @@
+"""Add nutrient profiles
+
+Revision ID: b6e13f4a7c20
+Revises: 5d27e8b1c9a4
+Create Date: 2026-10-17 15:48:09.731245
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e13f4a7c20"
+down_revision: Union[str, None] = "5d27e8b1c9a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "nutrient_profiles",
+        sa.Column("feed_id", sa.Integer(), nullable=False),
+        sa.Column("crude_protein", sa.Float(), nullable=True),
+        sa.Column("crude_fat", sa.Float(), nullable=True),
+        sa.Column("crude_fiber", sa.Float(), nullable=True),
+        sa.Column("digestible_energy", sa.Float(), nullable=True),
+        sa.Column("calcium", sa.Float(), nullable=True),
+        sa.Column("phosphorus", sa.Float(), nullable=True),
+        sa.Column("sodium", sa.Float(), nullable=True),
+        sa.Column("potassium", sa.Float(), nullable=True),
+        sa.Column("magnesium", sa.Float(), nullable=True),
+        sa.Column("zinc", sa.Float(), nullable=True),
+        sa.Column("copper", sa.Float(), nullable=True),
+        sa.Column("selenium", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["feed_id"], ["feeds.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("feed_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("nutrient_profiles")
@@ -0,0 +1,57 @@
+"""Add feed price history
+
+Revision ID: c3d8f61a2e95
+Revises: 7e4b0d92a6f1
+Create Date: 2026-10-17 18:47:03.215884
+
+"""
+
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d8f61a2e95"
+down_revision: Union[str, None] = "7e4b0d92a6f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created up front; the application adds later ones
+MONTHS = 4
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "feed_prices",
+        sa.Column("feed_id", sa.Integer(), nullable=False),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("cost", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["feed_id"], ["feeds.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("feed_id", "recorded_at", postgresql_include=["cost"]),
+        postgresql_partition_by="RANGE (recorded_at)",
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE TABLE feed_prices_default PARTITION OF feed_prices DEFAULT")
+        month = datetime.datetime.now(datetime.timezone.utc).date().replace(day=1)
+        for _ in range(MONTHS):
+            following = (month + datetime.timedelta(days=32)).replace(day=1)
+            op.execute(
+                f"CREATE TABLE feed_prices_{month:%Y_%m} PARTITION OF feed_prices "
+                f"FOR VALUES FROM ('{month} 00:00+00') TO ('{following} 00:00+00')"
+            )
+            month = following
+
+    # Seed the history with the current costs
+    op.execute(
+        "INSERT INTO feed_prices (feed_id, recorded_at, cost) "
+        "SELECT id, CURRENT_TIMESTAMP, cost FROM feeds"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Dropping the partitioned table drops its partitions too
+    op.drop_table("feed_prices")
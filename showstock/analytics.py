@@ -0,0 +1,217 @@
+"""
+Vectorized value analytics over the feed catalog.
+
+The catalog is held per worker as NumPy column arrays, reloaded only when the
+`feeds` catalog version moves. Unit costs for every feed are derived from
+those columns in one vectorized pass when they are loaded, so ranking feeds
+by value costs a few array operations regardless of catalog size.
+
+Cost per unit weight is `cost / weight`. With density expressed as weight per
+unit volume, cost per unit volume is `cost * density / weight`. Feeds missing
+a value needed for a metric, or with a non-positive weight, have NaN for it
+and are left out of rankings.
+"""
+
+import asyncio
+import enum
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from showstock.etag import get_catalog_versions
+from showstock.models import Feed
+from showstock.models.feed import FeedType
+
+# Default and maximum number of feeds ranked per feed type
+DEFAULT_RANK_LIMIT = 10
+MAX_RANK_LIMIT = 100
+
+# Feed types in the order of their integer codes in `FeedColumns.feed_type`
+FEED_TYPES = list(FeedType)
+
+
+class ValueMetric(str, enum.Enum):
+    """Unit costs feeds can be ranked by."""
+
+    WEIGHT = "weight"
+    VOLUME = "volume"
+
+
+class FeedValue(BaseModel):
+    id: int
+    brand_id: int
+    name: str
+    cost: float
+    cost_per_weight: Optional[float] = None
+    cost_per_volume: Optional[float] = None
+
+
+class FeedTypeRanking(BaseModel):
+    feed_type: FeedType
+    feeds: List[FeedValue]
+
+
+def unit_costs(
+    cost: np.ndarray, weight: np.ndarray, density: np.ndarray
+) -> Dict[ValueMetric, np.ndarray]:
+    """
+    Compute cost per unit weight and per unit volume.
+
+    Args:
+        cost: Feed costs, NaN where missing
+        weight: Feed weights, NaN where missing
+        density: Feed densities as weight per unit volume, NaN where missing
+
+    Returns:
+        Arrays of unit costs keyed by metric, NaN where undefined
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_weight = np.where(weight > 0, cost / weight, np.nan)
+        per_volume = np.where(density > 0, per_weight * density, np.nan)
+    return {ValueMetric.WEIGHT: per_weight, ValueMetric.VOLUME: per_volume}
+
+
+class FeedColumns:
+    """The feed catalog as column arrays, one element per feed."""
+
+    def __init__(self, rows: Sequence[Sequence[object]]):
+        """
+        Build column arrays from feed rows.
+
+        Args:
+            rows: Tuples of (id, brand_id, name, feed_type, cost, weight,
+                density) in ID order, with None for missing values
+        """
+        columns = list(zip(*rows)) or [()] * 7
+        ids, brand_ids, names, feed_types, cost, weight, density = columns
+        self.id = np.array(ids, dtype=np.int64)
+        self.brand_id = np.array(brand_ids, dtype=np.int64)
+        self.name = np.array(names, dtype=object)
+        codes = {feed_type: code for code, feed_type in enumerate(FEED_TYPES)}
+        self.feed_type = np.array(
+            [codes[feed_type] for feed_type in feed_types], dtype=np.int8
+        )
+        # None becomes NaN in float arrays
+        self.cost = np.array(cost, dtype=np.float64)
+        self.weight = np.array(weight, dtype=np.float64)
+        self.density = np.array(density, dtype=np.float64)
+        self.unit_costs = unit_costs(self.cost, self.weight, self.density)
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def positions(self, feed_ids: np.ndarray) -> np.ndarray:
+        """
+        Find the array index of each feed.
+
+        Returns:
+            The index of each feed, or -1 for feeds not in the catalog
+        """
+        positions = np.searchsorted(self.id, feed_ids)
+        found = positions < len(self.id)
+        found[found] &= self.id[positions[found]] == feed_ids[found]
+        return np.where(found, positions, -1)
+
+    def feed_value(self, index: int) -> FeedValue:
+        """Describe the feed at an array index."""
+        per_weight = self.unit_costs[ValueMetric.WEIGHT][index]
+        per_volume = self.unit_costs[ValueMetric.VOLUME][index]
+        return FeedValue(
+            id=int(self.id[index]),
+            brand_id=int(self.brand_id[index]),
+            name=self.name[index],
+            cost=float(self.cost[index]),
+            cost_per_weight=None if np.isnan(per_weight) else float(per_weight),
+            cost_per_volume=None if np.isnan(per_volume) else float(per_volume),
+        )
+
+
+def rank_best_value(
+    columns: FeedColumns,
+    metric: ValueMetric = ValueMetric.WEIGHT,
+    limit: int = DEFAULT_RANK_LIMIT,
+    brand_id: Optional[int] = None,
+) -> List[FeedTypeRanking]:
+    """
+    Rank the cheapest feeds of each feed type by a unit cost.
+
+    Args:
+        columns: Feed catalog columns
+        metric: Unit cost to rank by
+        limit: Maximum number of feeds per feed type
+        brand_id: Only rank this brand's feeds
+
+    Returns:
+        One ranking per feed type, cheapest first, ties broken by feed ID
+    """
+    values = columns.unit_costs[metric]
+    eligible = ~np.isnan(values)
+    if brand_id is not None:
+        eligible &= columns.brand_id == brand_id
+
+    rankings = []
+    for code, feed_type in enumerate(FEED_TYPES):
+        candidates = np.flatnonzero(eligible & (columns.feed_type == code))
+        if len(candidates) > limit:
+            # Keep the `limit` smallest, including every feed tied with the
+            # last one, so ties are then broken by ID rather than arbitrarily
+            cutoff = np.partition(values[candidates], limit - 1)[limit - 1]
+            candidates = candidates[values[candidates] <= cutoff]
+        order = np.lexsort((columns.id[candidates], values[candidates]))
+        rankings.append(
+            FeedTypeRanking(
+                feed_type=feed_type,
+                feeds=[columns.feed_value(i) for i in candidates[order][:limit]],
+            )
+        )
+    return rankings
+
+
+class FeedCatalog:
+    """Per-worker feed columns, reloaded when the feed catalog changes."""
+
+    def __init__(self) -> None:
+        """Initialize an empty catalog that loads on first use."""
+        self.versions: Optional[Dict[str, int]] = None
+        self.columns = FeedColumns([])
+        self._lock = asyncio.Lock()
+
+    def clear(self) -> None:
+        """Drop the loaded columns so the next use reloads them."""
+        self.versions = None
+        self.columns = FeedColumns([])
+
+    async def load(self, db: AsyncSession) -> FeedColumns:
+        """
+        Return the current feed columns, reloading them if feeds changed.
+
+        Args:
+            db: Database session
+        """
+        versions = await get_catalog_versions(db, [Feed.__tablename__])
+        if self.versions == versions:
+            return self.columns
+        async with self._lock:
+            if self.versions != versions:
+                result = await db.execute(
+                    select(
+                        Feed.id,
+                        Feed.brand_id,
+                        Feed.name,
+                        Feed.feed_type,
+                        Feed.cost,
+                        Feed.weight,
+                        Feed.density,
+                    ).order_by(Feed.id)
+                )
+                self.columns = await run_in_threadpool(FeedColumns, result.all())
+                self.versions = versions
+        return self.columns
+
+
+# Feed columns for this worker
+feed_catalog = FeedCatalog()
@@ -2,15 +2,142 @@
 API routes for the Showstock application.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+import datetime
+import enum
+import io
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, exists, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Optional
-from pydantic import BaseModel
+from sqlalchemy.sql import Select
+from typing import Annotated, Any, Dict, List, Optional, Sequence, Tuple, Type
+from pydantic import BaseModel, Field, field_validator
 
+from showstock.analytics import (
+    DEFAULT_RANK_LIMIT,
+    MAX_RANK_LIMIT,
+    FeedTypeRanking,
+    ValueMetric,
+    feed_catalog,
+    rank_best_value,
+)
+from showstock.bulk import (
+    ConflictAction,
+    existing_brand_ids,
+    insert_feeds,
+    update_costs,
+    upsert_brands,
+    upsert_insert,
+)
+from showstock.cache import (
+    MISSING,
+    brand_cache,
+    brand_list_cache,
+    feed_cache,
+    invalidate_brands,
+    invalidate_feeds,
+)
+from showstock.changes import (
+    DEFAULT_CHANGES_PAGE,
+    MAX_CHANGES_PAGE,
+    read_changes,
+)
 from showstock.db import get_db
-from showstock.models import Brand, Feed
+from showstock.etag import (
+    catalog_etag,
+    catalog_versions,
+    check_version_etag,
+    checked_version,
+    if_match_versions,
+    version_etag,
+)
+from showstock.export import MEDIA_TYPES, ExportFormat, stream_feeds
+from showstock.importer import ImportReport, import_feeds, read_catalog
+from showstock.notify import publish_catalog_change
+from showstock.nutrition import nutrient_matrix
+from showstock.forecast import (
+    MAX_FORECAST_DAYS,
+    ConsumptionForecast,
+    Granularity,
+    forecast_consumption,
+)
+from showstock.growth import BarnGrowth, project_barn_growth
+from showstock.inventory import (
+    DaysOnHand,
+    FeedBalance,
+    InsufficientStock,
+    InventoryEventCreate,
+    InventoryEventResponse,
+    days_on_hand,
+    record_event,
+)
+from showstock.models import (
+    Animal,
+    Brand,
+    Feed,
+    InventoryBalance,
+    InventoryEvent,
+    InventoryLocation,
+    NutrientProfile,
+    RationAssignment,
+    User,
+)
+from showstock.models.animal import Species
 from showstock.models.feed import FeedType
+from showstock.prices import (
+    FeedPriceAsOf,
+    PriceTrendPoint,
+    TrendGroup,
+    TrendInterval,
+    price_trend,
+    prices_as_of,
+    record_prices,
+)
+from showstock.ration import (
+    InfeasibleRation,
+    RationBatch,
+    RationEvaluation,
+    RationRequest,
+    RationResponse,
+    UnknownFeeds,
+    evaluate_rations,
+    formulate_ration,
+)
+from showstock.search import (
+    DEFAULT_SEARCH_LIMIT,
+    MAX_SEARCH_LIMIT,
+    MIN_QUERY_LENGTH,
+    SearchHit,
+    SearchKind,
+    normalize,
+    search_catalog,
+)
+from showstock.serialize import serializer_for
+from showstock.substitutes import (
+    DEFAULT_SUBSTITUTES,
+    MAX_SUBSTITUTES,
+    FeedSubstitute,
+    substitute_index,
+)
+from showstock.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+)
 
 # Create API router
 router = APIRouter(prefix="/api", tags=["api"])
@@ -21,9 +148,14 @@ class BrandCreate(BaseModel):
     name: str
 
 
+class BrandUpdate(BaseModel):
+    name: str
+
+
 class BrandResponse(BaseModel):
     id: int
     name: str
+    version: int
 
     class Config:
         from_attributes = True
@@ -38,6 +170,23 @@ class FeedCreate(BaseModel):
     cost: Optional[float] = None
 
 
+class FeedUpdate(BaseModel):
+    brand_id: Optional[int] = None
+    name: Optional[str] = None
+    density: Optional[float] = None
+    feed_type: Optional[FeedType] = None
+    weight: Optional[float] = None
+    cost: Optional[float] = None
+
+    @field_validator("brand_id", "name", "feed_type")
+    @classmethod
+    def not_null(cls, value: Any) -> Any:
+        """Refuse to clear columns that every feed must have."""
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
 class FeedResponse(BaseModel):
     id: int
     brand_id: int
@@ -46,49 +195,685 @@ class FeedResponse(BaseModel):
     feed_type: FeedType
     weight: Optional[float] = None
     cost: Optional[float] = None
+    version: int
 
     class Config:
         from_attributes = True
 
 
+class NutrientProfileUpdate(BaseModel):
+    crude_protein: Optional[float] = Field(None, ge=0)
+    crude_fat: Optional[float] = Field(None, ge=0)
+    crude_fiber: Optional[float] = Field(None, ge=0)
+    digestible_energy: Optional[float] = Field(None, ge=0)
+    calcium: Optional[float] = Field(None, ge=0)
+    phosphorus: Optional[float] = Field(None, ge=0)
+    sodium: Optional[float] = Field(None, ge=0)
+    potassium: Optional[float] = Field(None, ge=0)
+    magnesium: Optional[float] = Field(None, ge=0)
+    zinc: Optional[float] = Field(None, ge=0)
+    copper: Optional[float] = Field(None, ge=0)
+    selenium: Optional[float] = Field(None, ge=0)
+
+
+class NutrientProfileResponse(NutrientProfileUpdate):
+    feed_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class FeedWithBrandResponse(FeedResponse):
+    brand: BrandResponse
+
+
+class FeedExpansion(str, enum.Enum):
+    """Related objects that can be embedded in feed responses."""
+
+    BRAND = "brand"
+
+
+class CatalogChange(BaseModel):
+    table: str
+    id: int
+    deleted: bool = False
+    brand: Optional[BrandResponse] = None
+    feed: Optional[FeedResponse] = None
+
+
+class ChangesPage(BaseModel):
+    changes: List[CatalogChange]
+    next_since: str
+    has_more: bool
+
+
+class AnimalCreate(BaseModel):
+    owner_id: int
+    name: str
+    species: Species
+    weight: Optional[float] = Field(None, gt=0)
+    target_weight: Optional[float] = Field(None, gt=0)
+    show_date: Optional[datetime.date] = None
+
+
+class AnimalResponse(BaseModel):
+    id: int
+    owner_id: int
+    name: str
+    species: Species
+    weight: Optional[float] = None
+    target_weight: Optional[float] = None
+    show_date: Optional[datetime.date] = None
+
+    class Config:
+        from_attributes = True
+
+
+class RationAssignmentCreate(BaseModel):
+    feed_id: int
+    amount: float = Field(gt=0)
+    start_date: datetime.date
+    end_date: Optional[datetime.date] = None
+
+
+class RationAssignmentResponse(RationAssignmentCreate):
+    id: int
+    animal_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class LocationCreate(BaseModel):
+    owner_id: int
+    name: str
+
+
+class LocationResponse(LocationCreate):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class BulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class FeedBulkResponse(BaseModel):
+    created: List[FeedResponse]
+    errors: List[BulkError]
+
+
+class FeedPriceUpdate(BaseModel):
+    id: int
+    cost: Optional[float] = None
+
+
+class FeedPriceUpdated(FeedPriceUpdate):
+    version: int
+
+
+class FeedPriceBulkResponse(BaseModel):
+    updated: List[FeedPriceUpdated]
+    errors: List[BulkError]
+
+
+class BatchRequest(BaseModel):
+    ids: List[int] = Field(max_length=MAX_PAGE_SIZE)
+
+
+class BrandBatchEntry(BaseModel):
+    id: int
+    brand: Optional[BrandResponse] = None
+    detail: Optional[str] = None
+
+
+class FeedBatchEntry(BaseModel):
+    id: int
+    feed: Optional[FeedResponse] = None
+    detail: Optional[str] = None
+
+
+# Maximum number of items accepted by a single bulk request
+MAX_BULK_ITEMS = 10000
+
+
+# Query parameters shared by the paginated list endpoints
+PageLimit = Annotated[
+    int,
+    Query(ge=1, le=MAX_PAGE_SIZE, description="Maximum number of rows to return"),
+]
+PageAfter = Annotated[
+    Optional[str],
+    Query(description="Cursor returned in the X-Next-Cursor header of a page"),
+]
+
+# ID list parameter shared by the batch lookup endpoints
+BatchIds = Annotated[
+    str, Query(description=f"Comma-separated IDs, at most {MAX_PAGE_SIZE}")
+]
+
+# Sparse fieldset parameter shared by the read endpoints
+Fields = Annotated[
+    Optional[str],
+    Query(description="Comma-separated response fields to include, e.g. id,name"),
+]
+
+# Related object parameter shared by the feed read endpoints
+Expand = Annotated[
+    Optional[FeedExpansion],
+    Query(description="Embed the feed's brand as a nested `brand` object"),
+]
+
+
+def _parse_fields(model: Type[BaseModel], fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Resolve a sparse fieldset against a response model.
+
+    Returns:
+        The requested fields in the model's field order, or every field if
+        none were requested
+    """
+    if fields is None:
+        return tuple(model.model_fields)
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    if not requested:
+        raise HTTPException(status_code=400, detail="No fields requested")
+    return tuple(field for field in model.model_fields if field in requested)
+
+
+def _page_columns(
+    entity: Any, fields: Tuple[str, ...], extra: Sequence[Any] = ()
+) -> List[Any]:
+    """
+    Select the columns for a sparse page of an entity.
+
+    `extra` columns, such as those of an embedded object, follow the fields.
+    The ID is always selected for the next-page cursor. When it was not
+    requested it is appended last, past the columns the serializer reads.
+    """
+    columns = [getattr(entity, field) for field in fields] + list(extra)
+    if "id" not in fields:
+        columns.append(entity.id)
+    return columns
+
+
+async def _fetch_page(
+    db: AsyncSession,
+    query: Select,
+    id_column: Any,
+    limit: int,
+    after: Optional[str],
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Run a keyset-paginated query.
+
+    One extra row is fetched to find out whether another page exists, so no
+    separate count query is needed.
+
+    Returns:
+        The page of row tuples and the cursor for the next page, if any
+    """
+    if after is not None:
+        try:
+            query = query.where(id_column > decode_cursor(after))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    result = await db.execute(query.order_by(id_column).limit(limit + 1))
+    rows = list(result.all())
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].id)
+
+
+def _json_response(content: bytes, response: Response) -> Response:
+    """
+    Wrap pre-serialized JSON in a response.
+
+    Headers set on the injected `response`, such as the ETag and next-page
+    cursor, are carried over since FastAPI only merges them into responses it
+    builds itself.
+    """
+    json_response = Response(content=content, media_type="application/json")
+    json_response.headers.raw.extend(response.headers.raw)
+    return json_response
+
+
+async def _feed_page(
+    db: AsyncSession,
+    response: Response,
+    conditions: Sequence[Any],
+    limit: int,
+    after: Optional[str],
+    fields: Optional[str],
+    expand: Optional[FeedExpansion],
+) -> Response:
+    """
+    Serve a keyset-paginated page of feeds matching SQL conditions.
+
+    With `expand=brand` the brand columns are selected through a join in the
+    same query and nested under `brand` in each feed.
+    """
+    selected = _parse_fields(FeedResponse, fields)
+    expansions: Tuple[Tuple[str, Type[BaseModel]], ...] = ()
+    extra: List[Any] = []
+    if expand is FeedExpansion.BRAND:
+        expansions = (("brand", BrandResponse),)
+        # Labelled so they cannot shadow the feed's own id and name
+        extra = [
+            Brand.id.label("brand__id"),
+            Brand.name.label("brand__name"),
+            Brand.version.label("brand__version"),
+        ]
+    query = select(*_page_columns(Feed, selected, extra)).where(*conditions)
+    if expand is FeedExpansion.BRAND:
+        query = query.join(Brand, Feed.brand_id == Brand.id)
+
+    rows, next_cursor = await _fetch_page(db, query, Feed.id, limit, after)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    serializer = serializer_for(FeedResponse, selected, expansions)
+    return _json_response(serializer.dump(rows), response)
+
+
+def _parse_ids(ids: str) -> List[int]:
+    """Parse a comma-separated ID list from a query parameter."""
+    try:
+        parsed = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="IDs must be integers")
+    if len(parsed) > MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_PAGE_SIZE} IDs may be requested"
+        )
+    return parsed
+
+
+async def _get_many_cached(
+    db: AsyncSession,
+    ids: List[int],
+    entity: Any,
+    model: Type[BaseModel],
+    cache: Any,
+) -> Dict[int, Any]:
+    """
+    Look up many rows by ID through a cache.
+
+    Cached rows are served from memory and all remaining IDs are fetched
+    with a single query.
+
+    Returns:
+        Response models keyed by ID, for the IDs that exist
+    """
+    version = checked_version(entity.__tablename__)
+    found: Dict[int, Any] = {}
+    missing = []
+    for row_id in dict.fromkeys(ids):
+        cached = cache.get(row_id, version)
+        if cached is MISSING:
+            missing.append(row_id)
+        else:
+            found[row_id] = cached
+    if missing:
+        result = await db.execute(select(entity).where(entity.id.in_(missing)))
+        for row in result.scalars().all():
+            found[row.id] = model.model_validate(row)
+            cache.set(row.id, found[row.id], version)
+    return found
+
+
+async def _get_brands_batch(db: AsyncSession, ids: List[int]) -> List[BrandBatchEntry]:
+    """Resolve brand IDs in request order, with entries for missing IDs."""
+    brands = await _get_many_cached(db, ids, Brand, BrandResponse, brand_cache)
+    return [
+        (
+            BrandBatchEntry(id=brand_id, brand=brands[brand_id])
+            if brand_id in brands
+            else BrandBatchEntry(id=brand_id, detail="Brand not found")
+        )
+        for brand_id in ids
+    ]
+
+
+async def _get_feeds_batch(db: AsyncSession, ids: List[int]) -> List[FeedBatchEntry]:
+    """Resolve feed IDs in request order, with entries for missing IDs."""
+    feeds = await _get_many_cached(db, ids, Feed, FeedResponse, feed_cache)
+    return [
+        (
+            FeedBatchEntry(id=feed_id, feed=feeds[feed_id])
+            if feed_id in feeds
+            else FeedBatchEntry(id=feed_id, detail="Feed not found")
+        )
+        for feed_id in ids
+    ]
+
+
+async def _get_brand_cached(db: AsyncSession, brand_id: int) -> Optional[BrandResponse]:
+    """Look up a brand through the brand cache."""
+    version = checked_version(Brand.__tablename__)
+    brand = brand_cache.get(brand_id, version)
+    if brand is MISSING:
+        result = await db.execute(select(Brand).filter(Brand.id == brand_id))
+        db_brand = result.scalar_one_or_none()
+        if db_brand is None:
+            return None
+        brand = BrandResponse.model_validate(db_brand)
+        brand_cache.set(brand_id, brand, version)
+    return brand
+
+
+async def _require_brand(db: AsyncSession, brand_id: int) -> None:
+    """
+    Check that a brand a feed is about to refer to exists.
+
+    Writes ask the database rather than the brand cache, whose entries are
+    only checked against the catalog version on reads. A brand deleted
+    after the check still fails the write on the foreign key, which the
+    caller reports the same way.
+
+    Raises:
+        HTTPException: 404 if the brand does not exist
+    """
+    if not await existing_brand_ids(db, [brand_id]):
+        raise HTTPException(status_code=404, detail="Brand not found")
+
+
+def _response_columns(entity: Any, model: Type[BaseModel]) -> List[Any]:
+    """Select the columns of an entity that make up a response model."""
+    return [getattr(entity, field) for field in model.model_fields]
+
+
+async def _write_row(
+    db: AsyncSession,
+    statement: Any,
+    entity: Any,
+    row_id: int,
+    if_match: Optional[str],
+) -> Any:
+    """
+    Run a single-row UPDATE or DELETE ... RETURNING, honoring If-Match.
+
+    The statement is limited to the row and, when If-Match names versions,
+    to those versions. The row is only looked up again when nothing
+    matched, to tell a missing row from a stale version.
+
+    Returns:
+        The returned row
+
+    Raises:
+        HTTPException: 404 if the row does not exist, or 412 if its version
+            does not match
+    """
+    statement = statement.where(entity.id == row_id)
+    versions = if_match_versions(if_match)
+    if versions is not None:
+        statement = statement.where(entity.version.in_(versions))
+    row = (await db.execute(statement)).one_or_none()
+    if row is None:
+        result = await db.execute(select(entity.id).where(entity.id == row_id))
+        name = entity.__name__
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail=f"{name} not found")
+        raise HTTPException(status_code=412, detail=f"{name} has been modified")
+    return row
+
+
 # Brand endpoints
 @router.post("/brands", response_model=BrandResponse, status_code=201)
-async def create_brand(brand: BrandCreate, db: AsyncSession = Depends(get_db)):
-    """Create a new brand."""
+async def create_brand(
+    brand: BrandCreate,
+    upsert: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create a new brand.
+
+    A brand name that already exists is rejected with 409, unless `upsert`
+    is set, in which case the existing brand is returned with 200.
+    """
+    if upsert:
+        (row,) = await upsert_brands(db, [brand.name])
+        if not row["created"]:
+            existing = BrandResponse.model_validate(row)
+            return Response(
+                content=existing.model_dump_json(), media_type="application/json"
+            )
+        await publish_catalog_change(db, Brand.__tablename__, [row["id"]])
+        await db.commit()
+        invalidate_brands(row["id"])
+        return row
+
     db_brand = Brand(name=brand.name)
     db.add(db_brand)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Brand already exists")
+    await publish_catalog_change(db, Brand.__tablename__, [db_brand.id])
     await db.commit()
     await db.refresh(db_brand)
+    invalidate_brands(db_brand.id)
     return db_brand
 
 
-@router.get("/brands", response_model=List[BrandResponse])
-async def get_brands(db: AsyncSession = Depends(get_db)):
-    """Get all brands."""
-    result = await db.execute(select(Brand))
-    brands = result.scalars().all()
-    return brands
+@router.post("/brands/bulk", response_model=List[BrandResponse])
+async def create_brands_bulk(
+    brands: Annotated[List[BrandCreate], Body(max_length=MAX_BULK_ITEMS)],
+    on_conflict: ConflictAction = ConflictAction.UPDATE,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create many brands in a single statement.
+
+    Names that already exist are returned with their existing IDs when
+    `on_conflict` is "update", or left out when it is "ignore". Results follow
+    the order of first appearance in the request.
+    """
+    rows = await upsert_brands(db, (brand.name for brand in brands), on_conflict)
+    created = [row["id"] for row in rows if row["created"]]
+    if created:
+        await publish_catalog_change(db, Brand.__tablename__, created)
+    await db.commit()
+    invalidate_brands(*created)
+    return rows
+
+
+@router.get(
+    "/brands",
+    response_model=List[BrandResponse],
+    dependencies=[Depends(catalog_etag(Brand.__tablename__))],
+)
+async def get_brands(
+    response: Response,
+    limit: PageLimit = DEFAULT_PAGE_SIZE,
+    after: PageAfter = None,
+    fields: Fields = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a page of brands ordered by ID.
+
+    When more brands exist, the cursor for the next page is returned in the
+    X-Next-Cursor response header. Serialized pages are served from the brand
+    list cache.
+    """
+    selected = _parse_fields(BrandResponse, fields)
+    version = checked_version(Brand.__tablename__)
+    page = brand_list_cache.get((limit, after, selected), version)
+    if page is MISSING:
+        query = select(*_page_columns(Brand, selected))
+        rows, next_cursor = await _fetch_page(db, query, Brand.id, limit, after)
+        page = (serializer_for(BrandResponse, selected).dump(rows), next_cursor)
+        brand_list_cache.set((limit, after, selected), page, version)
+
+    content, next_cursor = page
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return _json_response(content, response)
+
+
+@router.get(
+    "/brands/batch",
+    response_model=List[BrandBatchEntry],
+    dependencies=[Depends(catalog_etag(Brand.__tablename__))],
+)
+async def get_brands_by_ids(ids: BatchIds, db: AsyncSession = Depends(get_db)):
+    """
+    Get several brands by ID in one request.
+
+    Results follow the requested order. IDs that do not exist get an entry
+    with `brand` unset and a `detail` message.
+    """
+    return await _get_brands_batch(db, _parse_ids(ids))
 
 
-@router.get("/brands/{brand_id}", response_model=BrandResponse)
-async def get_brand(brand_id: int, db: AsyncSession = Depends(get_db)):
-    """Get a brand by ID."""
-    result = await db.execute(select(Brand).filter(Brand.id == brand_id))
-    brand = result.scalar_one_or_none()
+@router.post("/brands/batch", response_model=List[BrandBatchEntry])
+async def post_brands_by_ids(batch: BatchRequest, db: AsyncSession = Depends(get_db)):
+    """Get several brands by ID, for ID lists too long for a query string."""
+    return await _get_brands_batch(db, batch.ids)
+
+
+@router.get(
+    "/brands/{brand_id}",
+    response_model=BrandResponse,
+    dependencies=[Depends(catalog_versions(Brand.__tablename__))],
+)
+async def get_brand(
+    brand_id: int,
+    response: Response,
+    fields: Fields = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a brand by ID, optionally limited to some fields.
+
+    The ETag carries the brand's version, for use in If-Match on writes.
+    """
+    selected = _parse_fields(BrandResponse, fields)
+    brand = await _get_brand_cached(db, brand_id)
     if brand is None:
         raise HTTPException(status_code=404, detail="Brand not found")
-    return brand
+    etag = version_etag(brand.version, fields and selected)
+    check_version_etag(if_none_match, response, etag)
+    if fields is None:
+        return brand
+    return _json_response(
+        brand.model_dump_json(include=set(selected)).encode(), response
+    )
+
+
+@router.patch("/brands/{brand_id}", response_model=BrandResponse)
+async def update_brand(
+    brand_id: int,
+    brand: BrandUpdate,
+    response: Response,
+    if_match: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Rename a brand.
+
+    The brand is updated and returned by one UPDATE ... RETURNING statement
+    that also bumps its version. Send `If-Match: "<version>"` to have the
+    update refused with 412 if the brand changed since that version. The
+    new version is returned in the ETag header.
+    """
+    statement = (
+        update(Brand)
+        .values(name=brand.name, version=Brand.version + 1)
+        .returning(*_response_columns(Brand, BrandResponse))
+    )
+    try:
+        row = await _write_row(db, statement, Brand, brand_id, if_match)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Brand already exists")
+    await publish_catalog_change(db, Brand.__tablename__, [brand_id])
+    await db.commit()
+    invalidate_brands(brand_id)
+    response.headers["ETag"] = version_etag(row.version)
+    return BrandResponse.model_validate(row)
+
+
+@router.delete("/brands/{brand_id}", status_code=204)
+async def delete_brand(
+    brand_id: int,
+    if_match: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete a brand with one DELETE ... RETURNING statement.
+
+    Honors If-Match like `PATCH`, so a stale version is refused with 412
+    first. Brands that still have feeds are refused with 409: the statement
+    only deletes a brand no feed refers to, so this does not rely on the
+    database enforcing the foreign key.
+    """
+    has_feeds = exists().where(Feed.brand_id == Brand.id)
+    statement = delete(Brand).where(~has_feeds).returning(Brand.id)
+    try:
+        await _write_row(db, statement, Brand, brand_id, if_match)
+    except HTTPException as e:
+        # The brand exists but was not deleted: kept by its feeds, unless
+        # the precondition failed
+        if e.status_code == 412:
+            result = await db.execute(select(Brand.version).where(Brand.id == brand_id))
+            versions = if_match_versions(if_match)
+            if versions is None or result.scalar_one() in versions:
+                raise HTTPException(status_code=409, detail="Brand has feeds")
+        raise
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Brand has feeds")
+    await publish_catalog_change(db, Brand.__tablename__, [brand_id], deleted=True)
+    await db.commit()
+    invalidate_brands(brand_id)
+    return Response(status_code=204)
+
+
+@router.get(
+    "/brands/{brand_id}/feeds",
+    response_model=List[FeedResponse],
+    dependencies=[Depends(catalog_etag(Feed.__tablename__, Brand.__tablename__))],
+)
+async def get_brand_feeds(
+    brand_id: int,
+    response: Response,
+    limit: PageLimit = DEFAULT_PAGE_SIZE,
+    after: PageAfter = None,
+    fields: Fields = None,
+    expand: Expand = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a page of a brand's feeds ordered by ID.
+
+    Paginated like `GET /api/feeds`, and served from the (brand_id, id)
+    index.
+    """
+    if await _get_brand_cached(db, brand_id) is None:
+        raise HTTPException(status_code=404, detail="Brand not found")
+    return await _feed_page(
+        db, response, [Feed.brand_id == brand_id], limit, after, fields, expand
+    )
 
 
 # Feed endpoints
 @router.post("/feeds", response_model=FeedResponse, status_code=201)
 async def create_feed(feed: FeedCreate, db: AsyncSession = Depends(get_db)):
     """Create a new feed."""
-    # Check if brand exists
-    result = await db.execute(select(Brand).filter(Brand.id == feed.brand_id))
-    brand = result.scalar_one_or_none()
-    if brand is None:
-        raise HTTPException(status_code=404, detail="Brand not found")
+    await _require_brand(db, feed.brand_id)
 
     # Create feed
     db_feed = Feed(
@@ -100,24 +885,817 @@ async def create_feed(feed: FeedCreate, db: AsyncSession = Depends(get_db)):
         cost=feed.cost,
     )
     db.add(db_feed)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Brand not found")
+    await record_prices(db, [(db_feed.id, db_feed.cost)])
+    await publish_catalog_change(db, Feed.__tablename__, [db_feed.id])
     await db.commit()
     await db.refresh(db_feed)
     return db_feed
 
 
-@router.get("/feeds", response_model=List[FeedResponse])
-async def get_feeds(db: AsyncSession = Depends(get_db)):
-    """Get all feeds."""
-    result = await db.execute(select(Feed))
-    feeds = result.scalars().all()
-    return feeds
+@router.post("/feeds/bulk", response_model=FeedBulkResponse)
+async def create_feeds_bulk(
+    feeds: Annotated[List[FeedCreate], Body(max_length=MAX_BULK_ITEMS)],
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create many feeds at once.
+
+    All referenced brands are checked in one query and the valid feeds are
+    inserted together. Feeds referencing a missing brand are reported in
+    `errors` by their position in the request instead of failing the batch.
+    """
+    known_brands = await existing_brand_ids(db, (feed.brand_id for feed in feeds))
+
+    rows = []
+    errors = []
+    for index, feed in enumerate(feeds):
+        if feed.brand_id in known_brands:
+            rows.append(feed.model_dump())
+        else:
+            errors.append(BulkError(index=index, detail="Brand not found"))
+
+    created = await insert_feeds(db, rows)
+    if created:
+        await publish_catalog_change(
+            db, Feed.__tablename__, [row["id"] for row in created]
+        )
+    await db.commit()
+    return FeedBulkResponse(
+        created=[FeedResponse.model_validate(row) for row in created], errors=errors
+    )
+
+
+@router.post("/feeds/import", response_model=ImportReport)
+async def import_feed_catalog(file: UploadFile, db: AsyncSession = Depends(get_db)):
+    """
+    Import a manufacturer feed catalog from an uploaded CSV file.
+
+    The file needs `brand`, `name` and `feed_type` columns and may have
+    `density`, `weight` and `cost`. Missing brands are created. Rows that fail
+    validation are skipped and reported by line number.
+    """
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await import_feeds(db, read_catalog(stream))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        stream.detach()
+        invalidate_brands()
+
+
+@router.get(
+    "/feeds",
+    response_model=List[FeedResponse],
+    dependencies=[Depends(catalog_etag(Feed.__tablename__, Brand.__tablename__))],
+)
+async def get_feeds(
+    response: Response,
+    limit: PageLimit = DEFAULT_PAGE_SIZE,
+    after: PageAfter = None,
+    brand_id: Optional[int] = None,
+    feed_type: Optional[FeedType] = None,
+    min_cost: Optional[float] = None,
+    max_cost: Optional[float] = None,
+    min_weight: Optional[float] = None,
+    max_weight: Optional[float] = None,
+    fields: Fields = None,
+    expand: Expand = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a page of feeds ordered by ID, optionally filtered.
+
+    Filters are applied in SQL. When more feeds match, the cursor for the next
+    page is returned in the X-Next-Cursor response header. Rows are read as
+    column tuples and serialized directly, without ORM instances. With
+    `fields`, only those columns are selected and returned. With
+    `expand=brand`, each feed embeds its brand, read in the same query.
+    """
+    conditions = []
+    if brand_id is not None:
+        conditions.append(Feed.brand_id == brand_id)
+    if feed_type is not None:
+        conditions.append(Feed.feed_type == feed_type)
+    if min_cost is not None:
+        conditions.append(Feed.cost >= min_cost)
+    if max_cost is not None:
+        conditions.append(Feed.cost <= max_cost)
+    if min_weight is not None:
+        conditions.append(Feed.weight >= min_weight)
+    if max_weight is not None:
+        conditions.append(Feed.weight <= max_weight)
+    return await _feed_page(db, response, conditions, limit, after, fields, expand)
+
+
+@router.get(
+    "/feeds/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}}
+    },
+)
+async def export_feeds(
+    format: ExportFormat = ExportFormat.NDJSON,
+    include_brand: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream the full feed catalog as NDJSON or CSV.
+
+    Rows are read with a server-side cursor and sent as they are fetched, so
+    the export does not hold the catalog in memory.
+    """
+    # The body reads from the request's session after this returns, which
+    # needs FastAPI 0.118 or later to close yield dependencies only once the
+    # response has been sent
+    return StreamingResponse(
+        stream_feeds(db, format, include_brand),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="feeds.{format.value}"'},
+    )
+
+
+@router.get(
+    "/feeds/best-value",
+    response_model=List[FeedTypeRanking],
+    dependencies=[Depends(catalog_etag(Feed.__tablename__))],
+)
+async def get_best_value_feeds(
+    metric: ValueMetric = ValueMetric.WEIGHT,
+    limit: Annotated[int, Query(ge=1, le=MAX_RANK_LIMIT)] = DEFAULT_RANK_LIMIT,
+    brand_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Rank the best-value feeds of each feed type.
+
+    Feeds are ordered by cost per unit weight, or per unit volume with
+    `metric=volume`. Feeds missing the cost, weight or density the metric
+    needs are left out.
+    """
+    columns = await feed_catalog.load(db)
+    return rank_best_value(columns, metric, limit, brand_id)
+
+
+@router.get(
+    "/feeds/prices",
+    response_model=List[FeedPriceAsOf],
+    dependencies=[Depends(catalog_etag(Feed.__tablename__))],
+)
+async def get_feed_prices(
+    response: Response,
+    at: datetime.datetime,
+    limit: PageLimit = DEFAULT_PAGE_SIZE,
+    after: PageAfter = None,
+    brand_id: Optional[int] = None,
+    feed_type: Optional[FeedType] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a page of feed costs as they stood at a point in time.
+
+    Times without a UTC offset are taken to be in UTC. Feeds with no price
+    recorded by then have no cost. When more feeds match, the cursor for the
+    next page is returned in the X-Next-Cursor response header.
+    """
+    query = prices_as_of(at)
+    if brand_id is not None:
+        query = query.where(Feed.brand_id == brand_id)
+    if feed_type is not None:
+        query = query.where(Feed.feed_type == feed_type)
+    rows, next_cursor = await _fetch_page(db, query, Feed.id, limit, after)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return _json_response(serializer_for(FeedPriceAsOf).dump(rows), response)
+
+
+@router.patch("/feeds/prices", response_model=FeedPriceBulkResponse)
+async def update_feed_prices(
+    prices: Annotated[List[FeedPriceUpdate], Body(max_length=MAX_BULK_ITEMS)],
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Set the cost of many feeds in one statement.
+
+    Later entries for the same feed win, and every updated feed's version is
+    bumped without being checked. Feeds that do not exist are reported in
+    `errors` by their position in the request instead of failing the batch.
+    """
+    updated = await update_costs(db, {price.id: price.cost for price in prices})
+    updated_ids = [row["id"] for row in updated]
+    if updated_ids:
+        await publish_catalog_change(db, Feed.__tablename__, updated_ids)
+    await db.commit()
+    invalidate_feeds(*updated_ids)
+
+    found = set(updated_ids)
+    errors = [
+        BulkError(index=index, detail="Feed not found")
+        for index, price in enumerate(prices)
+        if price.id not in found
+    ]
+    return FeedPriceBulkResponse(updated=updated, errors=errors)
+
+
+@router.get(
+    "/feeds/batch",
+    response_model=List[FeedBatchEntry],
+    dependencies=[Depends(catalog_etag(Feed.__tablename__))],
+)
+async def get_feeds_by_ids(ids: BatchIds, db: AsyncSession = Depends(get_db)):
+    """
+    Get several feeds by ID in one request.
+
+    Results follow the requested order. IDs that do not exist get an entry
+    with `feed` unset and a `detail` message.
+    """
+    return await _get_feeds_batch(db, _parse_ids(ids))
+
+
+@router.post("/feeds/batch", response_model=List[FeedBatchEntry])
+async def post_feeds_by_ids(batch: BatchRequest, db: AsyncSession = Depends(get_db)):
+    """Get several feeds by ID, for ID lists too long for a query string."""
+    return await _get_feeds_batch(db, batch.ids)
+
+
+@router.get(
+    "/feeds/{feed_id}",
+    response_model=FeedResponse,
+    dependencies=[Depends(catalog_versions(Feed.__tablename__, Brand.__tablename__))],
+)
+async def get_feed(
+    feed_id: int,
+    response: Response,
+    fields: Fields = None,
+    expand: Expand = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a feed by ID, optionally limited to some fields.
+
+    With `expand=brand`, the feed embeds its brand, looked up through the
+    brand cache. Like the feed list, which joins brands, a feed whose brand
+    is gone is not found then. The ETag carries the feed's version, for use
+    in If-Match on writes.
+    """
+    selected = _parse_fields(FeedResponse, fields)
+    version = checked_version(Feed.__tablename__)
+    feed = feed_cache.get(feed_id, version)
+    if feed is MISSING:
+        result = await db.execute(select(Feed).filter(Feed.id == feed_id))
+        db_feed = result.scalar_one_or_none()
+        if db_feed is None:
+            raise HTTPException(status_code=404, detail="Feed not found")
+        feed = FeedResponse.model_validate(db_feed)
+        feed_cache.set(feed_id, feed, version)
+    if expand is FeedExpansion.BRAND:
+        brand = await _get_brand_cached(db, feed.brand_id)
+        if brand is None:
+            raise HTTPException(status_code=404, detail="Brand not found")
+        etag = version_etag(feed.version, fields and selected, brand.version)
+        check_version_etag(if_none_match, response, etag)
+        expanded = FeedWithBrandResponse(**feed.model_dump(), brand=brand)
+        return _json_response(
+            expanded.model_dump_json(include={*selected, "brand"}).encode(), response
+        )
+    check_version_etag(
+        if_none_match, response, version_etag(feed.version, fields and selected)
+    )
+    if fields is None:
+        return feed
+    return _json_response(
+        feed.model_dump_json(include=set(selected)).encode(), response
+    )
+
+
+@router.patch("/feeds/{feed_id}", response_model=FeedResponse)
+async def update_feed(
+    feed_id: int,
+    feed: FeedUpdate,
+    response: Response,
+    if_match: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Update some fields of a feed.
+
+    Fields left out are unchanged. The feed is updated and returned by one
+    UPDATE ... RETURNING statement that also bumps its version. Send
+    `If-Match: "<version>"` to have the update refused with 412 if the feed
+    changed since that version. The new version is returned in the ETag
+    header.
+    """
+    values = feed.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=422, detail="No fields to update")
+    if "brand_id" in values:
+        await _require_brand(db, values["brand_id"])
+
+    statement = (
+        update(Feed)
+        .values(**values, version=Feed.version + 1)
+        .returning(*_response_columns(Feed, FeedResponse))
+    )
+    try:
+        row = await _write_row(db, statement, Feed, feed_id, if_match)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Brand not found")
+    if "cost" in values:
+        await record_prices(db, [(feed_id, row.cost)])
+    await publish_catalog_change(db, Feed.__tablename__, [feed_id])
+    await db.commit()
+    invalidate_feeds(feed_id)
+    response.headers["ETag"] = version_etag(row.version)
+    return FeedResponse.model_validate(row)
+
+
+@router.delete("/feeds/{feed_id}", status_code=204)
+async def delete_feed(
+    feed_id: int,
+    if_match: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete a feed with one DELETE ... RETURNING statement.
+
+    Honors If-Match like `PATCH`. The feed's nutrient profile and price
+    history go with it. Feeds still used by rations or inventory are
+    refused with 409.
+    """
+    statement = delete(Feed).returning(Feed.id)
+    try:
+        await _write_row(db, statement, Feed, feed_id, if_match)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Feed is in use")
+    await publish_catalog_change(db, Feed.__tablename__, [feed_id], deleted=True)
+    await publish_catalog_change(db, NutrientProfile.__tablename__, [feed_id])
+    await db.commit()
+    invalidate_feeds(feed_id)
+    nutrient_matrix.invalidate([feed_id])
+    return Response(status_code=204)
+
+
+@router.get(
+    "/feeds/{feed_id}/substitutes",
+    response_model=List[FeedSubstitute],
+    dependencies=[
+        Depends(catalog_etag(Feed.__tablename__, NutrientProfile.__tablename__))
+    ],
+)
+async def get_feed_substitutes(
+    feed_id: int,
+    k: Annotated[int, Query(ge=1, le=MAX_SUBSTITUTES)] = DEFAULT_SUBSTITUTES,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Find the feeds closest to a feed, for when it is unavailable.
+
+    Substitutes have the same feed type and the most similar nutrient
+    profile, density and cost per unit weight, closest first.
+    """
+    substitutes = await substitute_index.substitutes(db, feed_id, k)
+    if substitutes is None:
+        raise HTTPException(status_code=404, detail="Nutrient profile not found")
+    return substitutes
+
+
+@router.get(
+    "/feeds/{feed_id}/nutrients",
+    response_model=NutrientProfileResponse,
+    dependencies=[Depends(catalog_etag(NutrientProfile.__tablename__))],
+)
+async def get_feed_nutrients(feed_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the nutrient profile of a feed."""
+    profile = await db.get(NutrientProfile, feed_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Nutrient profile not found")
+    return profile
+
+
+@router.put("/feeds/{feed_id}/nutrients", response_model=NutrientProfileResponse)
+async def put_feed_nutrients(
+    feed_id: int, profile: NutrientProfileUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Create or replace the nutrient profile of a feed.
+
+    Nutrients left out are stored as unknown.
+    """
+    result = await db.execute(select(Feed.id).filter(Feed.id == feed_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Feed not found")
+
+    values = profile.model_dump()
+    statement = upsert_insert(db, NutrientProfile).values(feed_id=feed_id, **values)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[NutrientProfile.feed_id], set_=values
+        )
+    )
+    await publish_catalog_change(db, NutrientProfile.__tablename__, [feed_id])
+    await db.commit()
+    nutrient_matrix.invalidate([feed_id])
+    return NutrientProfileResponse(feed_id=feed_id, **values)
+
+
+# Change endpoints
+
+
+@router.get("/changes", response_model=ChangesPage)
+async def get_changes(
+    since: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_CHANGES_PAGE)] = DEFAULT_CHANGES_PAGE,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the brands and feeds created, updated or deleted since a token.
+
+    Omit `since` for a full sync. Each changed row appears once with its
+    current values, and deleted rows as `deleted` entries with only an ID.
+    Pass `next_since` back to get the following page, or the next changes
+    once `has_more` is false.
+    """
+    try:
+        after = 0 if since is None else decode_cursor(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid since token")
+    changes, has_more = await read_changes(db, after, limit)
+
+    entries = []
+    for _, table, row, row_id in changes:
+        entry = CatalogChange(table=table, id=row_id, deleted=row is None)
+        if row is not None and table == Brand.__tablename__:
+            entry.brand = BrandResponse(**row._mapping)
+        elif row is not None:
+            entry.feed = FeedResponse(**row._mapping)
+        entries.append(entry)
+    last = changes[-1][0] if changes else after
+    return ChangesPage(
+        changes=entries, next_since=encode_cursor(last), has_more=has_more
+    )
+
+
+# Animal endpoints
+
+
+@router.post("/animals", response_model=AnimalResponse, status_code=201)
+async def create_animal(animal: AnimalCreate, db: AsyncSession = Depends(get_db)):
+    """Create a new animal for a user."""
+    if await db.get(User, animal.owner_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    db_animal = Animal(**animal.model_dump())
+    db.add(db_animal)
+    await db.commit()
+    await db.refresh(db_animal)
+    return db_animal
+
+
+@router.get("/animals", response_model=List[AnimalResponse])
+async def get_animals(
+    response: Response,
+    limit: PageLimit = DEFAULT_PAGE_SIZE,
+    after: PageAfter = None,
+    owner_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a page of animals ordered by ID, optionally for one owner.
+
+    When more animals exist, the cursor for the next page is returned in the
+    X-Next-Cursor response header.
+    """
+    selected = tuple(AnimalResponse.model_fields)
+    query = select(*_page_columns(Animal, selected))
+    if owner_id is not None:
+        query = query.where(Animal.owner_id == owner_id)
+    rows, next_cursor = await _fetch_page(db, query, Animal.id, limit, after)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return _json_response(serializer_for(AnimalResponse).dump(rows), response)
+
+
+@router.get("/animals/{animal_id}", response_model=AnimalResponse)
+async def get_animal(animal_id: int, db: AsyncSession = Depends(get_db)):
+    """Get an animal by ID."""
+    animal = await db.get(Animal, animal_id)
+    if animal is None:
+        raise HTTPException(status_code=404, detail="Animal not found")
+    return animal
+
 
+@router.post(
+    "/animals/{animal_id}/rations",
+    response_model=RationAssignmentResponse,
+    status_code=201,
+)
+async def assign_ration(
+    animal_id: int,
+    assignment: RationAssignmentCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Assign a daily amount of a feed to an animal.
 
-@router.get("/feeds/{feed_id}", response_model=FeedResponse)
-async def get_feed(feed_id: int, db: AsyncSession = Depends(get_db)):
-    """Get a feed by ID."""
-    result = await db.execute(select(Feed).filter(Feed.id == feed_id))
-    feed = result.scalar_one_or_none()
-    if feed is None:
+    The amount is in kg per day, fed from `start_date` through `end_date`
+    inclusive, or indefinitely if `end_date` is not set.
+    """
+    if assignment.end_date is not None and assignment.end_date < assignment.start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    if await db.get(Animal, animal_id) is None:
+        raise HTTPException(status_code=404, detail="Animal not found")
+    result = await db.execute(select(Feed.id).filter(Feed.id == assignment.feed_id))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Feed not found")
-    return feed
+
+    db_assignment = RationAssignment(animal_id=animal_id, **assignment.model_dump())
+    db.add(db_assignment)
+    await db.commit()
+    await db.refresh(db_assignment)
+    return db_assignment
+
+
+@router.get(
+    "/animals/{animal_id}/rations", response_model=List[RationAssignmentResponse]
+)
+async def get_animal_rations(animal_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the ration assignments of an animal, oldest first."""
+    if await db.get(Animal, animal_id) is None:
+        raise HTTPException(status_code=404, detail="Animal not found")
+    result = await db.execute(
+        select(RationAssignment)
+        .filter(RationAssignment.animal_id == animal_id)
+        .order_by(RationAssignment.start_date, RationAssignment.id)
+    )
+    return result.scalars().all()
+
+
+# Inventory endpoints
+
+
+@router.post("/locations", response_model=LocationResponse, status_code=201)
+async def create_location(location: LocationCreate, db: AsyncSession = Depends(get_db)):
+    """Create a place where a user keeps feed, such as a barn or trailer."""
+    if await db.get(User, location.owner_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    db_location = InventoryLocation(**location.model_dump())
+    db.add(db_location)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Location already exists")
+    await db.commit()
+    await db.refresh(db_location)
+    return db_location
+
+
+@router.get("/locations", response_model=List[LocationResponse])
+async def get_locations(owner_id: int, db: AsyncSession = Depends(get_db)):
+    """Get a user's feed locations."""
+    result = await db.execute(
+        select(InventoryLocation)
+        .filter(InventoryLocation.owner_id == owner_id)
+        .order_by(InventoryLocation.id)
+    )
+    return result.scalars().all()
+
+
+@router.post(
+    "/locations/{location_id}/inventory",
+    response_model=InventoryEventResponse,
+    status_code=201,
+)
+async def create_inventory_event(
+    location_id: int,
+    event: InventoryEventCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Record a receipt, usage or adjustment of a feed at a location.
+
+    Quantities are in kg. The response carries the feed's balance at the
+    location after the event. Usage beyond the stock on hand is rejected.
+    """
+    if await db.get(InventoryLocation, location_id) is None:
+        raise HTTPException(status_code=404, detail="Location not found")
+    result = await db.execute(select(Feed.id).filter(Feed.id == event.feed_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Feed not found")
+    try:
+        db_event = await record_event(db, location_id, event)
+    except InsufficientStock as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    await db.commit()
+    return db_event
+
+
+@router.get("/locations/{location_id}/inventory", response_model=List[FeedBalance])
+async def get_location_inventory(location_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the current stock of each feed at a location."""
+    if await db.get(InventoryLocation, location_id) is None:
+        raise HTTPException(status_code=404, detail="Location not found")
+    result = await db.execute(
+        select(InventoryBalance.feed_id, InventoryBalance.quantity)
+        .filter(InventoryBalance.location_id == location_id)
+        .order_by(InventoryBalance.feed_id)
+    )
+    return [FeedBalance(feed_id=row[0], quantity=row[1]) for row in result.all()]
+
+
+@router.get(
+    "/locations/{location_id}/ledger", response_model=List[InventoryEventResponse]
+)
+async def get_location_ledger(
+    location_id: int,
+    response: Response,
+    limit: PageLimit = DEFAULT_PAGE_SIZE,
+    after: PageAfter = None,
+    feed_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a page of a location's inventory events in recording order.
+
+    Each event carries the running balance of its feed after it. When more
+    events exist, the cursor for the next page is returned in the
+    X-Next-Cursor response header.
+    """
+    if await db.get(InventoryLocation, location_id) is None:
+        raise HTTPException(status_code=404, detail="Location not found")
+    selected = tuple(InventoryEventResponse.model_fields)
+    query = select(*_page_columns(InventoryEvent, selected)).where(
+        InventoryEvent.location_id == location_id
+    )
+    if feed_id is not None:
+        query = query.where(InventoryEvent.feed_id == feed_id)
+    rows, next_cursor = await _fetch_page(db, query, InventoryEvent.id, limit, after)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return _json_response(serializer_for(InventoryEventResponse).dump(rows), response)
+
+
+@router.get("/inventory/days-on-hand", response_model=List[DaysOnHand])
+async def get_days_on_hand(
+    owner_id: int,
+    on: Optional[datetime.date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Project when each of a user's feeds runs out.
+
+    Stock across all of the user's locations is divided by the daily amount
+    of the rations assigned to the user's animals on `on` (today by
+    default). Feeds soonest to run out come first.
+    """
+    if await db.get(User, owner_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return await days_on_hand(db, owner_id, on or datetime.date.today())
+
+
+# Forecast endpoints
+
+
+@router.get("/forecast/consumption", response_model=ConsumptionForecast)
+async def get_consumption_forecast(
+    start: datetime.date,
+    end: datetime.date,
+    granularity: Granularity = Granularity.DAY,
+    owner_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Forecast feed consumption and spend from ration assignments.
+
+    Covers `start` through `end` inclusive, per day or per week, for every
+    animal or only those of `owner_id`.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end is before start")
+    if (end - start).days + 1 > MAX_FORECAST_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_FORECAST_DAYS} days may be forecast",
+        )
+    return await forecast_consumption(db, start, end, granularity, owner_id)
+
+
+@router.get("/forecast/growth", response_model=BarnGrowth)
+async def get_growth_forecast(
+    owner_id: int,
+    start: Optional[datetime.date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Project the weights of a user's animals through their show dates.
+
+    Animals with a weight, target weight and upcoming show date are
+    simulated together on their assigned rations, starting from their
+    recorded weights on `start` (today by default). Animals projected to
+    miss their target get a suggested change in daily energy and protein.
+    """
+    if await db.get(User, owner_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return await project_barn_growth(db, owner_id, start or datetime.date.today())
+
+
+# Price endpoints
+
+
+@router.get(
+    "/prices/trend",
+    response_model=List[PriceTrendPoint],
+    dependencies=[Depends(catalog_etag(Feed.__tablename__))],
+)
+async def get_price_trend(
+    start: datetime.date,
+    end: datetime.date,
+    interval: TrendInterval = TrendInterval.MONTH,
+    group_by: TrendGroup = TrendGroup.BRAND,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Chart recorded feed prices per period, by brand or by feed type.
+
+    Covers `start` through `end` inclusive, in UTC. Each point summarizes
+    the costs recorded for one brand or feed type within one period.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end is before start")
+    return await price_trend(db, start, end, interval, group_by)
+
+
+# Ration endpoints
+
+
+@router.post("/rations/optimize", response_model=RationResponse)
+async def optimize_ration(request: RationRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Formulate the least-cost ration meeting daily nutrient requirements.
+
+    Requirements are daily nutrient amounts: kg for nutrients profiled as
+    percentages, Mcal for digestible energy and mg for trace minerals. The
+    ration's total weight stays within `max_intake` kg.
+    """
+    try:
+        return await formulate_ration(db, request)
+    except InfeasibleRation as e:
+        raise HTTPException(
+            status_code=422, detail=f"No ration meets the requirements: {e}"
+        )
+
+
+@router.post("/rations/evaluate", response_model=List[RationEvaluation])
+async def evaluate_ration_batch(batch: RationBatch, db: AsyncSession = Depends(get_db)):
+    """
+    Compute totals for many candidate rations in one request.
+
+    Each ration maps feed IDs to kg per day. Results follow the order of the
+    rations and give total cost, weight, volume and nutrient amounts, with
+    null for totals a feed in the ration has no data for.
+    """
+    try:
+        return await evaluate_rations(db, batch.rations)
+    except UnknownFeeds as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+# Search endpoints
+
+
+@router.get(
+    "/search",
+    response_model=List[SearchHit],
+    dependencies=[Depends(catalog_etag(Feed.__tablename__, Brand.__tablename__))],
+)
+async def search(
+    q: Annotated[str, Query(description="Partial feed or brand name")],
+    limit: Annotated[int, Query(ge=1, le=MAX_SEARCH_LIMIT)] = DEFAULT_SEARCH_LIMIT,
+    kind: Optional[SearchKind] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Suggest feeds and brands matching a partial name, for autocomplete.
+
+    Matching is case-insensitive and finds names containing a word that
+    starts with the query. Use `kind` to search only feeds or only brands.
+    Queries shorter than the minimum once whitespace is collapsed are
+    rejected with 422.
+    """
+    query = normalize(q)
+    if len(query) < MIN_QUERY_LENGTH:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Search queries need at least {MIN_QUERY_LENGTH} characters",
+        )
+    kinds = tuple(SearchKind) if kind is None else (kind,)
+    return await search_catalog(db, query, limit, kinds)
@@ -0,0 +1,236 @@
+"""
+Bulk write helpers for the Showstock catalog.
+
+These functions write many rows per statement instead of one statement per
+row, so large imports cost a handful of round trips rather than thousands.
+"""
+
+import enum
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+from sqlalchemy import Float, Integer, func, insert, literal, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.models import Brand, Feed
+from showstock.prices import record_prices
+
+# Batches at least this large are loaded with COPY on PostgreSQL
+COPY_THRESHOLD = 5000
+
+# Feed columns written by bulk inserts, in COPY column order
+FEED_COLUMNS = ("brand_id", "name", "density", "feed_type", "weight", "cost")
+
+
+class ConflictAction(str, enum.Enum):
+    """Enum for how bulk brand writes treat names that already exist."""
+
+    # Return the existing brand alongside newly created ones
+    UPDATE = "update"
+    # Skip the existing brand and return only newly created ones
+    IGNORE = "ignore"
+
+
+def upsert_insert(
+    db: AsyncSession, entity: Any
+) -> Union[postgresql.Insert, sqlite.Insert]:
+    """
+    Build a dialect-specific INSERT that supports ON CONFLICT clauses.
+
+    PostgreSQL and SQLite share the `on_conflict_do_update` and
+    `on_conflict_do_nothing` API, so callers can build upserts once.
+
+    Raises:
+        NotImplementedError: If the session's dialect has no ON CONFLICT
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(entity)
+    if dialect == "sqlite":
+        return sqlite.insert(entity)
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
+
+
+async def existing_brand_ids(db: AsyncSession, brand_ids: Iterable[int]) -> Set[int]:
+    """
+    Find which of the given brand IDs exist, in a single query.
+
+    Args:
+        db: Database session
+        brand_ids: Brand IDs to check
+
+    Returns:
+        The subset of `brand_ids` that exist
+    """
+    wanted = set(brand_ids)
+    if not wanted:
+        return set()
+    result = await db.execute(select(Brand.id).where(Brand.id.in_(wanted)))
+    return set(result.scalars().all())
+
+
+async def insert_feeds(
+    db: AsyncSession, rows: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Insert feed rows and return them with their new IDs, in input order.
+
+    Batches are written with a multi-row INSERT ... RETURNING. On PostgreSQL,
+    batches of `COPY_THRESHOLD` rows or more are loaded with COPY instead.
+    Each feed's cost is recorded in the price history. The caller is
+    responsible for committing.
+
+    Args:
+        db: Database session
+        rows: Feed column values keyed by column name
+
+    Returns:
+        The inserted rows, including their IDs
+    """
+    if not rows:
+        return []
+    if len(rows) >= COPY_THRESHOLD and db.get_bind().dialect.name == "postgresql":
+        inserted = await _copy_feeds(db, rows)
+    else:
+        result = await db.execute(
+            insert(Feed).returning(
+                Feed.id,
+                *(Feed.__table__.c[c] for c in FEED_COLUMNS),
+                Feed.version,
+                sort_by_parameter_order=True,
+            ),
+            rows,
+        )
+        inserted = [dict(row._mapping) for row in result]
+    await record_prices(db, ((row["id"], row.get("cost")) for row in inserted))
+    return inserted
+
+
+async def _copy_feeds(
+    db: AsyncSession, rows: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Load feed rows with asyncpg's binary COPY.
+
+    COPY cannot return generated keys, so IDs are reserved from the feeds
+    sequence up front and written explicitly.
+    """
+    result = await db.execute(
+        text(
+            "SELECT nextval(pg_get_serial_sequence('feeds', 'id')) "
+            "FROM generate_series(1, :count)"
+        ),
+        {"count": len(rows)},
+    )
+    ids = result.scalars().all()
+    # The version is left to its server default of 1
+    inserted = [{"id": feed_id, **row, "version": 1} for feed_id, row in zip(ids, rows)]
+
+    # The feed type enum is stored by member name, as the ORM writes it
+    records = [
+        tuple(
+            row[c].name if c == "feed_type" else row[c] for c in ("id",) + FEED_COLUMNS
+        )
+        for row in inserted
+    ]
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        Feed.__tablename__, records=records, columns=("id",) + FEED_COLUMNS
+    )
+    return inserted
+
+
+async def update_costs(
+    db: AsyncSession, costs: Dict[int, Optional[float]]
+) -> List[Dict[str, Any]]:
+    """
+    Set the cost of many feeds with one UPDATE ... FROM ... RETURNING.
+
+    The new costs are joined in as a derived table: two unnested arrays on
+    PostgreSQL, or one JSON document expanded by `json_each` on SQLite, so
+    the statement takes a fixed number of parameters however many feeds it
+    updates. Each updated feed's version is bumped and its cost recorded in
+    the price history. The caller is responsible for committing.
+
+    Args:
+        db: Database session
+        costs: New cost by feed ID, with None to clear a cost
+
+    Returns:
+        The `id`, `cost` and `version` of the updated feeds; IDs that do not
+        exist are left out
+    """
+    if not costs:
+        return []
+    if db.get_bind().dialect.name == "postgresql":
+        source = select(
+            func.unnest(literal(list(costs), postgresql.ARRAY(Integer))).label("id"),
+            func.unnest(literal(list(costs.values()), postgresql.ARRAY(Float))).label(
+                "cost"
+            ),
+        ).subquery()
+    else:
+        entries = func.json_each(json.dumps(list(costs.items()))).table_valued("value")
+        source = select(
+            func.json_extract(entries.c.value, "$[0]").label("id"),
+            func.json_extract(entries.c.value, "$[1]").label("cost"),
+        ).subquery()
+
+    result = await db.execute(
+        update(Feed)
+        .where(Feed.id == source.c.id)
+        .values(cost=source.c.cost, version=Feed.version + 1)
+        .returning(Feed.id, Feed.cost, Feed.version)
+        .execution_options(synchronize_session=False)
+    )
+    updated = [dict(row._mapping) for row in result]
+    await record_prices(db, ((row["id"], row["cost"]) for row in updated))
+    return updated
+
+
+async def upsert_brands(
+    db: AsyncSession,
+    names: Iterable[str],
+    on_conflict: ConflictAction = ConflictAction.UPDATE,
+) -> List[Dict[str, Any]]:
+    """
+    Insert brands by name, resolving existing names without writing them.
+
+    New names are inserted with INSERT ... ON CONFLICT (name) DO NOTHING
+    RETURNING, so any number of names is handled without a select-then-insert
+    loop. With `ConflictAction.UPDATE` the names that already existed are
+    then looked up with one more query. Existing rows are never written, so
+    they are not locked and callers need only publish the created ones. The
+    caller is responsible for committing.
+
+    Args:
+        db: Database session
+        names: Brand names; duplicates are collapsed
+        on_conflict: Whether existing brands are returned or skipped
+
+    Returns:
+        Brand rows with `id`, `name`, `version` and whether they were
+        `created`, in order of first appearance
+    """
+    unique_names = list(dict.fromkeys(names))
+    if not unique_names:
+        return []
+
+    statement = upsert_insert(db, Brand).on_conflict_do_nothing(
+        index_elements=[Brand.name]
+    )
+    result = await db.execute(
+        statement.returning(Brand.id, Brand.name, Brand.version),
+        [{"name": name} for name in unique_names],
+    )
+    by_name = {row.name: {**row._mapping, "created": True} for row in result}
+
+    existing = [name for name in unique_names if name not in by_name]
+    if on_conflict == ConflictAction.UPDATE and existing:
+        result = await db.execute(
+            select(Brand.id, Brand.name, Brand.version).where(Brand.name.in_(existing))
+        )
+        by_name.update({row.name: {**row._mapping, "created": False} for row in result})
+    return [by_name[name] for name in unique_names if name in by_name]
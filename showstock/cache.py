@@ -0,0 +1,167 @@
+"""
+Process-local read-through caching for catalog lookups.
+
+The brand and feed catalog changes a few times a day but is read on almost
+every request. Lookups are served from bounded LRU caches whose entries also
+expire after a TTL, and write endpoints invalidate the entries they affect.
+Cached values are immutable response models, never ORM instances, so they
+are safe to share between sessions.
+
+Entries can be tagged with the `catalog_versions` counter they were read at.
+A lookup made at a different version misses, so a response never pairs the
+ETag of one version with a body cached at another. This holds even before
+another worker's invalidation arrives, or when a slow reader stores a row it
+selected before a write.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from showstock.config import settings
+
+# Sentinel returned by `LRUCache.get` when a key is not cached
+MISSING = object()
+
+
+class LRUCache:
+    """
+    A size-bounded least-recently-used cache with per-entry expiry.
+
+    A cache with `max_size` of 0 is disabled: lookups always miss and nothing
+    is stored.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size: Maximum number of entries kept
+            ttl: Seconds an entry stays valid after it is stored
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Optional[int], Any]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: Optional[int] = None) -> Any:
+        """
+        Look up a key, refreshing its recency.
+
+        Args:
+            key: Key to look up
+            version: Catalog version the caller reads at; entries stored at
+                another version miss. None accepts any entry.
+
+        Returns:
+            The cached value, or `MISSING` if absent, expired or stale
+        """
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or entry[0] <= self._clock()
+            or (version is not None and entry[1] != version)
+        ):
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Key to store under
+            value: Value to cache
+            version: Catalog version the value was read at, if known
+        """
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (self._clock() + self.ttl, version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single key if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry, keeping the counters."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the cache's size and hit/miss/eviction counters."""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def _new_cache() -> LRUCache:
+    """Create a cache sized from the application settings."""
+    max_size = settings.cache.MAX_SIZE if settings.cache.ENABLED else 0
+    return LRUCache(max_size=max_size, ttl=settings.cache.TTL)
+
+
+# Brands and feeds keyed by ID
+brand_cache = _new_cache()
+feed_cache = _new_cache()
+# Pages of the brand listing keyed by (limit, after, fields)
+brand_list_cache = _new_cache()
+
+
+def invalidate_brands(*brand_ids: int) -> None:
+    """
+    Invalidate cached brands after a write.
+
+    Every brand listing page is dropped, along with the given brands.
+    """
+    brand_list_cache.clear()
+    for brand_id in brand_ids:
+        brand_cache.invalidate(brand_id)
+
+
+def invalidate_feeds(*feed_ids: int) -> None:
+    """Invalidate the given cached feeds after a write."""
+    for feed_id in feed_ids:
+        feed_cache.invalidate(feed_id)
+
+
+def clear_caches() -> None:
+    """Drop every cached catalog entry."""
+    brand_cache.clear()
+    feed_cache.clear()
+    brand_list_cache.clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Return counters for every catalog cache."""
+    return {
+        "brands": brand_cache.stats(),
+        "feeds": feed_cache.stats(),
+        "brand_lists": brand_list_cache.stats(),
+    }
@@ -0,0 +1,161 @@
+"""
+Changefeed of the brand and feed catalog for delta sync.
+
+Every write to `brands` or `feeds` stamps the written rows with the next
+numbers of one catalog-wide change sequence, and every deletion leaves a
+tombstone carrying its own number. A client that remembers the last number
+it saw asks only for rows stamped after it, and gets each changed row once,
+however often it changed in between.
+
+Sequence numbers are handed out from a counter row in `catalog_versions`,
+bumped in the writing transaction. The row lock it takes is held until
+commit, so writes commit in sequence order and a client can never skip a
+number that is committed later.
+"""
+
+import heapq
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.bulk import upsert_insert
+from showstock.models import Brand, CatalogTombstone, CatalogVersion, Feed
+
+# `catalog_versions` row holding the last change sequence number handed out
+CHANGE_COUNTER = "catalog_changes"
+
+# Tables whose writes appear in the changefeed
+CHANGEFEED_ENTITIES = {Brand.__tablename__: Brand, Feed.__tablename__: Feed}
+
+# Default and maximum number of changes returned per page
+DEFAULT_CHANGES_PAGE = 500
+MAX_CHANGES_PAGE = 5000
+
+# Columns read for changed rows, after the sequence number
+BRAND_COLUMNS = (Brand.id, Brand.name, Brand.version)
+FEED_COLUMNS = (
+    Feed.id,
+    Feed.brand_id,
+    Feed.name,
+    Feed.density,
+    Feed.feed_type,
+    Feed.weight,
+    Feed.cost,
+    Feed.version,
+)
+
+
+async def _allocate(db: AsyncSession, count: int) -> int:
+    """Reserve `count` consecutive sequence numbers and return the first."""
+    statement = upsert_insert(db, CatalogVersion).values(
+        table_name=CHANGE_COUNTER, version=count
+    )
+    result = await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[CatalogVersion.table_name],
+            set_={"version": CatalogVersion.version + count},
+        ).returning(CatalogVersion.version)
+    )
+    return result.scalar_one() - count + 1
+
+
+async def record_changes(
+    db: AsyncSession, table: str, ids: Sequence[int], deleted: bool = False
+) -> None:
+    """
+    Stamp written rows with new sequence numbers, or tombstone deleted ones.
+
+    Call this in the writing transaction; `publish_catalog_change` does so
+    for every catalog write. Tables outside the changefeed are ignored.
+
+    Args:
+        db: Database session performing the write
+        table: Name of the table written to
+        ids: IDs of the rows written or deleted
+        deleted: Whether the rows were deleted
+    """
+    entity = CHANGEFEED_ENTITIES.get(table)
+    unique_ids = sorted(set(ids))
+    if entity is None or not unique_ids:
+        return
+    first = await _allocate(db, len(unique_ids))
+    numbered = list(enumerate(unique_ids, start=first))
+    if deleted:
+        await db.execute(
+            insert(CatalogTombstone),
+            [
+                {"change_seq": seq, "table_name": table, "row_id": row_id}
+                for seq, row_id in numbered
+            ],
+        )
+    else:
+        # Core executemany, so rows deleted meanwhile are skipped quietly
+        await db.execute(
+            update(entity.__table__)
+            .where(entity.__table__.c.id == bindparam("row_id"))
+            .values(change_seq=bindparam("seq")),
+            [{"row_id": row_id, "seq": seq} for seq, row_id in numbered],
+        )
+
+
+async def latest_change(db: AsyncSession) -> int:
+    """Read the last committed change sequence number, or 0 if none."""
+    result = await db.execute(
+        select(CatalogVersion.version).where(
+            CatalogVersion.table_name == CHANGE_COUNTER
+        )
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def read_changes(
+    db: AsyncSession, since: int, limit: int = DEFAULT_CHANGES_PAGE
+) -> Tuple[List[Tuple[int, str, Optional[Any], int]], bool]:
+    """
+    Read the changes after a sequence number, oldest first.
+
+    Brands, feeds and tombstones are each read with one range scan of their
+    sequence number index, bounded by the page size, and merged.
+
+    Args:
+        db: Database session
+        since: Last sequence number the client has seen
+        limit: Maximum number of changes returned
+
+    Returns:
+        Tuples of (sequence number, table name, row or None if deleted, row
+        ID), and whether more changes follow. Rows hold the sequence number
+        followed by `BRAND_COLUMNS` or `FEED_COLUMNS`.
+    """
+    brands = await db.execute(
+        select(Brand.change_seq, *BRAND_COLUMNS)
+        .where(Brand.change_seq > since)
+        .order_by(Brand.change_seq)
+        .limit(limit + 1)
+    )
+    feeds = await db.execute(
+        select(Feed.change_seq, *FEED_COLUMNS)
+        .where(Feed.change_seq > since)
+        .order_by(Feed.change_seq)
+        .limit(limit + 1)
+    )
+    tombstones = await db.execute(
+        select(
+            CatalogTombstone.change_seq,
+            CatalogTombstone.table_name,
+            CatalogTombstone.row_id,
+        )
+        .where(CatalogTombstone.change_seq > since)
+        .order_by(CatalogTombstone.change_seq)
+        .limit(limit + 1)
+    )
+    merged = heapq.merge(
+        ((row[0], Brand.__tablename__, row, row.id) for row in brands.all()),
+        ((row[0], Feed.__tablename__, row, row.id) for row in feeds.all()),
+        ((row[0], row[1], None, row[2]) for row in tombstones.all()),
+        key=lambda change: change[0],
+    )
+    changes = [change for _, change in zip(range(limit + 1), merged)]
+    # Each source holds at most limit + 1 rows, so any overflow is real
+    return changes[:limit], len(changes) > limit
@@ -51,6 +51,36 @@ class DatabaseSettings(BaseSettings):
         )
 
 
+class CacheSettings(BaseSettings):
+    """Catalog cache settings loaded from environment variables."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="SHOWSTOCK_CACHE_", env_file=".env", extra="ignore"
+    )
+
+    ENABLED: bool = True
+    MAX_SIZE: int = 10000
+    TTL: float = 300.0
+    # Seconds between version polls when LISTEN/NOTIFY is unavailable
+    POLL_INTERVAL: float = 5.0
+
+
+class EventSettings(BaseSettings):
+    """Catalog event stream settings loaded from environment variables."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="SHOWSTOCK_EVENTS_", env_file=".env", extra="ignore"
+    )
+
+    # Seconds between changefeed reads while anyone is subscribed
+    POLL_INTERVAL: float = 1.0
+    MAX_SUBSCRIBERS: int = 200
+    # Events buffered per subscriber before it is told to resync
+    QUEUE_SIZE: int = 256
+    # Seconds of silence before a keepalive comment is sent
+    HEARTBEAT: float = 15.0
+
+
 class Settings(BaseSettings):
     """Main application settings."""
 
@@ -67,6 +97,12 @@ class Settings(BaseSettings):
     # Database settings
     db: DatabaseSettings = DatabaseSettings()
 
+    # Catalog cache settings
+    cache: CacheSettings = CacheSettings()
+
+    # Catalog event stream settings
+    events: EventSettings = EventSettings()
+
 
 # Create a global settings instance
 settings = Settings()
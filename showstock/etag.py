@@ -0,0 +1,178 @@
+"""
+Conditional request support for catalog endpoints.
+
+Strong ETags are derived from the `catalog_versions` counters of the tables
+an endpoint reads, together with the request path and query. Every write to
+those tables bumps a counter and so changes the ETag. A request whose
+If-None-Match matches is answered with 304 Not Modified after a single
+primary-key lookup, without reading or serializing any catalog rows.
+
+Single brands and feeds are tagged with their row's own `version` column
+instead, so the ETag a client reads from a detail GET is the one it sends in
+If-Match to make a write conditional, and writes to other rows leave it
+alone.
+"""
+
+import hashlib
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.db import get_db
+from showstock.models import CatalogVersion
+
+# Catalog versions read by the current request's ETag check
+_checked_versions: ContextVar[Dict[str, int]] = ContextVar("checked_versions")
+
+
+async def get_catalog_versions(
+    db: AsyncSession, tables: Iterable[str]
+) -> Dict[str, int]:
+    """
+    Read the current version of the given catalog tables.
+
+    Tables that have never been written to have version 0.
+    """
+    tables = list(tables)
+    result = await db.execute(
+        select(CatalogVersion.table_name, CatalogVersion.version).where(
+            CatalogVersion.table_name.in_(tables)
+        )
+    )
+    versions = {table: version for table, version in result.all()}
+    return {table: versions.get(table, 0) for table in tables}
+
+
+def checked_version(table: str) -> Optional[int]:
+    """
+    Return the version of a table read by this request's ETag check.
+
+    Cached reads pass it to the catalog caches, so the body is built from
+    the same version as the ETag.
+
+    Returns:
+        The version, or None if the request made no ETag check on the table
+    """
+    return _checked_versions.get({}).get(table)
+
+
+def make_etag(*parts: object) -> str:
+    """Build a quoted strong ETag from the given parts."""
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    Uses the weak comparison required for If-None-Match, so a `W/` prefix on
+    the client's tag is ignored.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def version_etag(version: int, *variant: object) -> str:
+    """
+    Build the strong ETag of a representation of a row version.
+
+    Representations other than the full row, such as sparse fieldsets, pass
+    whatever sets them apart as `variant`. It is appended to the version as
+    a digest, so every representation has its own tag and each still names
+    the version for If-Match.
+    """
+    if all(part is None for part in variant):
+        return f'"{version}"'
+    digest = hashlib.sha256(repr(variant).encode()).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def check_version_etag(
+    if_none_match: Optional[str], response: Response, etag: str
+) -> None:
+    """
+    Answer a conditional GET of a row with 304, or set its ETag.
+
+    Raises:
+        HTTPException: 304 Not Modified if the client has the representation
+    """
+    if etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+
+def if_match_versions(if_match: Optional[str]) -> Optional[List[int]]:
+    """
+    Parse an If-Match header into the row versions it accepts.
+
+    Uses the strong comparison required for If-Match, so weak tags, and tags
+    not built by `version_etag`, match nothing.
+
+    Returns:
+        Accepted versions, or None if the header is absent or `*`
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    for candidate in if_match.split(","):
+        candidate = candidate.strip()
+        if len(candidate) > 2 and candidate[0] == candidate[-1] == '"':
+            version = candidate[1:-1].split("-", 1)[0]
+            if version.isdigit():
+                versions.append(int(version))
+    return versions
+
+
+def catalog_versions(*tables: str) -> Callable[..., Awaitable[None]]:
+    """
+    Create a dependency that reads catalog versions for cached row reads.
+
+    For endpoints tagged with `version_etag` rather than `catalog_etag`. The
+    versions are only used to keep cached rows in step, see
+    `checked_version`.
+
+    Args:
+        tables: Names of the tables the endpoint's response is built from
+    """
+
+    async def read_versions(db: AsyncSession = Depends(get_db)) -> None:
+        _checked_versions.set(await get_catalog_versions(db, tables))
+
+    return read_versions
+
+
+def catalog_etag(*tables: str) -> Callable[..., Awaitable[None]]:
+    """
+    Create a dependency that handles conditional GETs for catalog tables.
+
+    The dependency sets the ETag header on the response, or ends the request
+    with 304 Not Modified if the client already has the current version.
+
+    Args:
+        tables: Names of the tables the endpoint's response is built from
+    """
+
+    async def check_etag(
+        request: Request, response: Response, db: AsyncSession = Depends(get_db)
+    ) -> None:
+        versions = await get_catalog_versions(db, tables)
+        _checked_versions.set(versions)
+        etag = make_etag(
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            sorted(versions.items()),
+        )
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+
+    return check_etag
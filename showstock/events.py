@@ -0,0 +1,287 @@
+"""
+Server-sent event stream of catalog changes.
+
+Each worker runs one `CatalogBroadcaster`. While anyone is subscribed it
+reads the catalog changefeed once per poll interval, renders every change as
+an event once, and hands the same event to every subscriber's queue, so the
+database sees one query per worker however many clients are listening, and
+writes made by other workers are pushed too.
+
+A subscriber that falls behind does not hold up the others or buffer without
+bound. Once its queue is full its backlog is dropped and it is sent a
+`resync` event naming the last change it received, after which its stream
+ends. The client catches up with `/api/changes?since=<token>` and subscribes
+again.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from showstock.changes import latest_change, read_changes
+from showstock.config import settings
+from showstock.db import engine
+from showstock.models import Brand, Feed
+from showstock.pagination import encode_cursor
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Media type of the event stream
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+# Key holding the changed row in event data, by table
+ENTRY_KEYS = {Brand.__tablename__: "brand", Feed.__tablename__: "feed"}
+
+# Comment sent to keep idle connections open through proxies
+KEEPALIVE = ": keepalive\n\n"
+
+
+class TooManySubscribers(Exception):
+    """Raised when a broadcaster already has its maximum of subscribers."""
+
+
+def format_event(event: str, data: Dict[str, Any], event_id: str) -> str:
+    """
+    Render one server-sent event.
+
+    Args:
+        event: Event type
+        data: JSON-serializable event data
+        event_id: Changefeed token of the event
+
+    Returns:
+        Event in the `text/event-stream` format
+    """
+    payload = json.dumps(data, separators=(",", ":"))
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
+
+
+def render_change(seq: int, table: str, row: Optional[Any], row_id: int) -> str:
+    """
+    Render a change read by `read_changes` as an event named after its table.
+
+    The event data has the same shape as an entry of `/api/changes`.
+    """
+    data: Dict[str, Any] = {"table": table, "id": row_id, "deleted": row is None}
+    if row is not None:
+        values = dict(row._mapping)
+        del values["change_seq"]
+        data[ENTRY_KEYS[table]] = values
+    return format_event(table, data, encode_cursor(seq))
+
+
+class CatalogSubscription:
+    """Bounded queue of rendered events for one connected client."""
+
+    def __init__(
+        self,
+        broadcaster: "CatalogBroadcaster",
+        since: int,
+        queue_size: int,
+        heartbeat: float,
+    ):
+        """
+        Initialize a subscription.
+
+        Args:
+            broadcaster: Broadcaster feeding the subscription
+            since: Last change sequence number before the subscription starts
+            queue_size: Number of events buffered before the client is told
+                to resync
+            heartbeat: Seconds of silence before a keepalive is sent
+        """
+        self._broadcaster = broadcaster
+        self._since = encode_cursor(since)
+        self._queue: "asyncio.Queue[Optional[Tuple[str, str]]]" = asyncio.Queue(
+            queue_size
+        )
+        self._heartbeat = heartbeat
+
+    def offer(self, token: str, event: str) -> bool:
+        """
+        Queue an event without waiting.
+
+        Args:
+            token: Changefeed token of the event
+            event: Rendered event
+
+        Returns:
+            False if the queue was full, in which case its backlog is replaced
+            by a resync marker and the subscription receives nothing more
+        """
+        try:
+            self._queue.put_nowait((token, event))
+            return True
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+            return False
+
+    async def stream(self) -> AsyncIterator[str]:
+        """
+        Yield the events of the subscription until the client goes away.
+
+        The stream opens with a `ready` event carrying the token the
+        subscription starts from, and ends after a `resync` event if the
+        client fell behind.
+        """
+        last = self._since
+        try:
+            yield format_event("ready", {"since": last}, last)
+            while True:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), self._heartbeat)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+                if item is None:
+                    yield format_event("resync", {"since": last}, last)
+                    return
+                last, event = item
+                yield event
+        finally:
+            self._broadcaster.unsubscribe(self)
+
+
+class CatalogBroadcaster:
+    """
+    Background task fanning catalog changes out to this worker's event
+    stream subscribers.
+    """
+
+    def __init__(
+        self,
+        db_engine: AsyncEngine,
+        poll_interval: float,
+        max_subscribers: int,
+        queue_size: int,
+        heartbeat: float,
+    ):
+        """
+        Initialize a stopped broadcaster.
+
+        Args:
+            db_engine: Engine whose changefeed is read
+            poll_interval: Seconds between changefeed reads
+            max_subscribers: Maximum number of concurrent subscribers
+            queue_size: Number of events buffered per subscriber
+            heartbeat: Seconds of silence before subscribers get a keepalive
+        """
+        self._engine = db_engine
+        self._poll_interval = poll_interval
+        self._max_subscribers = max_subscribers
+        self._queue_size = queue_size
+        self._heartbeat = heartbeat
+        self._subscribers: Set[CatalogSubscription] = set()
+        # Last change sequence number fanned out, or None while idle
+        self._since: Optional[int] = None
+        self._active = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of current subscribers."""
+        return len(self._subscribers)
+
+    async def start(self) -> None:
+        """Start broadcasting in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop broadcasting."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def subscribe(self) -> CatalogSubscription:
+        """
+        Subscribe to changes committed from now on.
+
+        Returns:
+            New subscription, which is removed again once its stream closes
+
+        Raises:
+            TooManySubscribers: If the subscriber limit is reached
+        """
+        if self._since is None:
+            async with AsyncSession(self._engine) as db:
+                self._since = await latest_change(db)
+        if len(self._subscribers) >= self._max_subscribers:
+            raise TooManySubscribers()
+        subscription = CatalogSubscription(
+            self, self._since, self._queue_size, self._heartbeat
+        )
+        self._subscribers.add(subscription)
+        self._active.set()
+        return subscription
+
+    def unsubscribe(self, subscription: CatalogSubscription) -> None:
+        """Remove a subscription, if still present."""
+        self._subscribers.discard(subscription)
+
+    def publish(self, changes: Sequence[Tuple[int, str, Optional[Any], int]]) -> None:
+        """
+        Render changes once each and queue them for every subscriber.
+
+        Subscribers whose queue overflows are dropped.
+
+        Args:
+            changes: Changes as returned by `read_changes`
+        """
+        for change in changes:
+            token, event = encode_cursor(change[0]), render_change(*change)
+            for subscription in list(self._subscribers):
+                if not subscription.offer(token, event):
+                    self._subscribers.discard(subscription)
+            self._since = change[0]
+
+    async def poll(self) -> bool:
+        """
+        Read one page of new changes and publish it.
+
+        Returns:
+            Whether more changes are waiting
+        """
+        async with AsyncSession(self._engine) as db:
+            if self._since is None:
+                self._since = await latest_change(db)
+            changes, has_more = await read_changes(db, self._since)
+        self.publish(changes)
+        return has_more
+
+    async def _run(self) -> None:
+        """Poll the changefeed whenever anyone is subscribed."""
+        while True:
+            if not self._subscribers:
+                # Start from the head again once someone subscribes
+                self._since = None
+                self._active.clear()
+                await self._active.wait()
+                continue
+            try:
+                has_more = await self.poll()
+            except Exception as e:
+                logger.warning(f"Catalog changefeed read failed: {e}")
+                has_more = False
+            if not has_more:
+                await asyncio.sleep(self._poll_interval)
+
+
+# Broadcaster for this worker, started with the application
+catalog_events = CatalogBroadcaster(
+    engine,
+    settings.events.POLL_INTERVAL,
+    settings.events.MAX_SUBSCRIBERS,
+    settings.events.QUEUE_SIZE,
+    settings.events.HEARTBEAT,
+)
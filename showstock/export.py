@@ -0,0 +1,120 @@
+"""
+Streaming export of the feed catalog.
+
+Rows are read through a server-side cursor in bounded batches and encoded
+batch by batch, so memory use stays flat no matter how large the catalog is
+and the first bytes reach the client as soon as the first batch is read.
+"""
+
+import csv
+import enum
+import io
+import json
+from typing import Any, AsyncIterator, Callable, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from showstock.models import Brand, Feed
+
+# Number of rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, enum.Enum):
+    """Enum for catalog export formats."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def feed_export_query(include_brand: bool = False) -> Select:
+    """
+    Build the column-only query used to export feeds.
+
+    Args:
+        include_brand: Whether to join the brand name onto each row
+
+    Returns:
+        Query selecting feed columns ordered by feed ID
+    """
+    query = select(
+        Feed.id,
+        Feed.brand_id,
+        Feed.name,
+        Feed.density,
+        Feed.feed_type,
+        Feed.weight,
+        Feed.cost,
+    )
+    if include_brand:
+        query = query.add_columns(Brand.name.label("brand_name")).join(
+            Brand, Feed.brand_id == Brand.id
+        )
+    return query.order_by(Feed.id)
+
+
+def _plain(value: Any) -> Any:
+    """Convert enum members to their raw value for encoding."""
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _encode_ndjson(fields: List[str], rows: Sequence[Sequence[Any]]) -> str:
+    """Encode a batch of rows as newline-delimited JSON objects."""
+    return "".join(
+        json.dumps({field: _plain(value) for field, value in zip(fields, row)}) + "\n"
+        for row in rows
+    )
+
+
+def _encode_csv(rows: Sequence[Sequence[Any]]) -> str:
+    """Encode a batch of rows as CSV lines."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_feeds(
+    db: AsyncSession,
+    export_format: ExportFormat,
+    include_brand: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[str]:
+    """
+    Stream the feed catalog as encoded text chunks.
+
+    Each yielded chunk holds at most `batch_size` rows. CSV output starts with
+    a header line.
+
+    Args:
+        db: Database session to stream from
+        export_format: Output encoding
+        include_brand: Whether to include the brand name on each row
+        batch_size: Number of rows fetched and encoded per chunk
+
+    Yields:
+        Encoded chunks of the export
+    """
+    query = feed_export_query(include_brand).execution_options(yield_per=batch_size)
+    result = await db.stream(query)
+    fields = list(result.keys())
+
+    encode: Callable[[Sequence[Sequence[Any]]], str]
+    if export_format == ExportFormat.CSV:
+        yield _encode_csv([fields])
+        encode = _encode_csv
+    else:
+
+        def encode(rows: Sequence[Sequence[Any]]) -> str:
+            return _encode_ndjson(fields, rows)
+
+    async for partition in result.partitions():
+        yield encode(partition)
@@ -0,0 +1,189 @@
+"""
+Feed consumption forecasting across an operation.
+
+Consumption is projected from the ration assignments active in a date range.
+The database sums assigned amounts per feed and date span, so an operation
+with tens of thousands of animals on a handful of rations comes back as a
+few rows. Those spans are then laid out over the days of the range with a
+difference array and a cumulative sum, giving a feed × day matrix of
+amounts, and priced with the cost per unit weight of each feed.
+"""
+
+import datetime
+import enum
+from typing import List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.analytics import ValueMetric, feed_catalog
+from showstock.models import Animal, RationAssignment
+
+# Longest date range that can be forecast in one request
+MAX_FORECAST_DAYS = 366
+
+
+class Granularity(str, enum.Enum):
+    """Length of the periods a forecast is broken into."""
+
+    DAY = "day"
+    WEEK = "week"
+
+
+class FeedForecast(BaseModel):
+    feed_id: int
+    name: str
+    amounts: List[float]
+    total_amount: float
+    total_cost: Optional[float] = None
+
+
+class ConsumptionForecast(BaseModel):
+    start: datetime.date
+    end: datetime.date
+    granularity: Granularity
+    periods: List[datetime.date]
+    feeds: List[FeedForecast]
+    costs: List[float]
+    total_cost: float
+    unpriced_feed_ids: List[int]
+
+
+def spread_spans(
+    rows: np.ndarray,
+    count: int,
+    first_days: Sequence[datetime.date],
+    last_days: Sequence[Optional[datetime.date]],
+    amounts: np.ndarray,
+    start: datetime.date,
+    days: int,
+) -> np.ndarray:
+    """
+    Lay daily amounts fed over date spans out as a row × day matrix.
+
+    Each span adds its amount to every day it covers within the range, using
+    a difference array and a cumulative sum rather than a loop over days.
+
+    Args:
+        rows: Matrix row each span adds to
+        count: Number of rows
+        first_days: First day of each span
+        last_days: Last day of each span, inclusive, or None if open-ended
+        amounts: Daily amount of each span
+        start: Day of the first column
+        days: Number of columns
+
+    Returns:
+        The total amount per row and day
+    """
+    # Day offsets of each span within the range, clipped to it
+    first = np.array([(day - start).days for day in first_days], dtype=np.int64)
+    last = np.array(
+        [days - 1 if day is None else (day - start).days for day in last_days],
+        dtype=np.int64,
+    )
+    first, last = np.maximum(first, 0), np.minimum(last, days - 1)
+    # Spans that end before the range or start after it add nothing
+    inside = first <= last
+    rows, amounts = rows[inside], amounts[inside]
+
+    changes = np.zeros((count, days + 1))
+    np.add.at(changes, (rows, first[inside]), amounts)
+    np.add.at(changes, (rows, last[inside] + 1), -amounts)
+    return np.cumsum(changes[:, :-1], axis=1)
+
+
+async def forecast_consumption(
+    db: AsyncSession,
+    start: datetime.date,
+    end: datetime.date,
+    granularity: Granularity = Granularity.DAY,
+    owner_id: Optional[int] = None,
+) -> ConsumptionForecast:
+    """
+    Project feed consumption and spend over a date range.
+
+    Args:
+        db: Database session
+        start: First day of the forecast
+        end: Last day of the forecast, inclusive
+        granularity: Whether amounts are given per day or per week; weeks
+            start on `start`, and the last one may be shorter
+        owner_id: Only include animals belonging to this user
+
+    Returns:
+        Amounts in kg of each feed per period, and the spend per period.
+        Spend covers only feeds with a known cost per unit weight; the
+        others are listed in `unpriced_feed_ids`.
+    """
+    query = (
+        select(
+            RationAssignment.feed_id,
+            RationAssignment.start_date,
+            RationAssignment.end_date,
+            func.sum(RationAssignment.amount),
+        )
+        .where(
+            RationAssignment.start_date <= end,
+            or_(
+                RationAssignment.end_date.is_(None),
+                RationAssignment.end_date >= start,
+            ),
+        )
+        .group_by(
+            RationAssignment.feed_id,
+            RationAssignment.start_date,
+            RationAssignment.end_date,
+        )
+    )
+    if owner_id is not None:
+        query = query.join(Animal, RationAssignment.animal_id == Animal.id).where(
+            Animal.owner_id == owner_id
+        )
+    spans = (await db.execute(query)).all()
+
+    days = (end - start).days + 1
+    span_feeds = np.array([span[0] for span in spans], dtype=np.int64)
+    feed_ids, rows = np.unique(span_feeds, return_inverse=True)
+    daily = spread_spans(
+        rows,
+        len(feed_ids),
+        [span[1] for span in spans],
+        [span[2] for span in spans],
+        np.array([span[3] for span in spans], dtype=np.float64),
+        start,
+        days,
+    )
+
+    period_starts = np.arange(0, days, 1 if granularity is Granularity.DAY else 7)
+    by_period = np.add.reduceat(daily, period_starts, axis=1)
+
+    columns = await feed_catalog.load(db)
+    positions = columns.positions(feed_ids)
+    unit_costs = columns.unit_costs[ValueMetric.WEIGHT][positions]
+    priced = ~np.isnan(unit_costs)
+    spend = by_period * np.where(priced, unit_costs, 0.0)[:, None]
+
+    return ConsumptionForecast(
+        start=start,
+        end=end,
+        granularity=granularity,
+        periods=[start + datetime.timedelta(days=int(day)) for day in period_starts],
+        feeds=[
+            FeedForecast(
+                feed_id=int(feed_id),
+                name=columns.name[position],
+                amounts=feed_amounts.tolist(),
+                total_amount=float(feed_amounts.sum()),
+                total_cost=float(feed_spend.sum()) if is_priced else None,
+            )
+            for feed_id, position, feed_amounts, feed_spend, is_priced in zip(
+                feed_ids, positions, by_period, spend, priced
+            )
+        ],
+        costs=spend.sum(axis=0).tolist(),
+        total_cost=float(spend.sum()),
+        unpriced_feed_ids=feed_ids[~priced].tolist(),
+    )
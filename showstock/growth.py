@@ -0,0 +1,388 @@
+"""
+Growth simulation of show animals toward their weigh-in targets.
+
+Each animal's daily digestible energy and crude protein supply is laid out
+over the days until its show from its ration assignments and the nutrient
+matrix. Weights are then stepped forward one day at a time for the whole
+barn at once: each day's gain is what the energy left after maintenance
+supports, capped by the protein left after maintenance and by the species'
+greatest daily gain. Maintenance scales with metabolic body weight, W^0.75.
+
+The species coefficients are rough planning figures for growing stock, meant
+to flag animals that are clearly off pace rather than to replace a
+nutritionist's ration.
+"""
+
+import datetime
+import enum
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from showstock.forecast import MAX_FORECAST_DAYS, spread_spans
+from showstock.models import Animal, RationAssignment
+from showstock.models.animal import Species
+from showstock.models.nutrition import NUTRIENTS
+from showstock.nutrition import nutrient_matrix
+from showstock.ration import AMOUNT_SCALE
+
+# Nutrient matrix columns driving growth
+ENERGY_COLUMN = NUTRIENTS.index("digestible_energy")
+PROTEIN_COLUMN = NUTRIENTS.index("crude_protein")
+
+# Projected weights within this fraction of the target count as on track
+TARGET_TOLERANCE = 0.02
+
+
+class GrowthCoefficients:
+    """Energy and protein needs of one species."""
+
+    def __init__(
+        self,
+        maintenance_energy: float,
+        gain_energy: float,
+        maintenance_protein: float,
+        gain_protein: float,
+        max_gain: float,
+    ):
+        """
+        Initialize coefficients for a species.
+
+        Args:
+            maintenance_energy: Mcal of digestible energy per day per kg of
+                metabolic body weight
+            gain_energy: Mcal of digestible energy per kg of gain
+            maintenance_protein: kg of crude protein per day per kg of
+                metabolic body weight
+            gain_protein: kg of crude protein per kg of gain
+            max_gain: Greatest daily gain in kg
+        """
+        self.maintenance_energy = maintenance_energy
+        self.gain_energy = gain_energy
+        self.maintenance_protein = maintenance_protein
+        self.gain_protein = gain_protein
+        self.max_gain = max_gain
+
+
+# Attributes of `GrowthCoefficients`, as passed to `simulate_growth`
+COEFFICIENTS = (
+    "maintenance_energy",
+    "gain_energy",
+    "maintenance_protein",
+    "gain_protein",
+    "max_gain",
+)
+
+# Coefficients for growing stock of each species
+SPECIES_GROWTH: Dict[Species, GrowthCoefficients] = {
+    Species.CATTLE: GrowthCoefficients(0.16, 9.0, 0.0045, 0.30, 2.0),
+    Species.SHEEP: GrowthCoefficients(0.12, 7.0, 0.0035, 0.40, 0.5),
+    Species.GOAT: GrowthCoefficients(0.12, 7.0, 0.0035, 0.40, 0.3),
+    Species.SWINE: GrowthCoefficients(0.11, 6.0, 0.0020, 0.40, 1.1),
+}
+
+
+def coefficient_arrays(species: Sequence[Species]) -> Dict[str, np.ndarray]:
+    """Return arrays of each coefficient, one element per animal."""
+    table = [SPECIES_GROWTH[kind] for kind in species]
+    return {
+        name: np.array([getattr(entry, name) for entry in table])
+        for name in COEFFICIENTS
+    }
+
+
+class GrowthStatus(str, enum.Enum):
+    """How an animal's projected show weight compares with its target."""
+
+    ON_TRACK = "on_track"
+    BEHIND = "behind"
+    AHEAD = "ahead"
+    # The target needs more than the species' greatest daily gain
+    UNREACHABLE = "unreachable"
+
+
+class RationAdjustment(BaseModel):
+    required_daily_gain: float
+    energy_change: float
+    protein_change: float
+    ration_scale: Optional[float] = None
+
+
+class AnimalGrowth(BaseModel):
+    animal_id: int
+    name: str
+    species: Species
+    show_date: datetime.date
+    target_weight: float
+    weights: List[float]
+    final_weight: float
+    status: GrowthStatus
+    adjustment: Optional[RationAdjustment] = None
+
+
+class BarnGrowth(BaseModel):
+    start: datetime.date
+    animals: List[AnimalGrowth]
+    unprofiled_feed_ids: List[int]
+
+
+def simulate_growth(
+    weights: np.ndarray,
+    energy: np.ndarray,
+    protein: np.ndarray,
+    days: np.ndarray,
+    coefficients: Dict[str, np.ndarray],
+) -> np.ndarray:
+    """
+    Step the weights of many animals forward day by day.
+
+    Args:
+        weights: Starting weight of each animal in kg
+        energy: Digestible energy supplied, Mcal per animal and day
+        protein: Crude protein supplied, kg per animal and day
+        days: Number of days to simulate for each animal; its weight holds
+            after that
+        coefficients: Arrays of each coefficient in `COEFFICIENTS`, one
+            element per animal
+
+    Returns:
+        The weight of each animal at the start of each day, with one more
+        column than `energy` for the weight after the last day
+    """
+    maintenance_energy = coefficients["maintenance_energy"]
+    gain_energy = coefficients["gain_energy"]
+    maintenance_protein = coefficients["maintenance_protein"]
+    gain_protein = coefficients["gain_protein"]
+    max_gain = coefficients["max_gain"]
+
+    trajectory = np.empty((len(weights), energy.shape[1] + 1))
+    trajectory[:, 0] = weights
+    current = weights.astype(np.float64)
+    for day in range(energy.shape[1]):
+        metabolic = current**0.75
+        energy_gain = (energy[:, day] - maintenance_energy * metabolic) / gain_energy
+        protein_gain = (
+            protein[:, day] - maintenance_protein * metabolic
+        ) / gain_protein
+        # Short energy means losing weight; short protein only stops gain
+        gain = np.minimum(energy_gain, np.maximum(protein_gain, 0.0))
+        gain = np.clip(gain, -max_gain, max_gain)
+        current = np.where(day < days, np.maximum(current + gain, 0.0), current)
+        trajectory[:, day + 1] = current
+    return trajectory
+
+
+def suggest_adjustments(
+    weights: np.ndarray,
+    targets: np.ndarray,
+    days: np.ndarray,
+    energy: np.ndarray,
+    protein: np.ndarray,
+    coefficients: Dict[str, np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """
+    Work out the change in daily supply that would reach each target.
+
+    The gain needed is spread evenly over the days left, with maintenance
+    taken at the midpoint weight.
+
+    Args:
+        weights: Starting weight of each animal in kg
+        targets: Target weight of each animal in kg
+        days: Days until each animal's show
+        energy: Average digestible energy supplied per day, Mcal
+        protein: Average crude protein supplied per day, kg
+        coefficients: Arrays of each coefficient in `COEFFICIENTS`
+
+    Returns:
+        Arrays of the required daily gain, the change in energy and protein
+        per day, and the factor to scale the current ration by to cover
+        both, NaN where nothing is fed
+    """
+    required_gain = (targets - weights) / days
+    metabolic = ((weights + targets) / 2) ** 0.75
+    needed_energy = (
+        coefficients["maintenance_energy"] * metabolic
+        + coefficients["gain_energy"] * required_gain
+    )
+    needed_protein = (
+        coefficients["maintenance_protein"] * metabolic
+        + coefficients["gain_protein"] * required_gain
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.maximum(needed_energy / energy, needed_protein / protein)
+    scale = np.where((energy > 0) & (protein > 0), scale, np.nan)
+    return {
+        "required_gain": required_gain,
+        "energy_change": needed_energy - energy,
+        "protein_change": needed_protein - protein,
+        "scale": scale,
+    }
+
+
+async def project_barn_growth(
+    db: AsyncSession, owner_id: int, start: datetime.date
+) -> BarnGrowth:
+    """
+    Project the weights of a user's animals through their shows.
+
+    Animals need a weight, a target weight and a show date after `start`
+    and within `MAX_FORECAST_DAYS` of it to be projected.
+
+    Args:
+        db: Database session
+        owner_id: User whose animals are projected
+        start: Day the animals' recorded weights apply to
+
+    Returns:
+        Daily weights of each animal from `start` through its show date,
+        with a ration adjustment for animals off their target. Feeds lacking
+        an energy or protein value supply none of it; they are listed in
+        `unprofiled_feed_ids`.
+    """
+    horizon = start + datetime.timedelta(days=MAX_FORECAST_DAYS)
+    projected = [
+        Animal.owner_id == owner_id,
+        Animal.weight.is_not(None),
+        Animal.target_weight.is_not(None),
+        Animal.show_date > start,
+        Animal.show_date <= horizon,
+    ]
+    result = await db.execute(
+        select(
+            Animal.id,
+            Animal.name,
+            Animal.species,
+            Animal.weight,
+            Animal.target_weight,
+            Animal.show_date,
+        )
+        .where(*projected)
+        .order_by(Animal.id)
+    )
+    animals = result.all()
+    if not animals:
+        return BarnGrowth(start=start, animals=[], unprofiled_feed_ids=[])
+    last_show = max(animal.show_date for animal in animals)
+
+    result = await db.execute(
+        select(
+            RationAssignment.animal_id,
+            RationAssignment.feed_id,
+            RationAssignment.amount,
+            RationAssignment.start_date,
+            RationAssignment.end_date,
+        )
+        .join(Animal, RationAssignment.animal_id == Animal.id)
+        .where(
+            *projected,
+            RationAssignment.start_date < last_show,
+            or_(
+                RationAssignment.end_date.is_(None),
+                RationAssignment.end_date >= start,
+            ),
+        )
+    )
+    spans = result.all()
+
+    ids = np.array([animal.id for animal in animals], dtype=np.int64)
+    rows = np.searchsorted(
+        ids, np.array([span.animal_id for span in spans], dtype=np.int64)
+    )
+
+    matrix = await nutrient_matrix.load(db)
+    feed_ids = [span.feed_id for span in spans]
+    nutrients = matrix.take(feed_ids)[:, [ENERGY_COLUMN, PROTEIN_COLUMN]]
+    nutrients *= AMOUNT_SCALE[[ENERGY_COLUMN, PROTEIN_COLUMN]]
+    unprofiled = np.isnan(nutrients).any(axis=1)
+    nutrients = np.nan_to_num(nutrients)
+    amounts = np.array([span.amount for span in spans], dtype=np.float64)
+
+    days = np.array([(animal.show_date - start).days for animal in animals])
+    length = int(days.max())
+    first_days = [span.start_date for span in spans]
+    last_days = [span.end_date for span in spans]
+    energy = spread_spans(
+        rows,
+        len(ids),
+        first_days,
+        last_days,
+        amounts * nutrients[:, 0],
+        start,
+        length,
+    )
+    protein = spread_spans(
+        rows,
+        len(ids),
+        first_days,
+        last_days,
+        amounts * nutrients[:, 1],
+        start,
+        length,
+    )
+
+    coefficients = coefficient_arrays([animal.species for animal in animals])
+    weights = np.array([animal.weight for animal in animals], dtype=np.float64)
+    targets = np.array([animal.target_weight for animal in animals])
+    trajectory = await run_in_threadpool(
+        simulate_growth, weights, energy, protein, days, coefficients
+    )
+
+    # Average supply over each animal's own days
+    within = np.arange(length) < days[:, None]
+    adjustments = suggest_adjustments(
+        weights,
+        targets,
+        days,
+        (energy * within).sum(axis=1) / days,
+        (protein * within).sum(axis=1) / days,
+        coefficients,
+    )
+    final = trajectory[np.arange(len(ids)), days]
+    unreachable = adjustments["required_gain"] > coefficients["max_gain"]
+    behind = final < targets * (1 - TARGET_TOLERANCE)
+    ahead = final > targets * (1 + TARGET_TOLERANCE)
+
+    growth = []
+    for i, animal in enumerate(animals):
+        if unreachable[i]:
+            status = GrowthStatus.UNREACHABLE
+        elif behind[i]:
+            status = GrowthStatus.BEHIND
+        elif ahead[i]:
+            status = GrowthStatus.AHEAD
+        else:
+            status = GrowthStatus.ON_TRACK
+        adjustment = None
+        if status is not GrowthStatus.ON_TRACK:
+            scale = adjustments["scale"][i]
+            adjustment = RationAdjustment(
+                required_daily_gain=float(adjustments["required_gain"][i]),
+                energy_change=float(adjustments["energy_change"][i]),
+                protein_change=float(adjustments["protein_change"][i]),
+                ration_scale=None if np.isnan(scale) else float(scale),
+            )
+        growth.append(
+            AnimalGrowth(
+                animal_id=animal.id,
+                name=animal.name,
+                species=animal.species,
+                show_date=animal.show_date,
+                target_weight=animal.target_weight,
+                weights=trajectory[i, : days[i] + 1].tolist(),
+                final_weight=float(final[i]),
+                status=status,
+                adjustment=adjustment,
+            )
+        )
+    return BarnGrowth(
+        start=start,
+        animals=growth,
+        unprofiled_feed_ids=sorted(
+            {feed_id for feed_id, bad in zip(feed_ids, unprofiled) if bad}
+        ),
+    )
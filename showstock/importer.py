@@ -0,0 +1,276 @@
+"""
+Streaming import of manufacturer feed catalogs.
+
+A catalog is a CSV file with one feed per row and the columns `brand`,
+`name` and `feed_type`, plus optional `density`, `weight` and `cost`. The
+file is parsed incrementally and loaded in fixed-size batches: the brands of
+each batch are resolved or created with one upsert and its feeds are written
+with one bulk insert, so memory stays bounded however large the file is.
+
+Run from the command line with:
+
+    python -m showstock.importer catalog.csv
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from pydantic import BaseModel, ValidationError, field_validator
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from showstock.bulk import insert_feeds, upsert_brands
+from showstock.models import Brand, Feed
+from showstock.models.feed import FeedType
+from showstock.notify import publish_catalog_change
+
+# Number of CSV rows parsed and written per batch
+IMPORT_BATCH_SIZE = 1000
+
+# Maximum number of rejected rows described in a report
+MAX_REPORTED_REJECTS = 1000
+
+REQUIRED_COLUMNS = {"brand", "name", "feed_type"}
+
+
+class FeedImportRow(BaseModel):
+    """A single validated row of a feed catalog."""
+
+    brand: str
+    name: str
+    feed_type: FeedType
+    density: Optional[float] = None
+    weight: Optional[float] = None
+    cost: Optional[float] = None
+
+    @field_validator("density", "weight", "cost", mode="before")
+    @classmethod
+    def blank_to_none(cls, value: object) -> object:
+        """Treat empty spreadsheet cells as missing values."""
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
+    @field_validator("brand", "name")
+    @classmethod
+    def not_blank(cls, value: str) -> str:
+        """Strip names and reject empty ones."""
+        value = value.strip()
+        if not value:
+            raise ValueError("must not be blank")
+        return value
+
+
+class ImportInterrupted(ValueError):
+    """
+    Raised when a catalog cannot be read to the end.
+
+    Batches before the failure are already committed; `report` counts them.
+    """
+
+    def __init__(self, cause: Exception, report: "ImportReport"):
+        """
+        Initialize the error.
+
+        Args:
+            cause: Error reading the catalog
+            report: Report of the batches committed before it
+        """
+        detail = str(cause)
+        if report.rows_read:
+            detail += (
+                f" (after {report.rows_read} rows; the {report.feeds_created} "
+                f"feeds imported from them were kept)"
+            )
+        super().__init__(detail)
+        self.report = report
+
+
+class ImportReject(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportReport(BaseModel):
+    rows_read: int = 0
+    feeds_created: int = 0
+    brands_resolved: int = 0
+    rejected: int = 0
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+    rejects: List[ImportReject] = []
+
+
+def read_catalog(stream: TextIO) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Parse a catalog CSV lazily.
+
+    Header names are matched case-insensitively.
+
+    Args:
+        stream: Text stream positioned at the header row
+
+    Yields:
+        Tuples of (line number, row) for each data row
+
+    Raises:
+        ValueError: If required columns are missing from the header
+    """
+    reader = csv.reader(stream)
+    header = [column.strip().lower() for column in next(reader, [])]
+    missing = REQUIRED_COLUMNS.difference(header)
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
+    for row in reader:
+        if any(cell.strip() for cell in row):
+            yield reader.line_num, dict(zip(header, row))
+
+
+def _validate_batch(
+    batch: Sequence[Tuple[int, Dict[str, str]]], report: ImportReport
+) -> List[Tuple[int, FeedImportRow]]:
+    """Validate parsed rows, recording rejects on the report."""
+    valid = []
+    for line, row in batch:
+        try:
+            valid.append((line, FeedImportRow.model_validate(row)))
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            _reject(report, line, f"{field}: {error['msg']}")
+    return valid
+
+
+def _reject(report: ImportReport, line: int, detail: str) -> None:
+    """Count a rejected row, keeping the first few for the report."""
+    report.rejected += 1
+    if len(report.rejects) < MAX_REPORTED_REJECTS:
+        report.rejects.append(ImportReject(line=line, detail=detail))
+
+
+async def import_feeds(
+    db: AsyncSession,
+    rows: Iterable[Tuple[int, Dict[str, str]]],
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> ImportReport:
+    """
+    Load parsed catalog rows into the database in batches.
+
+    Reading from `rows` happens in a worker thread so that file I/O does not
+    block the event loop. Each batch is committed on its own, so a failure
+    part-way through keeps the batches already loaded.
+
+    Args:
+        db: Database session
+        rows: Tuples of (line number, row), e.g. from `read_catalog`
+        batch_size: Number of rows per batch
+
+    Returns:
+        Counts, throughput and rejected rows for the import
+
+    Raises:
+        ImportInterrupted: If the rows cannot be read to the end, such as
+            for malformed CSV or text that is not UTF-8
+    """
+    report = ImportReport()
+    brand_ids: Dict[str, int] = {}
+    iterator = iter(rows)
+    started = time.perf_counter()
+
+    while True:
+        try:
+            batch = await run_in_threadpool(
+                lambda: list(itertools.islice(iterator, batch_size))
+            )
+        except (csv.Error, ValueError) as e:
+            _finish(report, len(brand_ids), started)
+            raise ImportInterrupted(e, report) from e
+        if not batch:
+            break
+        report.rows_read += len(batch)
+        valid = _validate_batch(batch, report)
+
+        new_names = {row.brand for _, row in valid if row.brand not in brand_ids}
+        brands = await upsert_brands(db, sorted(new_names))
+        for brand in brands:
+            brand_ids[brand["name"]] = brand["id"]
+        created_brands = [brand["id"] for brand in brands if brand["created"]]
+        if created_brands:
+            await publish_catalog_change(db, Brand.__tablename__, created_brands)
+
+        feeds = [
+            {
+                "brand_id": brand_ids[row.brand],
+                **row.model_dump(exclude={"brand"}),
+            }
+            for _, row in valid
+        ]
+        created = await insert_feeds(db, feeds)
+        if created:
+            await publish_catalog_change(
+                db, Feed.__tablename__, [feed["id"] for feed in created]
+            )
+        report.feeds_created += len(created)
+        await db.commit()
+
+    _finish(report, len(brand_ids), started)
+    return report
+
+
+def _finish(report: ImportReport, brands_resolved: int, started: float) -> None:
+    """Fill in the totals and throughput of a report."""
+    report.brands_resolved = brands_resolved
+    report.elapsed_seconds = time.perf_counter() - started
+    if report.elapsed_seconds > 0:
+        report.rows_per_second = report.rows_read / report.elapsed_seconds
+
+
+async def _import_file(path: str, batch_size: int) -> ImportReport:
+    """Import a catalog file using an application database session."""
+    from showstock.db import close_db, get_db_session
+
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as stream:
+            async with get_db_session() as session:
+                return await import_feeds(session, read_catalog(stream), batch_size)
+    finally:
+        await close_db()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for importing a feed catalog."""
+    parser = argparse.ArgumentParser(
+        description="Import a manufacturer feed catalog from a CSV file."
+    )
+    parser.add_argument("path", help="Path to the catalog CSV file")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=IMPORT_BATCH_SIZE,
+        help=f"Rows per batch (default: {IMPORT_BATCH_SIZE})",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        report = asyncio.run(_import_file(args.path, args.batch_size))
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+
+    print(
+        f"Read {report.rows_read} rows, created {report.feeds_created} feeds "
+        f"across {report.brands_resolved} brands, rejected {report.rejected} "
+        f"in {report.elapsed_seconds:.2f}s ({report.rows_per_second:.0f} rows/s)"
+    )
+    for reject in report.rejects:
+        print(f"line {reject.line}: {reject.detail}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Feed inventory ledger and days-on-hand projection.
+
+Stock movements are appended to `inventory_events`. Each event also adds its
+change to the feed's row in `inventory_balances` with a single
+INSERT ... ON CONFLICT DO UPDATE ... RETURNING, so the current balance is
+maintained as events arrive and is never re-summed from the event history.
+The returned balance is stored on the event too, giving the ledger its
+running balance column for free. Concurrent events for the same feed and
+location serialize on the balance row.
+
+Days on hand combine the balances across a user's locations with the daily
+amounts of the rations assigned to the user's animals, in one query.
+"""
+
+import datetime
+import math
+from typing import List, Optional
+
+from pydantic import BaseModel, model_validator
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.bulk import upsert_insert
+from showstock.models import (
+    Animal,
+    Feed,
+    InventoryBalance,
+    InventoryEvent,
+    InventoryLocation,
+    RationAssignment,
+)
+from showstock.models.inventory import InventoryEventKind
+
+# Balances this far below zero are rounding error rather than missing stock
+BALANCE_TOLERANCE = 1e-9
+
+
+class InventoryEventCreate(BaseModel):
+    feed_id: int
+    kind: InventoryEventKind
+    # kg; signed for adjustments
+    quantity: float
+    occurred_at: Optional[datetime.datetime] = None
+
+    @model_validator(mode="after")
+    def valid_quantity(self) -> "InventoryEventCreate":
+        """Require positive receipts and usage, and non-zero adjustments."""
+        if self.kind is InventoryEventKind.ADJUSTMENT:
+            if self.quantity == 0:
+                raise ValueError("adjustments must change the stock")
+        elif self.quantity <= 0:
+            raise ValueError(f"{self.kind.value} quantity must be positive")
+        return self
+
+
+class InventoryEventResponse(BaseModel):
+    id: int
+    location_id: int
+    feed_id: int
+    kind: InventoryEventKind
+    quantity: float
+    occurred_at: datetime.datetime
+    balance: float
+
+    class Config:
+        from_attributes = True
+
+
+class FeedBalance(BaseModel):
+    feed_id: int
+    quantity: float
+
+
+class DaysOnHand(BaseModel):
+    feed_id: int
+    name: str
+    quantity: float
+    daily_usage: float
+    days_on_hand: Optional[float] = None
+    run_out_date: Optional[datetime.date] = None
+
+
+class InsufficientStock(Exception):
+    """An event would take a feed's stock at a location below zero."""
+
+    def __init__(self, available: float):
+        super().__init__(f"Only {available:g} kg in stock")
+        self.available = available
+
+
+async def record_event(
+    db: AsyncSession, location_id: int, event: InventoryEventCreate
+) -> InventoryEvent:
+    """
+    Append an event to the ledger and apply it to the running balance.
+
+    The caller is responsible for committing, and for rolling back if the
+    event is rejected.
+
+    Args:
+        db: Database session
+        location_id: Location whose stock changes
+        event: The receipt, usage or adjustment
+
+    Returns:
+        The recorded event, with the balance after it
+
+    Raises:
+        InsufficientStock: If the event would leave a negative balance
+    """
+    change = (
+        -event.quantity if event.kind is InventoryEventKind.USAGE else event.quantity
+    )
+    statement = upsert_insert(db, InventoryBalance).values(
+        location_id=location_id, feed_id=event.feed_id, quantity=change
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[InventoryBalance.location_id, InventoryBalance.feed_id],
+        set_={"quantity": InventoryBalance.quantity + statement.excluded.quantity},
+    ).returning(InventoryBalance.quantity)
+    balance = (await db.execute(statement)).scalar_one()
+    if balance < -BALANCE_TOLERANCE:
+        raise InsufficientStock(balance - change)
+
+    db_event = InventoryEvent(
+        location_id=location_id,
+        feed_id=event.feed_id,
+        kind=event.kind,
+        quantity=change,
+        occurred_at=event.occurred_at or datetime.datetime.now(datetime.timezone.utc),
+        balance=balance,
+    )
+    db.add(db_event)
+    await db.flush()
+    return db_event
+
+
+async def days_on_hand(
+    db: AsyncSession, owner_id: int, on: datetime.date
+) -> List[DaysOnHand]:
+    """
+    Project how long each feed a user stocks or feeds will last.
+
+    Stock is summed across all of the user's locations and usage across the
+    rations assigned to the user's animals on `on`, in a single query.
+
+    Args:
+        db: Database session
+        owner_id: User whose stock and animals are counted
+        on: Day whose ration assignments set the daily usage
+
+    Returns:
+        One entry per feed in stock or in use, soonest to run out first.
+        Feeds not in use have no days on hand.
+    """
+    stock = (
+        select(
+            InventoryBalance.feed_id,
+            func.sum(InventoryBalance.quantity).label("quantity"),
+        )
+        .join(InventoryLocation, InventoryBalance.location_id == InventoryLocation.id)
+        .where(InventoryLocation.owner_id == owner_id)
+        .group_by(InventoryBalance.feed_id)
+        .subquery()
+    )
+    usage = (
+        select(
+            RationAssignment.feed_id,
+            func.sum(RationAssignment.amount).label("amount"),
+        )
+        .join(Animal, RationAssignment.animal_id == Animal.id)
+        .where(
+            Animal.owner_id == owner_id,
+            RationAssignment.start_date <= on,
+            or_(RationAssignment.end_date.is_(None), RationAssignment.end_date >= on),
+        )
+        .group_by(RationAssignment.feed_id)
+        .subquery()
+    )
+    quantity = func.coalesce(stock.c.quantity, 0.0)
+    daily_usage = func.coalesce(usage.c.amount, 0.0)
+    in_stock = case((quantity > 0, quantity), else_=0.0)
+    days = case((daily_usage > 0, in_stock / daily_usage))
+    result = await db.execute(
+        select(Feed.id, Feed.name, quantity, daily_usage, days.label("days"))
+        .outerjoin(stock, stock.c.feed_id == Feed.id)
+        .outerjoin(usage, usage.c.feed_id == Feed.id)
+        .where(or_(stock.c.feed_id.is_not(None), usage.c.feed_id.is_not(None)))
+        .order_by(days.is_(None), days, Feed.id)
+    )
+    return [
+        DaysOnHand(
+            feed_id=row[0],
+            name=row[1],
+            quantity=row[2],
+            daily_usage=row[3],
+            days_on_hand=row[4],
+            run_out_date=(
+                None
+                if row[4] is None
+                else on + datetime.timedelta(days=math.floor(row[4]))
+            ),
+        )
+        for row in result.all()
+    ]
@@ -1,9 +1,14 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from showstock.cache import cache_stats
 from showstock.config import settings
 from showstock.db import get_db, init_db, close_db
+from showstock.events import EVENT_STREAM_MEDIA_TYPE, TooManySubscribers, catalog_events
+from showstock.notify import catalog_listener
+from showstock.prices import price_partitions
 
 # Import models to register them with SQLAlchemy
 import showstock.models  # noqa
@@ -25,11 +30,17 @@ app.include_router(api_router)
 async def startup_event():
     """Initialize connections and resources on application startup."""
     await init_db()
+    await price_partitions.start()
+    await catalog_listener.start()
+    await catalog_events.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Close connections and free resources on application shutdown."""
+    await catalog_events.stop()
+    await catalog_listener.stop()
+    await price_partitions.stop()
     await close_db()
 
 
@@ -45,6 +56,37 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/cache-stats")
+async def cache_statistics():
+    """Catalog cache hit, miss and eviction counters for this worker."""
+    return cache_stats()
+
+
+@app.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {EVENT_STREAM_MEDIA_TYPE: {}}}},
+)
+async def catalog_event_stream():
+    """
+    Stream brand and feed creates, updates and deletes as server-sent events.
+
+    Events are named after their table, carry the same data as an entry of
+    `/api/changes`, and have its token as their ID. A client that falls
+    behind gets a `resync` event and should catch up through `/api/changes`
+    before subscribing again.
+    """
+    try:
+        subscription = await catalog_events.subscribe()
+    except TooManySubscribers:
+        raise HTTPException(status_code=503, detail="Too many subscribers")
+    return StreamingResponse(
+        subscription.stream(),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/db-test")
 async def db_test(db: AsyncSession = Depends(get_db)):
     """Test database connection."""
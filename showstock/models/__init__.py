@@ -2,7 +2,29 @@
 Models package for the Showstock application.
 """
 
+from showstock.models.animal import Animal, RationAssignment
+from showstock.models.catalog import CatalogTombstone, CatalogVersion
 from showstock.models.feed import Brand, Feed
+from showstock.models.inventory import (
+    InventoryBalance,
+    InventoryEvent,
+    InventoryLocation,
+)
+from showstock.models.nutrition import NutrientProfile
+from showstock.models.price import FeedPrice
 from showstock.models.user import User
 
-__all__ = ["Brand", "Feed", "User"]
+__all__ = [
+    "Animal",
+    "Brand",
+    "CatalogTombstone",
+    "CatalogVersion",
+    "Feed",
+    "FeedPrice",
+    "InventoryBalance",
+    "InventoryEvent",
+    "InventoryLocation",
+    "NutrientProfile",
+    "RationAssignment",
+    "User",
+]
@@ -0,0 +1,72 @@
+"""
+Animal-related models for the Showstock application.
+"""
+
+import enum
+
+from sqlalchemy import Column, Date, Enum, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
+
+from showstock.db import Base
+
+
+class Species(str, enum.Enum):
+    """Enum for livestock species."""
+
+    CATTLE = "cattle"
+    SHEEP = "sheep"
+    GOAT = "goat"
+    SWINE = "swine"
+
+
+class Animal(Base):
+    """Animal model for livestock raised by a user."""
+
+    __tablename__ = "animals"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    species = Column(Enum(Species), nullable=False)
+    # Current weight and show weigh-in target, in kg
+    weight = Column(Float, nullable=True)
+    target_weight = Column(Float, nullable=True)
+    show_date = Column(Date, nullable=True)
+
+    owner = relationship("User")
+    rations = relationship("RationAssignment", back_populates="animal")
+
+    def __repr__(self):
+        return f"<Animal({self.id}, '{self.name}', owner={self.owner_id})>"
+
+
+class RationAssignment(Base):
+    """Daily amount of a feed fed to an animal over a date range."""
+
+    __tablename__ = "ration_assignments"
+    __table_args__ = (
+        # Support forecasting consumption over a date range
+        Index("ix_ration_assignments_start_date_end_date", "start_date", "end_date"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    animal_id = Column(
+        Integer,
+        ForeignKey("animals.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    feed_id = Column(Integer, ForeignKey("feeds.id"), nullable=False, index=True)
+    # kg of feed per day
+    amount = Column(Float, nullable=False)
+    start_date = Column(Date, nullable=False)
+    # Last day fed, inclusive; open-ended if unset
+    end_date = Column(Date, nullable=True)
+
+    animal = relationship("Animal", back_populates="rations")
+
+    def __repr__(self):
+        return (
+            f"<RationAssignment(animal={self.animal_id}, feed={self.feed_id}, "
+            f"amount={self.amount})>"
+        )
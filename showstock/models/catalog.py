@@ -0,0 +1,35 @@
+"""
+Catalog bookkeeping models for the Showstock application.
+"""
+
+from sqlalchemy import BigInteger, Column, Integer, String
+
+from showstock.db import Base
+
+
+class CatalogVersion(Base):
+    """Per-table counter bumped by every write to a catalog table."""
+
+    __tablename__ = "catalog_versions"
+
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CatalogVersion('{self.table_name}', version={self.version})>"
+
+
+class CatalogTombstone(Base):
+    """Record of a deleted brand or feed, kept for the changefeed."""
+
+    __tablename__ = "catalog_tombstones"
+
+    change_seq = Column(BigInteger, primary_key=True, autoincrement=False)
+    table_name = Column(String, nullable=False)
+    row_id = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<CatalogTombstone({self.change_seq}, '{self.table_name}', "
+            f"row={self.row_id})>"
+        )
@@ -2,7 +2,16 @@
 Feed-related models for the Showstock application.
 """
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Integer,
+    String,
+    Float,
+    ForeignKey,
+    Enum,
+    Index,
+)
 from sqlalchemy.orm import relationship
 import enum
 
@@ -20,9 +29,22 @@ class Brand(Base):
     """Brand model for feed manufacturers."""
 
     __tablename__ = "brands"
+    __table_args__ = (
+        # Trigram index for name search; requires the pg_trgm extension
+        Index(
+            "ix_brands_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False, unique=True)
+    # Bumped by every update, for optimistic concurrency via If-Match
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Position of the latest write in the catalog changefeed
+    change_seq = Column(BigInteger, nullable=True, index=True)
 
     # Relationship to Feed model
     feeds = relationship("Feed", back_populates="brand")
@@ -35,6 +57,18 @@ class Feed(Base):
     """Feed model for animal feed products."""
 
     __tablename__ = "feeds"
+    __table_args__ = (
+        # Support keyset pagination of filtered feed listings
+        Index("ix_feeds_brand_id_id", "brand_id", "id"),
+        Index("ix_feeds_feed_type_id", "feed_type", "id"),
+        # Trigram index for name search; requires the pg_trgm extension
+        Index(
+            "ix_feeds_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     brand_id = Column(Integer, ForeignKey("brands.id"), nullable=False)
@@ -43,6 +77,10 @@ class Feed(Base):
     feed_type = Column(Enum(FeedType), nullable=False)
     weight = Column(Float, nullable=True)
     cost = Column(Float, nullable=True)
+    # Bumped by every update, for optimistic concurrency via If-Match
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Position of the latest write in the catalog changefeed
+    change_seq = Column(BigInteger, nullable=True, index=True)
 
     # Relationship to Brand model
     brand = relationship("Brand", back_populates="feeds")
@@ -0,0 +1,89 @@
+"""
+Inventory models for the Showstock application.
+"""
+
+import enum
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+
+from showstock.db import Base
+
+
+class InventoryEventKind(str, enum.Enum):
+    """Enum for inventory ledger events."""
+
+    RECEIPT = "receipt"
+    USAGE = "usage"
+    # Signed correction after a stock count
+    ADJUSTMENT = "adjustment"
+
+
+class InventoryLocation(Base):
+    """Place where a user keeps feed, such as a barn or trailer."""
+
+    __tablename__ = "inventory_locations"
+    __table_args__ = (UniqueConstraint("owner_id", "name"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    name = Column(String, nullable=False)
+
+    def __repr__(self):
+        return f"<InventoryLocation({self.id}, '{self.name}', owner={self.owner_id})>"
+
+
+class InventoryEvent(Base):
+    """Receipt, usage or adjustment of a feed's stock at a location."""
+
+    __tablename__ = "inventory_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    location_id = Column(
+        Integer,
+        ForeignKey("inventory_locations.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    feed_id = Column(Integer, ForeignKey("feeds.id"), nullable=False)
+    kind = Column(Enum(InventoryEventKind), nullable=False)
+    # kg; the signed change in stock
+    quantity = Column(Float, nullable=False)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    # kg of the feed at the location after this event, in recording order
+    balance = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<InventoryEvent({self.id}, location={self.location_id}, "
+            f"feed={self.feed_id}, quantity={self.quantity})>"
+        )
+
+
+class InventoryBalance(Base):
+    """Current stock of a feed at a location, kept up to date by each event."""
+
+    __tablename__ = "inventory_balances"
+
+    location_id = Column(
+        Integer,
+        ForeignKey("inventory_locations.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    feed_id = Column(Integer, ForeignKey("feeds.id"), primary_key=True)
+    # kg
+    quantity = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<InventoryBalance(location={self.location_id}, feed={self.feed_id}, "
+            f"quantity={self.quantity})>"
+        )
@@ -0,0 +1,50 @@
+"""
+Nutrition models for the Showstock application.
+"""
+
+from sqlalchemy import Column, Float, ForeignKey, Integer
+
+from showstock.db import Base
+
+# Nutrient columns of a profile, in the column order of the nutrient matrix.
+# Macronutrients and macrominerals are percentages of the feed's as-fed
+# weight, digestible energy is in Mcal per kg and trace minerals are in ppm.
+NUTRIENTS = (
+    "crude_protein",
+    "crude_fat",
+    "crude_fiber",
+    "digestible_energy",
+    "calcium",
+    "phosphorus",
+    "sodium",
+    "potassium",
+    "magnesium",
+    "zinc",
+    "copper",
+    "selenium",
+)
+
+
+class NutrientProfile(Base):
+    """Guaranteed or analysed nutrient content of a feed."""
+
+    __tablename__ = "nutrient_profiles"
+
+    feed_id = Column(
+        Integer, ForeignKey("feeds.id", ondelete="CASCADE"), primary_key=True
+    )
+    crude_protein = Column(Float, nullable=True)
+    crude_fat = Column(Float, nullable=True)
+    crude_fiber = Column(Float, nullable=True)
+    digestible_energy = Column(Float, nullable=True)
+    calcium = Column(Float, nullable=True)
+    phosphorus = Column(Float, nullable=True)
+    sodium = Column(Float, nullable=True)
+    potassium = Column(Float, nullable=True)
+    magnesium = Column(Float, nullable=True)
+    zinc = Column(Float, nullable=True)
+    copper = Column(Float, nullable=True)
+    selenium = Column(Float, nullable=True)
+
+    def __repr__(self):
+        return f"<NutrientProfile(feed={self.feed_id})>"
@@ -0,0 +1,34 @@
+"""
+Price history models for the Showstock application.
+"""
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer
+from sqlalchemy import PrimaryKeyConstraint
+
+from showstock.db import Base
+
+
+class FeedPrice(Base):
+    """Cost of a feed from the time it was recorded until the next change."""
+
+    __tablename__ = "feed_prices"
+    __table_args__ = (
+        # Carry the cost in the key index so as-of lookups are index-only
+        PrimaryKeyConstraint("feed_id", "recorded_at", postgresql_include=["cost"]),
+        # Monthly partitions on PostgreSQL; see showstock.prices
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
+
+    feed_id = Column(
+        Integer, ForeignKey("feeds.id", ondelete="CASCADE"), nullable=False
+    )
+    # Stored in UTC
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
+    # Unset when the feed's cost was cleared
+    cost = Column(Float, nullable=True)
+
+    def __repr__(self):
+        return (
+            f"<FeedPrice(feed={self.feed_id}, at={self.recorded_at}, "
+            f"cost={self.cost})>"
+        )
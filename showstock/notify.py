@@ -0,0 +1,229 @@
+"""
+Cross-worker invalidation of the catalog caches.
+
+Every catalog write bumps the table's row in `catalog_versions` and, on
+PostgreSQL, sends a NOTIFY on the catalog channel from the same transaction,
+so the notification is only delivered if the write commits. Each worker runs
+a `CatalogListener` that holds one dedicated asyncpg connection, outside the
+SQLAlchemy pool, listening on that channel and invalidating its local cache
+entries. On other backends, such as the SQLite database used in tests, the
+listener instead polls `catalog_versions` and drops a table's cached entries
+whenever its version moves.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Sequence
+
+import asyncpg
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from showstock.bulk import upsert_insert
+from showstock.cache import (
+    brand_cache,
+    clear_caches,
+    feed_cache,
+    invalidate_brands,
+    invalidate_feeds,
+)
+from showstock.changes import CHANGE_COUNTER, record_changes
+from showstock.config import settings
+from showstock.db import engine
+from showstock.models import Brand, CatalogVersion, Feed, NutrientProfile
+from showstock.nutrition import nutrient_matrix
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# PostgreSQL channel carrying catalog change notifications
+CATALOG_CHANNEL = "showstock_catalog"
+
+# Notifications naming more IDs than this invalidate the whole table instead,
+# keeping payloads well under PostgreSQL's 8000 byte limit
+MAX_NOTIFY_IDS = 500
+
+# Errors of the listener connection that are retried by reconnecting;
+# asyncpg raises InterfaceError, for one, on a connection already closed
+CONNECTION_ERRORS = (OSError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+
+async def publish_catalog_change(
+    db: AsyncSession,
+    table: str,
+    ids: Optional[Sequence[int]] = None,
+    deleted: bool = False,
+) -> None:
+    """
+    Record a write to a catalog table in the current transaction.
+
+    Call this before committing the write. Other workers see the change once
+    the transaction commits. Written brands and feeds are also entered in
+    the changefeed, which needs their IDs.
+
+    Args:
+        db: Database session performing the write
+        table: Name of the table written to
+        ids: IDs of the rows written, or None if unknown
+        deleted: Whether the rows were deleted rather than inserted or
+            updated
+    """
+    if ids is not None:
+        await record_changes(db, table, ids, deleted)
+
+    statement = upsert_insert(db, CatalogVersion).values(table_name=table, version=1)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[CatalogVersion.table_name],
+            set_={"version": CatalogVersion.version + 1},
+        )
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        if ids is not None and len(ids) > MAX_NOTIFY_IDS:
+            ids = None
+        payload = json.dumps(
+            {"table": table, "ids": None if ids is None else list(ids)}
+        )
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CATALOG_CHANNEL, "payload": payload},
+        )
+
+
+def apply_catalog_change(table: str, ids: Optional[Sequence[int]] = None) -> None:
+    """
+    Invalidate local cache entries for a catalog change.
+
+    Args:
+        table: Name of the table written to
+        ids: IDs of the rows written, or None to drop the whole table
+    """
+    if table == Brand.__tablename__:
+        if ids is None:
+            brand_cache.clear()
+        invalidate_brands(*(ids or ()))
+    elif table == Feed.__tablename__:
+        if ids is None:
+            feed_cache.clear()
+        invalidate_feeds(*(ids or ()))
+    elif table == NutrientProfile.__tablename__:
+        nutrient_matrix.invalidate(ids)
+
+
+async def read_catalog_versions(db_engine: AsyncEngine) -> Dict[str, int]:
+    """Read the current version of every catalog table."""
+    async with db_engine.connect() as conn:
+        result = await conn.execute(
+            select(CatalogVersion.table_name, CatalogVersion.version).where(
+                CatalogVersion.table_name != CHANGE_COUNTER
+            )
+        )
+        return {table: version for table, version in result.all()}
+
+
+class CatalogListener:
+    """
+    Background task keeping this worker's catalog caches in sync with writes
+    made by other workers.
+    """
+
+    def __init__(self, db_engine: AsyncEngine, poll_interval: float):
+        """
+        Initialize a stopped listener.
+
+        Args:
+            db_engine: Engine whose database is watched
+            poll_interval: Seconds between polls on backends without NOTIFY,
+                and between health checks and reconnects on PostgreSQL
+        """
+        self._engine = db_engine
+        self._poll_interval = poll_interval
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def start(self) -> None:
+        """Start listening in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop listening and release the listener connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Run whichever watch loop suits the database backend."""
+        if self._engine.dialect.name == "postgresql":
+            await self._listen()
+        else:
+            await self._poll()
+
+    async def _listen(self) -> None:
+        """Listen for notifications, reconnecting if the connection drops."""
+        dsn = self._engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+            except CONNECTION_ERRORS as e:
+                logger.warning(f"Catalog listener could not connect: {e}")
+                await asyncio.sleep(self._poll_interval)
+                continue
+
+            try:
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(CATALOG_CHANNEL, self._on_notify)
+                # Anything written while we were not listening was missed
+                clear_caches()
+                nutrient_matrix.invalidate()
+                logger.info("Catalog listener connected")
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), self._poll_interval)
+                    except asyncio.TimeoutError:
+                        await connection.fetchval("SELECT 1")
+            except CONNECTION_ERRORS as e:
+                logger.warning(f"Catalog listener connection failed: {e}")
+            finally:
+                try:
+                    await connection.close()
+                except CONNECTION_ERRORS as e:
+                    logger.warning(f"Catalog listener could not close: {e}")
+            logger.warning("Catalog listener disconnected, reconnecting")
+            await asyncio.sleep(self._poll_interval)
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        """Apply a catalog change notification to the local caches."""
+        try:
+            change = json.loads(payload)
+            apply_catalog_change(change["table"], change.get("ids"))
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed catalog notification: {payload!r}")
+
+    async def _poll(self) -> None:
+        """Poll the catalog versions, invalidating tables whose version moved."""
+        seen: Optional[Dict[str, int]] = None
+        while True:
+            try:
+                versions = await read_catalog_versions(self._engine)
+            except Exception as e:
+                logger.warning(f"Catalog version poll failed: {e}")
+            else:
+                if seen is not None:
+                    for table, version in versions.items():
+                        if seen.get(table) != version:
+                            apply_catalog_change(table)
+                seen = versions
+            await asyncio.sleep(self._poll_interval)
+
+
+# Listener for this worker, started with the application
+catalog_listener = CatalogListener(engine, settings.cache.POLL_INTERVAL)
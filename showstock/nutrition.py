@@ -0,0 +1,188 @@
+"""
+In-memory feed × nutrient matrix for ration calculations.
+
+Each worker keeps the nutrient profiles of the catalog as one dense float
+array with a row per feed and a column per nutrient, in the order of
+`NUTRIENTS`, so rations can be evaluated and optimized with matrix
+operations. Missing nutrient values are NaN.
+
+Writes to `nutrient_profiles` mark the affected feeds stale, either directly
+or through catalog change notifications from other workers, and only those
+rows are re-read on the next use. The matrix is reloaded in full when the
+catalog version moved without the changed feeds being known, such as on
+backends where changes are detected by polling.
+"""
+
+import asyncio
+from typing import Dict, Iterable, Optional, Sequence, Set
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from showstock.etag import get_catalog_versions
+from showstock.models import NutrientProfile
+from showstock.models.nutrition import NUTRIENTS
+
+# Columns read for each matrix row
+PROFILE_COLUMNS = [NutrientProfile.feed_id] + [
+    getattr(NutrientProfile, nutrient) for nutrient in NUTRIENTS
+]
+
+
+class NutrientMatrix:
+    """Nutrient profiles of the feed catalog as a dense feed × nutrient array."""
+
+    def __init__(self) -> None:
+        """Initialize an empty matrix that loads on first use."""
+        self.versions: Optional[Dict[str, int]] = None
+        # Feeds whose rows must be re-read, or None to reload everything
+        self._stale: Optional[Set[int]] = set()
+        self._rows: Dict[int, int] = {}
+        self._ids = np.empty(0, dtype=np.int64)
+        self._values = np.empty((0, len(NUTRIENTS)), dtype=np.float64)
+        self._size = 0
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, feed_id: object) -> bool:
+        return feed_id in self._rows
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Feed ID of each row."""
+        return self._ids[: self._size]
+
+    @property
+    def values(self) -> np.ndarray:
+        """Nutrient values, one row per feed and one column per nutrient."""
+        return self._values[: self._size]
+
+    def take(self, feed_ids: Sequence[int]) -> np.ndarray:
+        """
+        Return the nutrient rows of the given feeds.
+
+        Feeds without a profile get a row of NaN.
+        """
+        rows = np.fromiter(
+            (self._rows.get(feed_id, -1) for feed_id in feed_ids),
+            dtype=np.int64,
+            count=len(feed_ids),
+        )
+        found = rows >= 0
+        taken = np.full((len(feed_ids), len(NUTRIENTS)), np.nan)
+        taken[found] = self.values[rows[found]]
+        return taken
+
+    def set(self, feed_id: int, values: Sequence[Optional[float]]) -> None:
+        """Insert or replace a feed's row, with None for missing values."""
+        row = self._rows.get(feed_id)
+        if row is None:
+            if self._size == len(self._ids):
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._rows[feed_id] = row
+            self._ids[row] = feed_id
+        self._values[row] = np.array(values, dtype=np.float64)
+
+    def remove(self, feed_id: int) -> None:
+        """Remove a feed's row, moving the last row into its place."""
+        row = self._rows.pop(feed_id, None)
+        if row is None:
+            return
+        last = self._size - 1
+        if row != last:
+            self._ids[row] = self._ids[last]
+            self._values[row] = self._values[last]
+            self._rows[int(self._ids[row])] = row
+        self._size = last
+
+    def _grow(self) -> None:
+        """Double the capacity of the backing arrays."""
+        capacity = max(16, 2 * len(self._ids))
+        ids = np.empty(capacity, dtype=np.int64)
+        values = np.empty((capacity, len(NUTRIENTS)), dtype=np.float64)
+        ids[: self._size] = self.ids
+        values[: self._size] = self.values
+        self._ids, self._values = ids, values
+
+    def _replace(self, ids: np.ndarray, values: np.ndarray) -> None:
+        """Replace every row at once."""
+        self._ids, self._values = ids, values
+        self._size = len(ids)
+        self._rows = {int(feed_id): row for row, feed_id in enumerate(ids)}
+
+    def invalidate(self, feed_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        Mark feeds stale after their profiles were written.
+
+        Args:
+            feed_ids: IDs of the feeds written, or None to reload every row
+        """
+        if feed_ids is None or self._stale is None:
+            self._stale = None
+        else:
+            self._stale.update(feed_ids)
+
+    def clear(self) -> None:
+        """Drop every row so the next use reloads the matrix."""
+        self._replace(
+            np.empty(0, dtype=np.int64),
+            np.empty((0, len(NUTRIENTS)), dtype=np.float64),
+        )
+        self.versions = None
+        self._stale = set()
+
+    async def load(self, db: AsyncSession) -> "NutrientMatrix":
+        """
+        Bring the matrix up to date with the database and return it.
+
+        Args:
+            db: Database session
+        """
+        versions = await get_catalog_versions(db, [NutrientProfile.__tablename__])
+        if versions == self.versions and not self._stale:
+            return self
+        async with self._lock:
+            stale, self._stale = self._stale, set()
+            if self.versions is None or stale is None:
+                await self._reload(db)
+            elif stale:
+                await self._refresh(db, stale)
+            elif versions != self.versions:
+                # Changed elsewhere before we heard which feeds changed
+                await self._reload(db)
+            self.versions = versions
+        return self
+
+    async def _reload(self, db: AsyncSession) -> None:
+        """Read every profile into a new matrix."""
+        result = await db.execute(select(*PROFILE_COLUMNS))
+        rows = result.all()
+
+        def build() -> np.ndarray:
+            table = np.array([tuple(row) for row in rows], dtype=np.float64)
+            return table.reshape(-1, len(PROFILE_COLUMNS))
+
+        table = await run_in_threadpool(build)
+        self._replace(table[:, 0].astype(np.int64), table[:, 1:].copy())
+
+    async def _refresh(self, db: AsyncSession, feed_ids: Set[int]) -> None:
+        """Re-read the rows of the given feeds."""
+        result = await db.execute(
+            select(*PROFILE_COLUMNS).where(NutrientProfile.feed_id.in_(feed_ids))
+        )
+        found = set()
+        for feed_id, *values in result.all():
+            self.set(feed_id, values)
+            found.add(feed_id)
+        for feed_id in feed_ids - found:
+            self.remove(feed_id)
+
+
+# Nutrient matrix for this worker
+nutrient_matrix = NutrientMatrix()
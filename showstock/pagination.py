@@ -0,0 +1,55 @@
+"""
+Keyset pagination helpers for the Showstock API.
+
+List endpoints page through rows ordered by primary key. The position of a
+page is handed back to clients as an opaque cursor token so the encoding can
+change without breaking them.
+"""
+
+import base64
+import json
+
+# Default and maximum number of rows returned by a single list request
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Encode the last primary key of a page as an opaque cursor token.
+
+    Args:
+        last_id: Primary key of the last row on the current page
+
+    Returns:
+        URL-safe cursor token
+    """
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> int:
+    """
+    Decode a cursor token produced by `encode_cursor`.
+
+    Args:
+        token: Cursor token supplied by the client
+
+    Returns:
+        Primary key after which the next page starts
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = payload["id"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {token!r}") from e
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValueError(f"Invalid cursor: {token!r}")
+    return last_id
@@ -0,0 +1,350 @@
+"""
+Feed price history.
+
+Every cost written to a feed is also appended to `feed_prices` with the time
+it took effect, so the catalog can be priced as of any past moment and price
+trends charted. On PostgreSQL the table is range-partitioned by month:
+queries over a period only touch its months, and old months can be detached
+or dropped whole. Each worker creates partitions ahead of time at startup
+and daily after that, and a default partition catches anything outside
+them. Rows the default partition caught for a month are moved into that
+month's partition when it is created.
+
+The primary key on (feed_id, recorded_at) carries the cost as an included
+column, so an as-of lookup is one backward index probe per feed that never
+visits the table. Trends are aggregated per period in SQL.
+"""
+
+import asyncio
+import datetime
+import enum
+import logging
+from typing import Any, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import Date, case, cast, func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.sql import Select
+
+from showstock.db import engine
+from showstock.models import Feed, FeedPrice
+from showstock.models.feed import FeedType
+
+logger = logging.getLogger(__name__)
+
+# Monthly partitions are kept this many months ahead of the current one
+PARTITION_MONTHS_AHEAD = 3
+
+# Seconds between checks that the partitions ahead exist
+PARTITION_CHECK_INTERVAL = 24 * 60 * 60
+
+# Partition catching prices outside the monthly ones, see the migration
+DEFAULT_PARTITION = "feed_prices_default"
+
+
+class TrendInterval(str, enum.Enum):
+    """Length of the periods price trends are aggregated over."""
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class TrendGroup(str, enum.Enum):
+    """Catalog attribute price trends are broken down by."""
+
+    BRAND = "brand"
+    FEED_TYPE = "feed_type"
+
+
+class FeedPriceAsOf(BaseModel):
+    id: int
+    cost: Optional[float] = None
+
+
+class PriceTrendPoint(BaseModel):
+    period: datetime.date
+    brand_id: Optional[int] = None
+    feed_type: Optional[FeedType] = None
+    changes: int
+    average_cost: float
+    min_cost: float
+    max_cost: float
+    average_cost_per_weight: Optional[float] = None
+
+
+def to_utc(moment: datetime.datetime) -> datetime.datetime:
+    """Express a time in UTC, taking naive times to be in UTC already."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.astimezone(datetime.timezone.utc)
+
+
+def _now() -> datetime.datetime:
+    """Return the current time in UTC."""
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+async def record_prices(
+    db: AsyncSession,
+    prices: Iterable[Tuple[int, Optional[float]]],
+    at: Optional[datetime.datetime] = None,
+) -> None:
+    """
+    Append feed costs to the price history in one statement.
+
+    The caller is responsible for committing, so history is written in the
+    same transaction as the costs themselves. Without `at`, PostgreSQL stamps
+    the costs with the transaction's start time, so workers with skewed
+    clocks still record prices in commit order. A second cost for a feed at
+    the same moment replaces the first instead of failing the write.
+
+    Args:
+        db: Database session
+        prices: (feed ID, cost) pairs, with None for a cleared cost; the
+            last cost given for a feed wins
+        at: When the costs took effect; defaults to now
+    """
+    latest = dict(prices)
+    if not latest:
+        return
+    dialect = db.get_bind().dialect.name
+    if at is not None:
+        recorded_at: Any = to_utc(at)
+    elif dialect == "postgresql":
+        recorded_at = func.now()
+    else:
+        recorded_at = _now()
+
+    # Chosen here rather than with bulk.upsert_insert, since the bulk
+    # helpers record prices through this module
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = dialect_insert(FeedPrice).values(recorded_at=recorded_at)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[FeedPrice.feed_id, FeedPrice.recorded_at],
+            set_={"cost": statement.excluded.cost},
+        ),
+        [{"feed_id": feed_id, "cost": cost} for feed_id, cost in latest.items()],
+    )
+
+
+def prices_as_of(at: datetime.datetime) -> Select:
+    """
+    Select every feed's ID and its cost at a point in time.
+
+    The cost is a correlated subquery taking the latest price recorded at or
+    before `at`, answered from the primary key index alone. Feeds with no
+    price by then get a NULL cost.
+    """
+    cost = (
+        select(FeedPrice.cost)
+        .where(FeedPrice.feed_id == Feed.id, FeedPrice.recorded_at <= to_utc(at))
+        .order_by(FeedPrice.recorded_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return select(Feed.id, cost.label("cost"))
+
+
+def _period_start(dialect: str, interval: TrendInterval, column) -> object:
+    """Build an expression for the UTC day starting a timestamp's period."""
+    if dialect == "postgresql":
+        return cast(func.date_trunc(interval.value, func.timezone("UTC", column)), Date)
+    # SQLite stores UTC timestamps as ISO strings; weeks start on Monday
+    modifiers = {
+        TrendInterval.DAY: (),
+        TrendInterval.WEEK: ("-6 days", "weekday 1"),
+        TrendInterval.MONTH: ("start of month",),
+    }
+    return func.date(column, *modifiers[interval], type_=Date)
+
+
+async def price_trend(
+    db: AsyncSession,
+    start: datetime.date,
+    end: datetime.date,
+    interval: TrendInterval = TrendInterval.MONTH,
+    group: TrendGroup = TrendGroup.BRAND,
+) -> List[PriceTrendPoint]:
+    """
+    Aggregate recorded prices per period and brand or feed type.
+
+    Args:
+        db: Database session
+        start: First day included, in UTC
+        end: Last day included, in UTC
+        interval: Length of each period
+        group: Whether to break prices down by brand or by feed type
+
+    Returns:
+        Statistics of the costs recorded in each period for each group that
+        had any, ordered by period. Cost per unit weight uses the feeds'
+        current weights and leaves out feeds without one.
+    """
+    period = _period_start(
+        db.get_bind().dialect.name, interval, FeedPrice.recorded_at
+    ).label("period")
+    key = Feed.brand_id if group is TrendGroup.BRAND else Feed.feed_type
+    lower = datetime.datetime.combine(start, datetime.time(), datetime.timezone.utc)
+    upper = datetime.datetime.combine(
+        end + datetime.timedelta(days=1), datetime.time(), datetime.timezone.utc
+    )
+    result = await db.execute(
+        select(
+            period,
+            key,
+            func.count(FeedPrice.cost),
+            func.avg(FeedPrice.cost),
+            func.min(FeedPrice.cost),
+            func.max(FeedPrice.cost),
+            func.avg(case((Feed.weight > 0, FeedPrice.cost / Feed.weight))),
+        )
+        .join(Feed, FeedPrice.feed_id == Feed.id)
+        .where(
+            FeedPrice.recorded_at >= lower,
+            FeedPrice.recorded_at < upper,
+            FeedPrice.cost.is_not(None),
+        )
+        .group_by(period, key)
+        .order_by(period, key)
+    )
+    return [
+        PriceTrendPoint(
+            period=row[0],
+            brand_id=row[1] if group is TrendGroup.BRAND else None,
+            feed_type=row[1] if group is TrendGroup.FEED_TYPE else None,
+            changes=row[2],
+            average_cost=row[3],
+            min_cost=row[4],
+            max_cost=row[5],
+            average_cost_per_weight=row[6],
+        )
+        for row in result.all()
+    ]
+
+
+def month_partitions(
+    first: datetime.date, count: int
+) -> List[Tuple[str, datetime.date, datetime.date]]:
+    """
+    Name and bound the monthly partitions starting at a month.
+
+    Returns:
+        (table name, first day, first day of the next month) per month
+    """
+    partitions = []
+    month = first.replace(day=1)
+    for _ in range(count):
+        following = (month + datetime.timedelta(days=32)).replace(day=1)
+        partitions.append((f"feed_prices_{month:%Y_%m}", month, following))
+        month = following
+    return partitions
+
+
+def partition_statements(
+    name: str, lower: datetime.date, upper: datetime.date
+) -> List[str]:
+    """
+    Build the statements creating one monthly partition.
+
+    The partition is created detached, given the prices the default
+    partition caught for its month, and then attached, since a partition
+    cannot be created for a range the default partition holds rows in.
+
+    Returns:
+        Statements to run in order, in one transaction
+    """
+    table = FeedPrice.__tablename__
+    start, end = f"'{lower} 00:00+00'", f"'{upper} 00:00+00'"
+    return [
+        f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)",
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE recorded_at >= {start} AND recorded_at < {end} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ({start}) TO ({end})",
+    ]
+
+
+async def ensure_price_partitions(
+    db_engine: AsyncEngine, months_ahead: int = PARTITION_MONTHS_AHEAD
+) -> None:
+    """
+    Create the missing monthly price partitions from this month onwards.
+
+    Each partition is created in its own transaction. Does nothing on
+    databases other than PostgreSQL. Failures are logged rather than
+    raised, since the default partition still accepts prices and the next
+    check tries again.
+
+    Args:
+        db_engine: Engine of the database holding `feed_prices`
+        months_ahead: Number of months after the current one to cover
+    """
+    if db_engine.dialect.name != "postgresql":
+        return
+    for name, lower, upper in month_partitions(_now().date(), months_ahead + 1):
+        try:
+            async with db_engine.begin() as connection:
+                result = await connection.execute(
+                    text("SELECT to_regclass(:name)"), {"name": name}
+                )
+                if result.scalar() is not None:
+                    continue
+                for statement in partition_statements(name, lower, upper):
+                    await connection.execute(text(statement))
+            logger.info(f"Created price partition {name}")
+        except (OSError, SQLAlchemyError) as e:
+            logger.warning(f"Could not create price partition {name}: {e}")
+
+
+class PricePartitions:
+    """Background task keeping monthly price partitions created ahead."""
+
+    def __init__(
+        self,
+        db_engine: AsyncEngine,
+        interval: float,
+        months_ahead: int = PARTITION_MONTHS_AHEAD,
+    ):
+        """
+        Initialize a stopped task.
+
+        Args:
+            db_engine: Engine of the database holding `feed_prices`
+            interval: Seconds between checks
+            months_ahead: Number of months after the current one to cover
+        """
+        self._engine = db_engine
+        self._interval = interval
+        self._months_ahead = months_ahead
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def start(self) -> None:
+        """Create the partitions now, then keep checking in the background."""
+        await ensure_price_partitions(self._engine, self._months_ahead)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop checking."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Check the partitions once per interval, as months roll over."""
+        while True:
+            await asyncio.sleep(self._interval)
+            await ensure_price_partitions(self._engine, self._months_ahead)
+
+
+# Partition maintenance for this worker, started with the application
+price_partitions = PricePartitions(engine, PARTITION_CHECK_INTERVAL)
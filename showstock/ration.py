@@ -0,0 +1,323 @@
+"""
+Least-cost ration formulation over the feed catalog.
+
+A ration is an amount of each feed fed per day. Formulation finds the
+cheapest ration that supplies every required nutrient amount without going
+over an intake limit, as a linear program solved with the HiGHS solver
+bundled with SciPy. Feed costs per unit weight come from the feed catalog
+columns and nutrient contents from the nutrient matrix, so no catalog rows
+are read per request once those are loaded.
+
+Weights are in kg. A feed supplies its nutrient profile value per kg for
+energy (Mcal) and trace minerals (mg), and a percentage of its weight for
+the other nutrients (kg), so requirements are given in those units per day.
+"""
+
+from typing import Annotated, Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel, Field, field_validator
+from scipy import sparse
+from scipy.optimize import linprog
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from showstock.analytics import ValueMetric, feed_catalog
+from showstock.models.feed import FeedType
+from showstock.models.nutrition import NUTRIENTS
+from showstock.nutrition import nutrient_matrix
+
+# Nutrients whose profile values are percentages of the feed's weight
+PERCENT_NUTRIENTS = {
+    "crude_protein",
+    "crude_fat",
+    "crude_fiber",
+    "calcium",
+    "phosphorus",
+    "sodium",
+    "potassium",
+    "magnesium",
+}
+
+# Amount of each nutrient supplied per kg of feed, per unit of profile value
+AMOUNT_SCALE = np.array(
+    [0.01 if nutrient in PERCENT_NUTRIENTS else 1.0 for nutrient in NUTRIENTS]
+)
+
+# Amounts below this are solver noise rather than part of the ration
+MIN_AMOUNT = 1e-9
+
+# Maximum number of rations evaluated per request
+MAX_EVALUATED_RATIONS = 10000
+
+
+class NutrientRequirement(BaseModel):
+    nutrient: str
+    minimum: Optional[float] = Field(None, ge=0)
+    maximum: Optional[float] = Field(None, ge=0)
+
+    @field_validator("nutrient")
+    @classmethod
+    def known_nutrient(cls, value: str) -> str:
+        """Reject nutrients that profiles do not record."""
+        if value not in NUTRIENTS:
+            raise ValueError(f"must be one of: {', '.join(NUTRIENTS)}")
+        return value
+
+
+class RationRequest(BaseModel):
+    requirements: List[NutrientRequirement] = Field(max_length=2 * len(NUTRIENTS))
+    max_intake: float = Field(gt=0)
+    feed_ids: Optional[List[int]] = None
+    feed_type: Optional[FeedType] = None
+    brand_id: Optional[int] = None
+
+
+class RationItem(BaseModel):
+    feed_id: int
+    name: str
+    amount: float
+    cost: float
+
+
+class RationResponse(BaseModel):
+    cost: float
+    intake: float
+    items: List[RationItem]
+    nutrients: Dict[str, float]
+
+
+class RationBatch(BaseModel):
+    rations: List[Dict[int, Annotated[float, Field(ge=0)]]] = Field(
+        max_length=MAX_EVALUATED_RATIONS
+    )
+
+
+class RationEvaluation(BaseModel):
+    cost: Optional[float] = None
+    weight: float
+    volume: Optional[float] = None
+    nutrients: Dict[str, Optional[float]]
+
+
+class InfeasibleRation(Exception):
+    """No ration from the candidate feeds meets the requirements."""
+
+
+def solve_ration(
+    costs: np.ndarray,
+    contents: np.ndarray,
+    minimums: np.ndarray,
+    maximums: np.ndarray,
+    max_intake: float,
+) -> np.ndarray:
+    """
+    Find the cheapest feed amounts meeting nutrient bounds.
+
+    Args:
+        costs: Cost per kg of each feed
+        contents: Nutrient amount per kg, one row per feed and one column per
+            constrained nutrient
+        minimums: Least amount of each nutrient, -inf if unbounded
+        maximums: Greatest amount of each nutrient, inf if unbounded
+        max_intake: Greatest total weight of feed
+
+    Returns:
+        The amount of each feed in kg
+
+    Raises:
+        InfeasibleRation: If no amounts satisfy the bounds
+    """
+    has_min = np.isfinite(minimums)
+    has_max = np.isfinite(maximums)
+    # linprog takes upper bounds only, so minimums are negated
+    a_ub = np.vstack(
+        [
+            -contents[:, has_min].T,
+            contents[:, has_max].T,
+            np.ones((1, len(costs))),
+        ]
+    )
+    b_ub = np.concatenate([-minimums[has_min], maximums[has_max], [max_intake]])
+    result = linprog(costs, A_ub=a_ub, b_ub=b_ub, bounds=(0, None), method="highs")
+    if result.status != 0:
+        raise InfeasibleRation(result.message)
+    return np.where(result.x < MIN_AMOUNT, 0.0, result.x)
+
+
+def _requirement_bounds(
+    requirements: Sequence[NutrientRequirement],
+) -> Dict[str, List[float]]:
+    """Merge requirements into [minimum, maximum] bounds per nutrient."""
+    bounds: Dict[str, List[float]] = {}
+    for requirement in requirements:
+        bound = bounds.setdefault(requirement.nutrient, [-np.inf, np.inf])
+        if requirement.minimum is not None:
+            bound[0] = max(bound[0], requirement.minimum)
+        if requirement.maximum is not None:
+            bound[1] = min(bound[1], requirement.maximum)
+    return bounds
+
+
+async def formulate_ration(db: AsyncSession, request: RationRequest) -> RationResponse:
+    """
+    Formulate the least-cost ration for a request.
+
+    Candidate feeds are those matching the request's filters that have a
+    cost per unit weight and a value for every constrained nutrient.
+
+    Args:
+        db: Database session
+        request: Requirements, intake limit and candidate feed filters
+
+    Returns:
+        The feeds in the ration with their amounts and costs, and the
+        nutrients it supplies
+
+    Raises:
+        InfeasibleRation: If no ration from the candidates meets the
+            requirements
+    """
+    columns = await feed_catalog.load(db)
+    matrix = await nutrient_matrix.load(db)
+
+    bounds = _requirement_bounds(request.requirements)
+    nutrient_columns = [NUTRIENTS.index(nutrient) for nutrient in bounds]
+    costs = columns.unit_costs[ValueMetric.WEIGHT]
+    eligible = ~np.isnan(costs)
+    if request.feed_ids is not None:
+        eligible &= np.isin(columns.id, request.feed_ids)
+    if request.feed_type is not None:
+        eligible &= columns.feed_type == list(FeedType).index(request.feed_type)
+    if request.brand_id is not None:
+        eligible &= columns.brand_id == request.brand_id
+    candidates = np.flatnonzero(eligible)
+
+    contents = (
+        matrix.take(columns.id[candidates].tolist())[:, nutrient_columns]
+        * AMOUNT_SCALE[nutrient_columns]
+    )
+    known = ~np.isnan(contents).any(axis=1)
+    candidates, contents = candidates[known], contents[known]
+    if not len(candidates):
+        raise InfeasibleRation("No candidate feeds have the required nutrients")
+
+    minimums = np.array([bound[0] for bound in bounds.values()])
+    maximums = np.array([bound[1] for bound in bounds.values()])
+    amounts = await run_in_threadpool(
+        solve_ration,
+        costs[candidates],
+        contents,
+        minimums,
+        maximums,
+        request.max_intake,
+    )
+
+    used = np.flatnonzero(amounts)
+    items = [
+        RationItem(
+            feed_id=int(columns.id[candidates[i]]),
+            name=columns.name[candidates[i]],
+            amount=float(amounts[i]),
+            cost=float(amounts[i] * costs[candidates[i]]),
+        )
+        for i in used
+    ]
+    supplied = amounts @ contents
+    return RationResponse(
+        cost=sum(item.cost for item in items),
+        intake=float(amounts.sum()),
+        items=items,
+        nutrients={
+            nutrient: float(amount) for nutrient, amount in zip(bounds, supplied)
+        },
+    )
+
+
+class UnknownFeeds(Exception):
+    """Rations refer to feeds that are not in the catalog."""
+
+    def __init__(self, feed_ids: Sequence[int]):
+        super().__init__(f"Unknown feeds: {', '.join(map(str, feed_ids))}")
+        self.feed_ids = feed_ids
+
+
+def _optional(value: float) -> Optional[float]:
+    """Convert NaN, meaning unknown, to None."""
+    return None if np.isnan(value) else float(value)
+
+
+async def evaluate_rations(
+    db: AsyncSession, rations: Sequence[Dict[int, float]]
+) -> List[RationEvaluation]:
+    """
+    Compute the totals of many rations at once.
+
+    The rations form a sparse ration × feed matrix of amounts, multiplied by
+    a matrix of per-kg properties of the feeds involved: cost, weight, volume
+    and each nutrient. A total is unknown when a feed in the ration lacks the
+    value it needs.
+
+    Args:
+        db: Database session
+        rations: Amount in kg of each feed, keyed by feed ID, per ration
+
+    Returns:
+        The cost, weight, volume and nutrient totals of each ration
+
+    Raises:
+        UnknownFeeds: If a ration refers to feeds not in the catalog
+    """
+    columns = await feed_catalog.load(db)
+    matrix = await nutrient_matrix.load(db)
+
+    sizes = [len(ration) for ration in rations]
+    rows = np.repeat(np.arange(len(rations)), sizes)
+    feed_ids = np.fromiter(
+        (feed_id for ration in rations for feed_id in ration),
+        dtype=np.int64,
+        count=sum(sizes),
+    )
+    amounts = np.fromiter(
+        (amount for ration in rations for amount in ration.values()),
+        dtype=np.float64,
+        count=sum(sizes),
+    )
+    # Zero amounts would turn unknown values into unknown totals
+    listed = amounts > 0
+    rows, feed_ids, amounts = rows[listed], feed_ids[listed], amounts[listed]
+
+    feeds, feed_columns = np.unique(feed_ids, return_inverse=True)
+    positions = columns.positions(feeds)
+    if (positions < 0).any():
+        raise UnknownFeeds(feeds[positions < 0].tolist())
+
+    with np.errstate(divide="ignore"):
+        volume_per_kg = np.where(
+            columns.density[positions] > 0, 1 / columns.density[positions], np.nan
+        )
+    properties = np.column_stack(
+        [
+            columns.unit_costs[ValueMetric.WEIGHT][positions],
+            np.ones(len(feeds)),
+            volume_per_kg,
+            matrix.take(feeds.tolist()) * AMOUNT_SCALE,
+        ]
+    )
+    ration_matrix = sparse.csr_matrix(
+        (amounts, (rows, feed_columns)), shape=(len(rations), len(feeds))
+    )
+    totals = ration_matrix @ properties
+
+    return [
+        RationEvaluation(
+            cost=_optional(total[0]),
+            weight=float(total[1]),
+            volume=_optional(total[2]),
+            nutrients={
+                nutrient: _optional(amount)
+                for nutrient, amount in zip(NUTRIENTS, total[3:])
+            },
+        )
+        for total in totals
+    ]
@@ -0,0 +1,215 @@
+"""
+Name search and autocomplete over the feed and brand catalog.
+
+On PostgreSQL, names are matched with `pg_trgm`: a prefix match or a high
+word similarity to the query, both served by the trigram GIN indexes on
+`feeds.name` and `brands.name`. Other backends, such as the SQLite database
+used in development and tests, have no trigram support, so each worker
+instead keeps an in-memory `PrefixIndex` of every name, rebuilt whenever the
+catalog versions show that feeds or brands have changed.
+"""
+
+import asyncio
+import enum
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from showstock.etag import get_catalog_versions
+from showstock.models import Brand, Feed
+
+# Default and maximum number of suggestions returned
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+
+# Shortest query searched; shorter ones match too much to be useful
+MIN_QUERY_LENGTH = 2
+
+
+class SearchKind(str, enum.Enum):
+    """Kinds of catalog entries that can be searched."""
+
+    FEED = "feed"
+    BRAND = "brand"
+
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    id: int
+    name: str
+
+
+ENTITIES = {SearchKind.FEED: Feed, SearchKind.BRAND: Brand}
+
+
+def normalize(text: str) -> str:
+    """Fold a name or query for case-insensitive, whitespace-tolerant matching."""
+    return " ".join(text.casefold().split())
+
+
+class PrefixIndex:
+    """
+    A sorted in-memory index answering prefix queries over catalog names.
+
+    Every name is indexed under each of its word suffixes, so "layer pel"
+    finds "Purina Layer Pellets". A lookup is a binary search followed by a
+    scan of the matching keys, so its cost depends on the number of results
+    rather than the size of the catalog.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self.versions: Optional[Dict[str, int]] = None
+        # Sorted keys per kind and names by (kind, id), swapped in together so
+        # a rebuild in another thread never exposes a half-built index
+        self._contents: Tuple[
+            Dict[SearchKind, List[Tuple[str, int, int]]],
+            Dict[Tuple[SearchKind, int], str],
+        ] = ({}, {})
+
+    def build(
+        self,
+        entries: Iterable[Tuple[SearchKind, int, str]],
+        versions: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """
+        Replace the index contents.
+
+        Args:
+            entries: Tuples of (kind, id, name) to index
+            versions: Catalog versions the entries were read at
+        """
+        keys: Dict[SearchKind, List[Tuple[str, int, int]]] = {
+            kind: [] for kind in SearchKind
+        }
+        names = {}
+        for kind, entry_id, name in entries:
+            names[(kind, entry_id)] = name
+            words = normalize(name).split(" ")
+            for position in range(len(words)):
+                keys[kind].append((" ".join(words[position:]), position, entry_id))
+        for kind_keys in keys.values():
+            kind_keys.sort()
+        self._contents = (keys, names)
+        self.versions = versions
+
+    def clear(self) -> None:
+        """Empty the index so the next search rebuilds it."""
+        self.build([])
+        self.versions = None
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        kinds: Sequence[SearchKind] = tuple(SearchKind),
+    ) -> List[SearchHit]:
+        """
+        Find entries with a word sequence starting with the query.
+
+        Args:
+            query: Text typed so far
+            limit: Maximum number of hits
+            kinds: Kinds of entries to include
+
+        Returns:
+            Matching entries in key order, each at most once
+        """
+        prefix = normalize(query)
+        keys_by_kind, names = self._contents
+        matches: List[Tuple[str, int, SearchKind, int]] = []
+        for kind in kinds:
+            keys = keys_by_kind.get(kind, [])
+            seen = set()
+            position = bisect_left(keys, (prefix,))
+            while position < len(keys) and len(seen) < limit:
+                key, word, entry_id = keys[position]
+                position += 1
+                if not key.startswith(prefix):
+                    break
+                if entry_id not in seen:
+                    seen.add(entry_id)
+                    matches.append((key, word, kind, entry_id))
+        matches.sort()
+        return [
+            SearchHit(kind=kind, id=entry_id, name=names[(kind, entry_id)])
+            for _, _, kind, entry_id in matches[:limit]
+        ]
+
+
+# Fallback index for this worker on backends without pg_trgm
+search_index = PrefixIndex()
+_rebuild_lock = asyncio.Lock()
+
+
+async def _refresh_index(db: AsyncSession) -> None:
+    """Rebuild the fallback index if the catalog changed since it was built."""
+    tables = [Feed.__tablename__, Brand.__tablename__]
+    versions = await get_catalog_versions(db, tables)
+    if search_index.versions == versions:
+        return
+    async with _rebuild_lock:
+        if search_index.versions == versions:
+            return
+        entries: List[Tuple[SearchKind, int, str]] = []
+        for kind, entity in ENTITIES.items():
+            result = await db.execute(select(entity.id, entity.name))
+            entries.extend((kind, entry_id, name) for entry_id, name in result.all())
+        # Building the index for a large catalog takes seconds of CPU time
+        await run_in_threadpool(search_index.build, entries, versions)
+
+
+def _escape_like(text: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def _search_trigram(
+    db: AsyncSession, query: str, limit: int, kinds: Sequence[SearchKind]
+) -> List[SearchHit]:
+    """Search names with pg_trgm, best matches first."""
+    pattern = f"{_escape_like(query)}%"
+    hits: List[Tuple[bool, float, str, SearchHit]] = []
+    for kind in kinds:
+        entity = ENTITIES[kind]
+        score = func.word_similarity(literal(query), entity.name)
+        is_prefix = entity.name.ilike(pattern, escape="\\")
+        result = await db.execute(
+            select(entity.id, entity.name, is_prefix, score)
+            .where(or_(is_prefix, literal(query).op("<%")(entity.name)))
+            .order_by(is_prefix.desc(), score.desc(), entity.name)
+            .limit(limit)
+        )
+        for entry_id, name, prefix_match, similarity in result.all():
+            hit = SearchHit(kind=kind, id=entry_id, name=name)
+            hits.append((prefix_match, similarity, name, hit))
+    hits.sort(key=lambda item: (not item[0], -item[1], item[2]))
+    return [hit for *_, hit in hits[:limit]]
+
+
+async def search_catalog(
+    db: AsyncSession,
+    query: str,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+    kinds: Sequence[SearchKind] = tuple(SearchKind),
+) -> List[SearchHit]:
+    """
+    Suggest feeds and brands whose names match a partial query.
+
+    Args:
+        db: Database session
+        query: Text typed so far
+        limit: Maximum number of suggestions
+        kinds: Kinds of entries to include
+
+    Returns:
+        Matching feeds and brands, best matches first
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return await _search_trigram(db, query, limit, kinds)
+    await _refresh_index(db)
+    return search_index.search(query, limit, kinds)
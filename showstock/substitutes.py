@@ -0,0 +1,287 @@
+"""
+Nearest-substitute search over the feed catalog.
+
+Each profiled feed is a point whose coordinates are its nutrient values,
+density and cost per unit weight, standardized to zero mean and unit
+variance so that no one unit dominates; missing values sit at the mean.
+Substitutes for a feed are the nearest points of the same feed type, found
+with one KD-tree per feed type. Feeds without a nutrient profile are not
+indexed.
+
+KD-trees cannot be updated in place, so writes are applied incrementally:
+feeds whose points changed since the trees were built are moved to a small
+overlay that is searched by brute force, and their old points are masked out
+of tree results. The trees are rebuilt only once the overlay grows past a
+fraction of the catalog.
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+from scipy.spatial import cKDTree
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from showstock.analytics import FEED_TYPES, FeedColumns, ValueMetric, feed_catalog
+from showstock.models.feed import FeedType
+from showstock.nutrition import NutrientMatrix, nutrient_matrix
+
+# Default and maximum number of substitutes returned
+DEFAULT_SUBSTITUTES = 5
+MAX_SUBSTITUTES = 50
+
+# The trees are rebuilt once more feeds than this have changed, or more than
+# REBUILD_FRACTION of the indexed feeds if that is larger
+MIN_REBUILD_ROWS = 1000
+REBUILD_FRACTION = 0.05
+
+
+class FeedSubstitute(BaseModel):
+    id: int
+    brand_id: int
+    name: str
+    feed_type: FeedType
+    distance: float
+
+
+def feed_features(
+    columns: FeedColumns, matrix: NutrientMatrix
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Collect the unscaled coordinates of every profiled feed.
+
+    Returns:
+        Feed IDs in ascending order, feed type codes and one row of
+        coordinates per feed, NaN where values are missing
+    """
+    nutrients = matrix.take(columns.id.tolist())
+    profiled = ~np.isnan(nutrients).all(axis=1)
+    raw = np.column_stack(
+        [nutrients, columns.density, columns.unit_costs[ValueMetric.WEIGHT]]
+    )
+    return columns.id[profiled], columns.feed_type[profiled], raw[profiled]
+
+
+def _standardize(raw: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Scale coordinates, placing missing values at the mean."""
+    vectors = (raw - mean) / scale
+    vectors[np.isnan(vectors)] = 0.0
+    return vectors
+
+
+def _find(
+    sorted_ids: np.ndarray, feed_ids: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the positions of IDs in a sorted array and which were found."""
+    positions = np.searchsorted(sorted_ids, feed_ids)
+    found = positions < len(sorted_ids)
+    found[found] &= sorted_ids[positions[found]] == feed_ids[found]
+    return positions, found
+
+
+class _Snapshot:
+    """Immutable state of the index, swapped in whole after each update."""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        types: np.ndarray,
+        vectors: np.ndarray,
+        mean: np.ndarray,
+        scale: np.ndarray,
+        trees: Dict[int, Tuple[cKDTree, np.ndarray]],
+    ):
+        """
+        Initialize a snapshot with nothing changed since the trees were built.
+
+        Args:
+            ids: Feed IDs of the tree points, ascending
+            types: Feed type code of each point
+            vectors: Scaled coordinates of each point
+            mean: Per-coordinate mean used for scaling
+            scale: Per-coordinate standard deviation used for scaling
+            trees: For each feed type code, a tree and the point rows in it
+        """
+        self.mean, self.scale = mean, scale
+        self.ids, self.types, self.vectors = ids, types, vectors
+        self.trees = trees
+        # Tree rows masked out since the build, and the feeds searched instead
+        self.invalid = np.zeros(len(ids), dtype=bool)
+        self.invalid_by_type: Dict[int, int] = {}
+        self.overlay_ids = ids[:0]
+        self.overlay_types = types[:0]
+        self.overlay_vectors = vectors[:0]
+
+    def updated(
+        self, ids: np.ndarray, types: np.ndarray, raw: np.ndarray
+    ) -> "_Snapshot":
+        """
+        Return a snapshot for the current points of every feed.
+
+        Unchanged feeds stay in the trees. If too many feeds changed, the
+        trees are rebuilt and the scaling recomputed.
+        """
+        vectors = _standardize(raw, self.mean, self.scale)
+        positions, known = _find(self.ids, ids)
+        same = known.copy()
+        same[known] = (self.types[positions[known]] == types[known]) & (
+            self.vectors[positions[known]] == vectors[known]
+        ).all(axis=1)
+        changed = ~same
+
+        # Both masked tree points and overlay points slow every query
+        masked = len(self.ids) - same.sum()
+        limit = max(MIN_REBUILD_ROWS, REBUILD_FRACTION * len(self.ids))
+        if masked + changed.sum() > limit:
+            return build_snapshot(ids, types, raw)
+
+        snapshot = _Snapshot(
+            self.ids, self.types, self.vectors, self.mean, self.scale, self.trees
+        )
+        snapshot.invalid = np.ones(len(self.ids), dtype=bool)
+        snapshot.invalid[positions[same]] = False
+        snapshot.invalid_by_type = {
+            code: int(snapshot.invalid[rows].sum())
+            for code, (_, rows) in self.trees.items()
+        }
+        snapshot.overlay_ids = ids[changed]
+        snapshot.overlay_types = types[changed]
+        snapshot.overlay_vectors = vectors[changed]
+        return snapshot
+
+    def point(self, feed_id: int) -> Optional[Tuple[int, np.ndarray]]:
+        """Return the type code and point of a feed, if it is indexed."""
+        target = np.array([feed_id])
+        positions, found = _find(self.overlay_ids, target)
+        if found[0]:
+            row = positions[0]
+            return int(self.overlay_types[row]), self.overlay_vectors[row]
+        positions, found = _find(self.ids, target)
+        if found[0] and not self.invalid[positions[0]]:
+            row = positions[0]
+            return int(self.types[row]), self.vectors[row]
+        return None
+
+    def nearest(self, feed_id: int, k: int) -> Optional[List[Tuple[float, int]]]:
+        """
+        Find the feeds of the same type nearest to a feed.
+
+        Returns:
+            Up to `k` tuples of (distance, feed ID), nearest first, or None
+            if the feed is not indexed
+        """
+        point = self.point(feed_id)
+        if point is None:
+            return None
+        code, vector = point
+        found: List[Tuple[float, int]] = []
+
+        if code in self.trees:
+            tree, rows = self.trees[code]
+            # Ask for enough neighbours to survive masking and the feed itself
+            count = min(len(rows), k + 1 + self.invalid_by_type.get(code, 0))
+            distances, indexes = tree.query(vector, k=count)
+            for distance, index in zip(
+                np.atleast_1d(distances), np.atleast_1d(indexes)
+            ):
+                row = rows[index]
+                if not self.invalid[row] and self.ids[row] != feed_id:
+                    found.append((float(distance), int(self.ids[row])))
+
+        overlay = (self.overlay_types == code) & (self.overlay_ids != feed_id)
+        distances = np.linalg.norm(self.overlay_vectors[overlay] - vector, axis=1)
+        found.extend(
+            (float(distance), int(other))
+            for distance, other in zip(distances, self.overlay_ids[overlay])
+        )
+        return sorted(found)[:k]
+
+
+def build_snapshot(ids: np.ndarray, types: np.ndarray, raw: np.ndarray) -> _Snapshot:
+    """Build trees over a full set of points, with fresh scaling."""
+    # Columns with no values at all get a mean and deviation of zero
+    counts = np.maximum((~np.isnan(raw)).sum(axis=0), 1)
+    mean = np.nansum(raw, axis=0) / counts
+    std = np.sqrt(np.nansum((raw - mean) ** 2, axis=0) / counts)
+    scale = np.where(std > 0, std, 1.0)
+    vectors = _standardize(raw, mean, scale)
+    trees = {}
+    for code in np.unique(types):
+        rows = np.flatnonzero(types == code)
+        trees[int(code)] = (cKDTree(vectors[rows]), rows)
+    return _Snapshot(ids, types, vectors, mean, scale, trees)
+
+
+class SubstituteIndex:
+    """Per-worker substitute index kept in step with the catalog."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index that builds on first use."""
+        self._snapshot: Optional[_Snapshot] = None
+        self._source: Optional[Tuple[FeedColumns, Optional[Dict[str, int]]]] = None
+        self._lock = asyncio.Lock()
+
+    def clear(self) -> None:
+        """Drop the index so the next use rebuilds it."""
+        self._snapshot = None
+        self._source = None
+
+    async def load(self, db: AsyncSession) -> Tuple[FeedColumns, _Snapshot]:
+        """
+        Bring the index up to date with the catalog.
+
+        Returns:
+            The feed columns the index reflects and the index state
+        """
+        columns = await feed_catalog.load(db)
+        matrix = await nutrient_matrix.load(db)
+        source = (columns, matrix.versions)
+        async with self._lock:
+            if self._source != source:
+                ids, types, raw = feed_features(columns, matrix)
+                if self._snapshot is None:
+                    snapshot = await run_in_threadpool(build_snapshot, ids, types, raw)
+                else:
+                    snapshot = await run_in_threadpool(
+                        self._snapshot.updated, ids, types, raw
+                    )
+                self._snapshot, self._source = snapshot, source
+        assert self._snapshot is not None
+        return columns, self._snapshot
+
+    async def substitutes(
+        self, db: AsyncSession, feed_id: int, k: int = DEFAULT_SUBSTITUTES
+    ) -> Optional[List[FeedSubstitute]]:
+        """
+        Find the closest substitutes for a feed.
+
+        Args:
+            db: Database session
+            feed_id: Feed to substitute
+            k: Maximum number of substitutes
+
+        Returns:
+            Substitutes of the same feed type, closest first, or None if the
+            feed has no nutrient profile
+        """
+        columns, snapshot = await self.load(db)
+        nearest = snapshot.nearest(feed_id, k)
+        if nearest is None:
+            return None
+        positions = columns.positions(np.array([other for _, other in nearest]))
+        return [
+            FeedSubstitute(
+                id=int(columns.id[position]),
+                brand_id=int(columns.brand_id[position]),
+                name=columns.name[position],
+                feed_type=FEED_TYPES[columns.feed_type[position]],
+                distance=distance,
+            )
+            for (distance, _), position in zip(nearest, positions)
+        ]
+
+
+# Substitute index for this worker
+substitute_index = SubstituteIndex()
@@ -2,17 +2,28 @@
 Test fixtures for the Showstock application.
 """
 
+import os
+
 import pytest
 import pytest_asyncio
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from showstock.analytics import feed_catalog
+from showstock.cache import clear_caches
 from showstock.db import Base, get_db
 from showstock.main import app
+from showstock.nutrition import nutrient_matrix
+from showstock.search import search_index
+from showstock.substitutes import substitute_index
 
 
 # Use in-memory SQLite for testing
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
+# PostgreSQL database for tests marked `postgres`, which are skipped without it
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
 
 @pytest_asyncio.fixture
 async def test_engine():
@@ -36,6 +47,24 @@ async def test_engine():
     await engine.dispose()
 
 
+@pytest_asyncio.fixture
+async def postgres_engine():
+    """Create an engine on the PostgreSQL test database with fresh tables."""
+    if TEST_POSTGRES_URL is None:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_async_engine(TEST_POSTGRES_URL)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
 @pytest_asyncio.fixture
 async def async_session_factory(test_engine):
     """Create a session factory for testing."""
@@ -61,3 +90,19 @@ def override_get_db(async_session):
     app.dependency_overrides[get_db] = _override_get_db
     yield
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    """Start every test with empty catalog caches."""
+    clear_caches()
+    search_index.clear()
+    feed_catalog.clear()
+    nutrient_matrix.clear()
+    substitute_index.clear()
+    yield
+    clear_caches()
+    search_index.clear()
+    feed_catalog.clear()
+    nutrient_matrix.clear()
+    substitute_index.clear()
@@ -0,0 +1,115 @@
+"""
+Tests for the feed value analytics.
+"""
+
+import math
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.analytics import (
+    FeedColumns,
+    ValueMetric,
+    rank_best_value,
+    unit_costs,
+)
+from showstock.main import app
+from showstock.models import Brand, Feed
+from showstock.models.feed import FeedType
+
+
+def test_unit_costs():
+    """Test unit costs, with NaN where inputs are missing or invalid."""
+    nan = np.nan
+    costs = unit_costs(
+        np.array([20.0, 20.0, nan, 20.0, 20.0]),
+        np.array([50.0, 50.0, 50.0, nan, 0.0]),
+        np.array([2.0, nan, 2.0, 2.0, 2.0]),
+    )
+    per_weight = costs[ValueMetric.WEIGHT]
+    per_volume = costs[ValueMetric.VOLUME]
+    assert per_weight[:2].tolist() == [0.4, 0.4]
+    assert np.isnan(per_weight[2:]).all()
+    assert per_volume[0] == pytest.approx(0.8)
+    assert np.isnan(per_volume[1:]).all()
+
+
+def test_rank_best_value():
+    """Test ranking feeds per feed type, cheapest first."""
+    columns = FeedColumns(
+        [
+            (1, 1, "A", FeedType.PELLET, 30.0, 50.0, 1.0),
+            (2, 1, "B", FeedType.PELLET, 20.0, 50.0, 3.0),
+            (3, 2, "C", FeedType.PELLET, 20.0, 50.0, None),
+            (4, 2, "D", FeedType.PELLET, None, 50.0, 1.0),
+            (5, 2, "E", FeedType.PULVERIZED, 10.0, 50.0, 1.0),
+        ]
+    )
+    assert len(columns) == 5
+    assert columns.positions(np.array([5, 9, 1, 0])).tolist() == [4, -1, 0, -1]
+
+    by_weight = rank_best_value(columns, ValueMetric.WEIGHT, limit=2)
+    assert [ranking.feed_type for ranking in by_weight] == list(FeedType)
+    assert [feed.id for feed in by_weight[0].feeds] == [2, 3]
+    assert by_weight[0].feeds[1].cost_per_volume is None
+    assert [feed.id for feed in by_weight[1].feeds] == [5]
+
+    by_volume = rank_best_value(columns, ValueMetric.VOLUME)
+    assert [feed.id for feed in by_volume[0].feeds] == [1, 2]
+    assert math.isclose(by_volume[0].feeds[1].cost_per_volume, 1.2)
+
+    by_brand = rank_best_value(columns, brand_id=2)
+    assert [feed.id for feed in by_brand[0].feeds] == [3]
+
+    empty = rank_best_value(FeedColumns([]))
+    assert [ranking.feeds for ranking in empty] == [[], []]
+
+
+@pytest.mark.asyncio
+async def test_best_value_endpoint(async_session: AsyncSession, override_get_db):
+    """Test the best-value endpoint and reloading after feed writes."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+    async_session.add_all(
+        [
+            Feed(
+                brand_id=brand.id,
+                name=f"Feed {i}",
+                feed_type=FeedType.PELLET,
+                cost=10.0 + i,
+                weight=50.0,
+                density=1.0,
+            )
+            for i in range(3)
+        ]
+    )
+    await async_session.commit()
+
+    client = TestClient(app)
+    response = client.get("/api/feeds/best-value", params={"limit": 2})
+    assert response.status_code == 200
+    pellets = response.json()[0]
+    assert pellets["feed_type"] == "pellet"
+    assert [feed["name"] for feed in pellets["feeds"]] == ["Feed 0", "Feed 1"]
+    assert pellets["feeds"][0]["cost_per_weight"] == pytest.approx(0.2)
+
+    response = client.post(
+        "/api/feeds",
+        json={
+            "brand_id": brand.id,
+            "name": "Bargain",
+            "feed_type": "pellet",
+            "cost": 5.0,
+            "weight": 50.0,
+        },
+    )
+    assert response.status_code == 201
+    response = client.get("/api/feeds/best-value", params={"limit": 2})
+    assert response.json()[0]["feeds"][0]["name"] == "Bargain"
+
+    # Without a density, the new feed has no cost per volume
+    response = client.get("/api/feeds/best-value", params={"metric": "volume"})
+    assert "Bargain" not in [feed["name"] for feed in response.json()[0]["feeds"]]
@@ -2,13 +2,16 @@
 Tests for the API endpoints.
 """
 
+import json
+
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from fastapi import Response
 from fastapi.testclient import TestClient
 
 from showstock.main import app
-from showstock.models import Brand, Feed
+from showstock.models import Brand, Feed, FeedPrice
 from showstock.models.feed import FeedType
 from showstock.api import (
     create_brand,
@@ -17,7 +20,10 @@ from showstock.api import (
     create_feed,
     get_feeds,
     get_feed,
+    BrandResponse,
 )
+from showstock.cache import brand_cache
+from showstock.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 
 @pytest.mark.asyncio
@@ -51,7 +57,7 @@ async def test_create_brand(async_session: AsyncSession, override_get_db):
     from showstock.api import BrandCreate
 
     brand_data = BrandCreate(name="Direct Test Brand")
-    new_brand = await create_brand(brand_data, async_session)
+    new_brand = await create_brand(brand_data, db=async_session)
     assert new_brand.name == "Direct Test Brand"
     assert new_brand.id is not None
 
@@ -75,10 +81,10 @@ async def test_get_brands(async_session: AsyncSession, override_get_db):
     assert any(brand["name"] == "Brand 2" for brand in data)
 
     # Test the API function directly
-    brands = await get_brands(async_session)
+    brands = json.loads((await get_brands(Response(), db=async_session)).body)
     assert len(brands) >= 2
-    assert any(brand.name == "Brand 1" for brand in brands)
-    assert any(brand.name == "Brand 2" for brand in brands)
+    assert any(brand["name"] == "Brand 1" for brand in brands)
+    assert any(brand["name"] == "Brand 2" for brand in brands)
 
 
 @pytest.mark.asyncio
@@ -98,7 +104,7 @@ async def test_get_brand(async_session: AsyncSession, override_get_db):
     assert data["name"] == "Test Brand"
 
     # Test the API function directly
-    db_brand = await get_brand(brand.id, async_session)
+    db_brand = await get_brand(brand.id, Response(), db=async_session)
     assert db_brand is not None
     assert db_brand.id == brand.id
     assert db_brand.name == "Test Brand"
@@ -107,7 +113,7 @@ async def test_get_brand(async_session: AsyncSession, override_get_db):
     from fastapi import HTTPException
 
     with pytest.raises(HTTPException) as excinfo:
-        await get_brand(9999, async_session)
+        await get_brand(9999, Response(), db=async_session)
     assert excinfo.value.status_code == 404
     assert excinfo.value.detail == "Brand not found"
 
@@ -248,10 +254,10 @@ async def test_get_feeds(async_session: AsyncSession, override_get_db):
     assert any(feed["name"] == "Feed 2" for feed in data)
 
     # Test the API function directly
-    feeds = await get_feeds(async_session)
+    feeds = json.loads((await get_feeds(Response(), db=async_session)).body)
     assert len(feeds) >= 2
-    assert any(feed.name == "Feed 1" for feed in feeds)
-    assert any(feed.name == "Feed 2" for feed in feeds)
+    assert any(feed["name"] == "Feed 1" for feed in feeds)
+    assert any(feed["name"] == "Feed 2" for feed in feeds)
 
 
 @pytest.mark.asyncio
@@ -281,7 +287,7 @@ async def test_get_feed(async_session: AsyncSession, override_get_db):
     assert data["brand_id"] == brand.id
 
     # Test the API function directly
-    db_feed = await get_feed(feed.id, async_session)
+    db_feed = await get_feed(feed.id, Response(), db=async_session)
     assert db_feed is not None
     assert db_feed.id == feed.id
     assert db_feed.name == "Test Feed"
@@ -290,7 +296,7 @@ async def test_get_feed(async_session: AsyncSession, override_get_db):
     from fastapi import HTTPException
 
     with pytest.raises(HTTPException) as excinfo:
-        await get_feed(9999, async_session)
+        await get_feed(9999, Response(), db=async_session)
     assert excinfo.value.status_code == 404
     assert excinfo.value.detail == "Feed not found"
 
@@ -302,3 +308,606 @@ async def test_get_feed_not_found(override_get_db):
     response = client.get("/api/feeds/999")
     assert response.status_code == 404
     assert response.json()["detail"] == "Feed not found"
+
+
+@pytest.mark.asyncio
+async def test_get_brands_pagination(async_session: AsyncSession, override_get_db):
+    """Test paging through brands with cursor tokens."""
+    async_session.add_all([Brand(name=f"Brand {i}") for i in range(5)])
+    await async_session.commit()
+
+    client = TestClient(app)
+    response = client.get("/api/brands", params={"limit": 2})
+    assert response.status_code == 200
+    first_page = response.json()
+    assert [brand["name"] for brand in first_page] == ["Brand 0", "Brand 1"]
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+
+    names = [brand["name"] for brand in first_page]
+    while cursor:
+        response = client.get("/api/brands", params={"limit": 2, "after": cursor})
+        assert response.status_code == 200
+        names.extend(brand["name"] for brand in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    assert names == [f"Brand {i}" for i in range(5)]
+
+    # An exactly-full final page does not advertise another page
+    response = client.get("/api/brands", params={"limit": 5})
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_get_feeds_filters(async_session: AsyncSession, override_get_db):
+    """Test filtering feeds by brand, type, cost and weight."""
+    brand1 = Brand(name="Brand 1")
+    brand2 = Brand(name="Brand 2")
+    async_session.add_all([brand1, brand2])
+    await async_session.commit()
+
+    async_session.add_all(
+        [
+            Feed(
+                brand_id=brand1.id,
+                name="Cheap Pellet",
+                feed_type=FeedType.PELLET,
+                cost=10.0,
+                weight=50.0,
+            ),
+            Feed(
+                brand_id=brand1.id,
+                name="Dear Pellet",
+                feed_type=FeedType.PELLET,
+                cost=40.0,
+                weight=25.0,
+            ),
+            Feed(
+                brand_id=brand2.id,
+                name="Meal",
+                feed_type=FeedType.PULVERIZED,
+                cost=20.0,
+                weight=50.0,
+            ),
+        ]
+    )
+    await async_session.commit()
+
+    client = TestClient(app)
+
+    def names(**params):
+        response = client.get("/api/feeds", params=params)
+        assert response.status_code == 200
+        return [feed["name"] for feed in response.json()]
+
+    assert names(brand_id=brand1.id) == ["Cheap Pellet", "Dear Pellet"]
+    assert names(feed_type="pulverized") == ["Meal"]
+    assert names(min_cost=15) == ["Dear Pellet", "Meal"]
+    assert names(max_cost=20) == ["Cheap Pellet", "Meal"]
+    assert names(min_weight=30, max_weight=60) == ["Cheap Pellet", "Meal"]
+    assert names(max_weight=30) == ["Dear Pellet"]
+    assert names(brand_id=brand1.id, feed_type="pulverized") == []
+
+    # Filters and cursors combine
+    response = client.get("/api/feeds", params={"feed_type": "pellet", "limit": 1})
+    assert [feed["name"] for feed in response.json()] == ["Cheap Pellet"]
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    assert names(feed_type="pellet", after=cursor) == ["Dear Pellet"]
+
+
+@pytest.mark.asyncio
+async def test_get_feeds_invalid_paging(override_get_db):
+    """Test rejecting malformed cursors and out-of-range limits."""
+    client = TestClient(app)
+    response = client.get("/api/feeds", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+    response = client.get("/api/brands", params={"limit": 0})
+    assert response.status_code == 422
+
+
+def test_cursor_round_trip():
+    """Test encoding and decoding cursor tokens."""
+    assert decode_cursor(encode_cursor(42)) == 42
+    for token in ["", "!!!", encode_cursor(1)[:-2], "eyJpZCI6IngifQ", "WzFd"]:
+        with pytest.raises(ValueError):
+            decode_cursor(token)
+
+
+@pytest.mark.asyncio
+async def test_create_feeds_bulk(async_session: AsyncSession, override_get_db):
+    """Test creating many feeds in one request with per-row errors."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+
+    client = TestClient(app)
+    response = client.post(
+        "/api/feeds/bulk",
+        json=[
+            {"brand_id": brand.id, "name": "Feed 1", "feed_type": "pellet"},
+            {"brand_id": 999, "name": "Orphan", "feed_type": "pellet"},
+            {
+                "brand_id": brand.id,
+                "name": "Feed 2",
+                "feed_type": "pulverized",
+                "density": 1.2,
+                "weight": 40.0,
+                "cost": 19.5,
+            },
+        ],
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["errors"] == [{"index": 1, "detail": "Brand not found"}]
+    assert [feed["name"] for feed in data["created"]] == ["Feed 1", "Feed 2"]
+    assert data["created"][1]["feed_type"] == "pulverized"
+    assert data["created"][1]["cost"] == 19.5
+
+    # Verify in database
+    result = await async_session.execute(select(Feed).order_by(Feed.id))
+    feeds = result.scalars().all()
+    assert [feed.id for feed in feeds] == [feed["id"] for feed in data["created"]]
+    assert feeds[1].feed_type == FeedType.PULVERIZED
+
+
+@pytest.mark.asyncio
+async def test_create_feeds_bulk_empty(override_get_db):
+    """Test a bulk request with no feeds."""
+    client = TestClient(app)
+    response = client.post("/api/feeds/bulk", json=[])
+    assert response.status_code == 200
+    assert response.json() == {"created": [], "errors": []}
+
+
+@pytest.mark.asyncio
+async def test_create_brand_duplicate(async_session: AsyncSession, override_get_db):
+    """Test creating a brand whose name already exists."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+    brand_id = brand.id
+
+    client = TestClient(app)
+    response = client.post("/api/brands", json={"name": "Test Brand"})
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Brand already exists"
+
+    response = client.post(
+        "/api/brands", params={"upsert": True}, json={"name": "Test Brand"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"id": brand_id, "name": "Test Brand", "version": 1}
+    # Resolving an existing name is not a write
+    assert client.get("/api/changes").json()["changes"] == []
+
+    response = client.post(
+        "/api/brands", params={"upsert": True}, json={"name": "New Brand"}
+    )
+    assert response.status_code == 201
+    assert response.json()["id"] != brand_id
+
+
+@pytest.mark.asyncio
+async def test_create_brands_bulk(async_session: AsyncSession, override_get_db):
+    """Test resolving and creating brands in bulk."""
+    existing = Brand(name="Existing")
+    async_session.add(existing)
+    await async_session.commit()
+
+    client = TestClient(app)
+    payload = [{"name": "New 1"}, {"name": "Existing"}, {"name": "New 1"}]
+    response = client.post("/api/brands/bulk", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert [brand["name"] for brand in data] == ["New 1", "Existing"]
+    assert data[1]["id"] == existing.id
+
+    response = client.post(
+        "/api/brands/bulk",
+        params={"on_conflict": "ignore"},
+        json=[{"name": "Existing"}, {"name": "New 2"}, {"name": "New 1"}],
+    )
+    assert response.status_code == 200
+    assert [brand["name"] for brand in response.json()] == ["New 2"]
+
+    result = await async_session.execute(select(Brand.name).order_by(Brand.id))
+    assert result.scalars().all() == ["Existing", "New 1", "New 2"]
+
+
+@pytest.mark.asyncio
+async def test_sparse_fieldsets(async_session: AsyncSession, override_get_db):
+    """Test narrowing feed and brand responses with `fields`."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+    async_session.add_all(
+        [
+            Feed(brand_id=brand.id, name=f"Feed {i}", feed_type=FeedType.PELLET, cost=i)
+            for i in range(3)
+        ]
+    )
+    await async_session.commit()
+
+    client = TestClient(app)
+    response = client.get("/api/feeds", params={"fields": "cost, id"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1, "cost": 0.0},
+        {"id": 2, "cost": 1.0},
+        {"id": 3, "cost": 2.0},
+    ]
+
+    # Pagination still works when the ID is not requested
+    response = client.get("/api/feeds", params={"fields": "name", "limit": 2})
+    assert response.json() == [{"name": "Feed 0"}, {"name": "Feed 1"}]
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    response = client.get("/api/feeds", params={"fields": "name", "after": cursor})
+    assert response.json() == [{"name": "Feed 2"}]
+
+    response = client.get("/api/feeds/1", params={"fields": "name,feed_type"})
+    assert response.status_code == 200
+    assert response.json() == {"name": "Feed 0", "feed_type": "pellet"}
+    assert "etag" in response.headers
+
+    response = client.get("/api/brands", params={"fields": "name"})
+    assert response.json() == [{"name": "Test Brand"}]
+    response = client.get(f"/api/brands/{brand.id}", params={"fields": "id"})
+    assert response.json() == {"id": brand.id}
+
+
+@pytest.mark.asyncio
+async def test_sparse_fieldsets_invalid(override_get_db):
+    """Test rejecting unknown or empty fieldsets."""
+    client = TestClient(app)
+    response = client.get("/api/feeds", params={"fields": "id,secret,nope"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: nope, secret"
+
+    response = client.get("/api/brands", params={"fields": " , "})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No fields requested"
+
+
+@pytest.mark.asyncio
+async def test_get_feeds_by_ids(async_session: AsyncSession, override_get_db):
+    """Test looking up several feeds in requested order."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+    feeds = [
+        Feed(brand_id=brand.id, name=f"Feed {i}", feed_type=FeedType.PELLET)
+        for i in range(3)
+    ]
+    async_session.add_all(feeds)
+    await async_session.commit()
+
+    client = TestClient(app)
+    ids = f"{feeds[2].id},999,{feeds[0].id},{feeds[2].id}"
+    response = client.get("/api/feeds/batch", params={"ids": ids})
+    assert response.status_code == 200
+    data = response.json()
+    assert [entry["id"] for entry in data] == [
+        feeds[2].id,
+        999,
+        feeds[0].id,
+        feeds[2].id,
+    ]
+    assert data[0]["feed"]["name"] == "Feed 2"
+    assert data[1] == {"id": 999, "feed": None, "detail": "Feed not found"}
+    assert data[2]["feed"]["name"] == "Feed 0"
+    assert data[3] == data[0]
+
+    # Found feeds are cached, so a repeat only queries the missing ones
+    response = client.post("/api/feeds/batch", json={"ids": [feeds[1].id, 999]})
+    assert response.status_code == 200
+    assert [entry["feed"] and entry["feed"]["name"] for entry in response.json()] == [
+        "Feed 1",
+        None,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_brands_by_ids(async_session: AsyncSession, override_get_db):
+    """Test looking up several brands in requested order."""
+    brands = [Brand(name="Brand 1"), Brand(name="Brand 2")]
+    async_session.add_all(brands)
+    await async_session.commit()
+
+    client = TestClient(app)
+    response = client.get(
+        "/api/brands/batch", params={"ids": f"{brands[1].id}, 999, {brands[0].id}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [entry["brand"] and entry["brand"]["name"] for entry in data] == [
+        "Brand 2",
+        None,
+        "Brand 1",
+    ]
+    assert data[1]["detail"] == "Brand not found"
+
+    response = client.post("/api/brands/batch", json={"ids": [brands[0].id]})
+    assert response.json()[0]["brand"]["name"] == "Brand 1"
+
+    response = client.get("/api/brands/batch", params={"ids": "1,x"})
+    assert response.status_code == 400
+    response = client.get("/api/brands/batch", params={"ids": ",".join(["1"] * 1001)})
+    assert response.status_code == 400
+    response = client.post("/api/brands/batch", json={"ids": [1] * 1001})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_expand_brand(async_session: AsyncSession, override_get_db):
+    """Test embedding brands in feed responses."""
+    brands = [Brand(name="Brand 1"), Brand(name="Brand 2")]
+    async_session.add_all(brands)
+    await async_session.commit()
+    async_session.add_all(
+        [
+            Feed(brand_id=brands[i % 2].id, name=f"Feed {i}", feed_type=FeedType.PELLET)
+            for i in range(3)
+        ]
+    )
+    await async_session.commit()
+
+    client = TestClient(app)
+    response = client.get("/api/feeds", params={"expand": "brand", "limit": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert [feed["name"] for feed in data] == ["Feed 0", "Feed 1"]
+    assert data[0]["id"] == 1
+    assert data[0]["brand"] == {"id": brands[0].id, "name": "Brand 1", "version": 1}
+    assert data[1]["brand"] == {"id": brands[1].id, "name": "Brand 2", "version": 1}
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    response = client.get(
+        "/api/feeds",
+        params={"expand": "brand", "fields": "name", "after": cursor},
+    )
+    assert response.json() == [
+        {
+            "name": "Feed 2",
+            "brand": {"id": brands[0].id, "name": "Brand 1", "version": 1},
+        }
+    ]
+
+    response = client.get("/api/feeds/2", params={"expand": "brand"})
+    assert response.status_code == 200
+    assert response.json()["brand"] == {
+        "id": brands[1].id,
+        "name": "Brand 2",
+        "version": 1,
+    }
+    assert response.json()["feed_type"] == "pellet"
+    response = client.get("/api/feeds/2", params={"expand": "brand", "fields": "id"})
+    assert response.json() == {
+        "id": 2,
+        "brand": {"id": brands[1].id, "name": "Brand 2", "version": 1},
+    }
+
+    response = client.get("/api/feeds", params={"expand": "owner"})
+    assert response.status_code == 422
+
+    # A feed left without its brand, as foreign keys are not enforced here
+    orphan = Feed(brand_id=999, name="Orphan", feed_type=FeedType.PELLET)
+    async_session.add(orphan)
+    await async_session.commit()
+    response = client.get(f"/api/feeds/{orphan.id}", params={"expand": "brand"})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Brand not found"
+    assert client.get(f"/api/feeds/{orphan.id}").status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_get_brand_feeds(async_session: AsyncSession, override_get_db):
+    """Test paging through the feeds of one brand."""
+    brands = [Brand(name="Brand 1"), Brand(name="Brand 2")]
+    async_session.add_all(brands)
+    await async_session.commit()
+    async_session.add_all(
+        [
+            Feed(brand_id=brands[i % 2].id, name=f"Feed {i}", feed_type=FeedType.PELLET)
+            for i in range(5)
+        ]
+    )
+    await async_session.commit()
+
+    client = TestClient(app)
+    url = f"/api/brands/{brands[0].id}/feeds"
+    response = client.get(url, params={"limit": 2})
+    assert response.status_code == 200
+    assert [feed["name"] for feed in response.json()] == ["Feed 0", "Feed 2"]
+    response = client.get(url, params={"after": response.headers[NEXT_CURSOR_HEADER]})
+    assert [feed["name"] for feed in response.json()] == ["Feed 4"]
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+    response = client.get(
+        f"/api/brands/{brands[1].id}/feeds", params={"expand": "brand"}
+    )
+    assert [feed["brand"]["name"] for feed in response.json()] == ["Brand 2"] * 2
+
+    response = client.get("/api/brands/999/feeds")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_update_feed(async_session: AsyncSession, override_get_db):
+    """Test partial feed updates with If-Match."""
+    client = TestClient(app)
+    brand_id = client.post("/api/brands", json={"name": "Brand"}).json()["id"]
+    feed_id = client.post(
+        "/api/feeds",
+        json={"brand_id": brand_id, "name": "Feed", "feed_type": "pellet", "cost": 5},
+    ).json()["id"]
+    assert client.get(f"/api/feeds/{feed_id}").json()["version"] == 1
+
+    response = client.patch(
+        f"/api/feeds/{feed_id}", json={"cost": 7.5}, headers={"If-Match": '"1"'}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+    data = response.json()
+    assert (data["name"], data["cost"], data["version"]) == ("Feed", 7.5, 2)
+    # The write invalidated the cached feed
+    assert client.get(f"/api/feeds/{feed_id}").json()["cost"] == 7.5
+    result = await async_session.execute(
+        select(FeedPrice.cost).where(FeedPrice.feed_id == feed_id)
+    )
+    assert sorted(result.scalars().all()) == [5.0, 7.5]
+
+    response = client.patch(
+        f"/api/feeds/{feed_id}", json={"name": "Stale"}, headers={"If-Match": '"1"'}
+    )
+    assert response.status_code == 412
+    response = client.patch(f"/api/feeds/{feed_id}", json={"name": "Renamed"})
+    assert response.json()["version"] == 3
+
+    # The ETag of a read, even of some fields, makes a write conditional
+    for url in (f"/api/feeds/{feed_id}", f"/api/feeds/{feed_id}?fields=name"):
+        etag = client.get(url).headers["ETag"]
+        response = client.patch(
+            f"/api/feeds/{feed_id}", json={"cost": 8}, headers={"If-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        response = client.patch(
+            f"/api/feeds/{feed_id}", json={"cost": 9}, headers={"If-Match": etag}
+        )
+        assert response.status_code == 412
+
+    assert client.patch("/api/feeds/999", json={"cost": 1}).status_code == 404
+    response = client.patch(f"/api/feeds/{feed_id}", json={"brand_id": 999})
+    assert response.status_code == 404
+    assert client.patch(f"/api/feeds/{feed_id}", json={}).status_code == 422
+    response = client.patch(f"/api/feeds/{feed_id}", json={"name": None})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_feed_writes_ignore_cached_brands(override_get_db):
+    """Test that feed writes check their brand against the database."""
+    client = TestClient(app)
+    brand_id = client.post("/api/brands", json={"name": "Brand"}).json()["id"]
+    feed_id = client.post(
+        "/api/feeds", json={"brand_id": brand_id, "name": "Feed", "feed_type": "pellet"}
+    ).json()["id"]
+    # Cached by a read, then deleted by another worker
+    brand_cache.set(999, BrandResponse(id=999, name="Gone", version=1))
+
+    response = client.post(
+        "/api/feeds", json={"brand_id": 999, "name": "Orphan", "feed_type": "pellet"}
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Brand not found"
+    response = client.patch(f"/api/feeds/{feed_id}", json={"brand_id": 999})
+    assert response.status_code == 404
+    assert client.get(f"/api/feeds/{feed_id}").json()["brand_id"] == brand_id
+
+
+@pytest.mark.asyncio
+async def test_delete_feed(override_get_db):
+    """Test deleting feeds, which leaves a changefeed tombstone."""
+    client = TestClient(app)
+    brand_id = client.post("/api/brands", json={"name": "Brand"}).json()["id"]
+    feed_id = client.post(
+        "/api/feeds",
+        json={"brand_id": brand_id, "name": "Feed", "feed_type": "pellet"},
+    ).json()["id"]
+    client.get(f"/api/feeds/{feed_id}")
+
+    response = client.delete(f"/api/feeds/{feed_id}", headers={"If-Match": '"2"'})
+    assert response.status_code == 412
+    response = client.delete(f"/api/feeds/{feed_id}", headers={"If-Match": '"1"'})
+    assert response.status_code == 204
+    assert client.get(f"/api/feeds/{feed_id}").status_code == 404
+    assert client.delete(f"/api/feeds/{feed_id}").status_code == 404
+
+    changes = client.get("/api/changes").json()["changes"]
+    assert changes[-1] == {
+        "table": "feeds",
+        "id": feed_id,
+        "deleted": True,
+        "brand": None,
+        "feed": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_update_and_delete_brand(override_get_db):
+    """Test renaming and deleting brands."""
+    client = TestClient(app)
+    brand_id = client.post("/api/brands", json={"name": "Brand"}).json()["id"]
+    client.post("/api/brands", json={"name": "Other"})
+    assert client.get(f"/api/brands/{brand_id}").json()["name"] == "Brand"
+
+    response = client.patch(f"/api/brands/{brand_id}", json={"name": "Renamed"})
+    assert response.status_code == 200
+    assert response.json() == {"id": brand_id, "name": "Renamed", "version": 2}
+    assert client.get(f"/api/brands/{brand_id}").json()["name"] == "Renamed"
+    response = client.patch(f"/api/brands/{brand_id}", json={"name": "Other"})
+    assert response.status_code == 409
+
+    etag = client.get(f"/api/brands/{brand_id}").headers["ETag"]
+    assert etag == '"2"'
+    response = client.patch(
+        f"/api/brands/{brand_id}", json={"name": "Brand"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    response = client.delete(f"/api/brands/{brand_id}", headers={"If-Match": etag})
+    assert response.status_code == 412
+
+    # A brand with feeds is kept, whatever the database enforces
+    feed_id = client.post(
+        "/api/feeds",
+        json={"brand_id": brand_id, "name": "Feed", "feed_type": "pellet"},
+    ).json()["id"]
+    response = client.delete(f"/api/brands/{brand_id}")
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Brand has feeds"
+    # A stale precondition is reported before the feeds
+    response = client.delete(f"/api/brands/{brand_id}", headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert client.get(f"/api/brands/{brand_id}").status_code == 200
+    assert client.delete(f"/api/feeds/{feed_id}").status_code == 204
+
+    response = client.delete(f"/api/brands/{brand_id}", headers={"If-Match": "*"})
+    assert response.status_code == 204
+    assert client.get(f"/api/brands/{brand_id}").status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_update_feed_prices(override_get_db):
+    """Test setting many feed costs in one request."""
+    client = TestClient(app)
+    brand_id = client.post("/api/brands", json={"name": "Brand"}).json()["id"]
+    created = client.post(
+        "/api/feeds/bulk",
+        json=[
+            {"brand_id": brand_id, "name": f"Feed {i}", "feed_type": "pellet"}
+            for i in range(3)
+        ],
+    ).json()["created"]
+    ids = [feed["id"] for feed in created]
+    client.get(f"/api/feeds/{ids[0]}")
+
+    response = client.patch(
+        "/api/feeds/prices",
+        json=[
+            {"id": ids[0], "cost": 10.0},
+            {"id": 999, "cost": 1.0},
+            {"id": ids[1], "cost": 20.0},
+            {"id": ids[0], "cost": 12.5},
+        ],
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert sorted(data["updated"], key=lambda row: row["id"]) == [
+        {"id": ids[0], "cost": 12.5, "version": 2},
+        {"id": ids[1], "cost": 20.0, "version": 2},
+    ]
+    assert data["errors"] == [{"index": 1, "detail": "Feed not found"}]
+
+    assert client.get(f"/api/feeds/{ids[0]}").json()["cost"] == 12.5
+    assert client.get(f"/api/feeds/{ids[2]}").json()["cost"] is None
+    response = client.patch("/api/feeds/prices", json=[])
+    assert response.json() == {"updated": [], "errors": []}
@@ -0,0 +1,117 @@
+"""
+Tests for the bulk write helpers.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.bulk import (
+    ConflictAction,
+    existing_brand_ids,
+    insert_feeds,
+    upsert_brands,
+)
+from showstock.models import Brand
+from showstock.models.feed import FeedType
+
+
+@pytest.mark.asyncio
+async def test_existing_brand_ids(async_session: AsyncSession):
+    """Test resolving existing brand IDs in one query."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+
+    assert await existing_brand_ids(async_session, [brand.id, 999]) == {brand.id}
+    assert await existing_brand_ids(async_session, []) == set()
+
+
+@pytest.mark.asyncio
+async def test_insert_feeds_returns_ids_in_order(async_session: AsyncSession):
+    """Test that inserted rows come back with IDs in input order."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+
+    rows = [
+        {
+            "brand_id": brand.id,
+            "name": f"Feed {i}",
+            "density": None,
+            "feed_type": FeedType.PELLET,
+            "weight": None,
+            "cost": float(i),
+        }
+        for i in range(25)
+    ]
+    inserted = await insert_feeds(async_session, rows)
+    assert [row["name"] for row in inserted] == [f"Feed {i}" for i in range(25)]
+    assert len({row["id"] for row in inserted}) == 25
+    assert await insert_feeds(async_session, []) == []
+
+
+@pytest.mark.asyncio
+async def test_insert_feeds_uses_copy_on_postgres():
+    """Test that large PostgreSQL batches are loaded with COPY."""
+    driver_connection = MagicMock()
+    driver_connection.copy_records_to_table = AsyncMock()
+    connection = MagicMock()
+    connection.get_raw_connection = AsyncMock(
+        return_value=MagicMock(driver_connection=driver_connection)
+    )
+
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    db.execute = AsyncMock(return_value=MagicMock())
+    db.execute.return_value.scalars.return_value.all.return_value = [7, 8]
+    db.connection = AsyncMock(return_value=connection)
+
+    rows = [
+        {
+            "brand_id": 1,
+            "name": name,
+            "density": None,
+            "feed_type": FeedType.PELLET,
+            "weight": 50.0,
+            "cost": None,
+        }
+        for name in ("Feed 1", "Feed 2")
+    ]
+    with patch("showstock.bulk.COPY_THRESHOLD", 2):
+        inserted = await insert_feeds(db, rows)
+
+    assert [row["id"] for row in inserted] == [7, 8]
+    args, kwargs = driver_connection.copy_records_to_table.call_args
+    assert args == ("feeds",)
+    assert kwargs["columns"][0] == "id"
+    assert kwargs["records"][0] == (7, 1, "Feed 1", None, "PELLET", 50.0, None)
+
+
+@pytest.mark.asyncio
+async def test_upsert_brands(async_session: AsyncSession):
+    """Test resolving brand names to IDs in one statement."""
+    brand = Brand(name="Existing")
+    async_session.add(brand)
+    await async_session.commit()
+
+    rows = await upsert_brands(async_session, ["A", "Existing", "A", "B"])
+    assert [row["name"] for row in rows] == ["A", "Existing", "B"]
+    assert [row["created"] for row in rows] == [True, False, True]
+    assert rows[1]["id"] == brand.id
+
+    rows = await upsert_brands(
+        async_session, ["B", "C"], on_conflict=ConflictAction.IGNORE
+    )
+    assert [row["name"] for row in rows] == ["C"]
+    assert await upsert_brands(async_session, []) == []
+
+
+@pytest.mark.asyncio
+async def test_upsert_brands_unsupported_dialect():
+    """Test that upserts refuse dialects without ON CONFLICT support."""
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "mssql"
+    with pytest.raises(NotImplementedError):
+        await upsert_brands(db, ["A"])
@@ -0,0 +1,209 @@
+"""
+Tests for the catalog cache.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.cache import (
+    MISSING,
+    LRUCache,
+    brand_cache,
+    brand_list_cache,
+    cache_stats,
+    feed_cache,
+    invalidate_brands,
+    invalidate_feeds,
+)
+from showstock.main import app
+from showstock.models import Brand, Feed
+from showstock.models.feed import FeedType
+from showstock.notify import publish_catalog_change
+
+
+class FakeClock:
+    """A manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {
+        "size": 2,
+        "max_size": 2,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_lru_cache_expiry():
+    """Test that entries expire after the TTL."""
+    clock = FakeClock()
+    cache = LRUCache(max_size=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is MISSING
+    assert len(cache) == 0
+
+
+def test_lru_cache_invalidate_and_disable():
+    """Test invalidation and a disabled cache."""
+    cache = LRUCache(max_size=10, ttl=60)
+    cache.set("a", None)
+    assert cache.get("a") is None
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is MISSING
+
+    disabled = LRUCache(max_size=0, ttl=60)
+    disabled.set("a", 1)
+    assert disabled.get("a") is MISSING
+    assert len(disabled) == 0
+
+
+def test_lru_cache_versions():
+    """Test that entries stored at another catalog version miss."""
+    cache = LRUCache(max_size=10, ttl=60)
+    cache.set("a", 1, version=3)
+    assert cache.get("a", 3) == 1
+    assert cache.get("a") == 1
+    assert cache.get("a", 4) is MISSING
+    assert len(cache) == 0
+
+    cache.set("b", 2)
+    assert cache.get("b", 3) is MISSING
+
+
+@pytest.mark.asyncio
+async def test_cached_reads_follow_catalog_version(
+    async_session: AsyncSession, override_get_db
+):
+    """Test that a write from another worker is never served with its ETag."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.flush()
+    feed = Feed(brand_id=brand.id, name="Feed", feed_type=FeedType.PELLET)
+    async_session.add(feed)
+    await async_session.commit()
+    feed_id = feed.id
+
+    client = TestClient(app)
+    response = client.get(f"/api/feeds/{feed_id}")
+    etag = response.headers["ETag"]
+
+    # Written elsewhere: the version moves but this worker's cache is intact
+    feed.name = "Renamed"
+    feed.version += 1
+    await publish_catalog_change(async_session, Feed.__tablename__, [feed_id])
+    await async_session.commit()
+    assert len(feed_cache) == 1
+
+    response = client.get(f"/api/feeds/{feed_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["name"] == "Renamed"
+
+
+def test_invalidation_helpers():
+    """Test the catalog invalidation helpers."""
+    brand_cache.set(1, "brand 1")
+    brand_cache.set(2, "brand 2")
+    brand_list_cache.set((100, None), ([], None))
+    feed_cache.set(1, "feed 1")
+
+    invalidate_brands(1)
+    assert brand_cache.get(1) is MISSING
+    assert brand_cache.get(2) == "brand 2"
+    assert len(brand_list_cache) == 0
+
+    invalidate_feeds(1)
+    assert feed_cache.get(1) is MISSING
+    assert set(cache_stats()) == {"brands", "feeds", "brand_lists"}
+
+
+@pytest.mark.asyncio
+async def test_brand_lookups_are_cached(async_session: AsyncSession, override_get_db):
+    """Test that repeated brand reads are served from the cache."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+
+    client = TestClient(app)
+    hits = brand_cache.hits
+    for _ in range(3):
+        response = client.get(f"/api/brands/{brand.id}")
+        assert response.json()["name"] == "Test Brand"
+    assert brand_cache.hits == hits + 2
+
+    # Creating a feed checks the brand in the database, not the cache
+    hits = brand_cache.hits
+    response = client.post(
+        "/api/feeds",
+        json={"brand_id": brand.id, "name": "Feed", "feed_type": "pellet"},
+    )
+    assert response.status_code == 201
+    assert brand_cache.hits == hits
+
+    feed_id = response.json()["id"]
+    hits = feed_cache.hits
+    client.get(f"/api/feeds/{feed_id}")
+    client.get(f"/api/feeds/{feed_id}")
+    assert feed_cache.hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_brand_list_invalidated_by_writes(
+    async_session: AsyncSession, override_get_db
+):
+    """Test that brand writes invalidate cached brand listings."""
+    client = TestClient(app)
+    hits = brand_list_cache.hits
+    assert client.get("/api/brands").json() == []
+    assert client.get("/api/brands").json() == []
+    assert brand_list_cache.hits == hits + 1
+
+    client.post("/api/brands", json={"name": "Brand 1"})
+    assert [b["name"] for b in client.get("/api/brands").json()] == ["Brand 1"]
+
+    client.post("/api/brands/bulk", json=[{"name": "Brand 2"}])
+    assert len(client.get("/api/brands").json()) == 2
+
+    client.post("/api/brands", params={"upsert": True}, json={"name": "Brand 3"})
+    assert len(client.get("/api/brands").json()) == 3
+
+
+@pytest.mark.asyncio
+async def test_feed_cache_not_shared_with_session(
+    async_session: AsyncSession, override_get_db
+):
+    """Test that cached feeds are detached response models."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+    feed = Feed(brand_id=brand.id, name="Feed", feed_type=FeedType.PELLET)
+    async_session.add(feed)
+    await async_session.commit()
+
+    client = TestClient(app)
+    client.get(f"/api/feeds/{feed.id}")
+    cached = feed_cache.get(feed.id)
+    assert not isinstance(cached, Feed)
+    assert cached.name == "Feed"
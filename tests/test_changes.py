@@ -0,0 +1,88 @@
+"""
+Tests for the catalog changefeed.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.main import app
+from showstock.models import Feed
+from showstock.notify import publish_catalog_change
+
+
+def sync(client, since=None, limit=None):
+    """Read one page of changes, returning (table, id, deleted) entries."""
+    params = {}
+    if since is not None:
+        params["since"] = since
+    if limit is not None:
+        params["limit"] = limit
+    response = client.get("/api/changes", params=params)
+    assert response.status_code == 200
+    page = response.json()
+    entries = [
+        (change["table"], change["id"], change["deleted"]) for change in page["changes"]
+    ]
+    return entries, page
+
+
+@pytest.mark.asyncio
+async def test_changes_paging(override_get_db):
+    """Test paging through changes and resuming from a token."""
+    client = TestClient(app)
+    first = client.post("/api/brands", json={"name": "First"}).json()["id"]
+    second = client.post("/api/brands", json={"name": "Second"}).json()["id"]
+    feed = client.post(
+        "/api/feeds",
+        json={"brand_id": first, "name": "Grower", "feed_type": "pellet"},
+    ).json()["id"]
+
+    entries, page = sync(client, limit=2)
+    assert entries == [("brands", first, False), ("brands", second, False)]
+    assert page["has_more"] is True
+    assert page["changes"][0]["brand"] == {"id": first, "name": "First", "version": 1}
+    entries, page = sync(client, page["next_since"], limit=2)
+    assert entries == [("feeds", feed, False)]
+    assert page["changes"][0]["feed"]["name"] == "Grower"
+    assert page["has_more"] is False
+
+    token = page["next_since"]
+    assert sync(client, token)[0] == []
+    # Writing an existing row moves it to the end of the feed
+    client.patch(f"/api/brands/{first}", json={"name": "First"})
+    client.post("/api/brands?upsert=true", json={"name": "Second"})
+    entries, page = sync(client, token)
+    assert entries == [("brands", first, False)]
+    assert sync(client)[0] == [
+        ("brands", second, False),
+        ("feeds", feed, False),
+        ("brands", first, False),
+    ]
+
+    response = client.get("/api/changes?since=bogus")
+    assert response.status_code == 400
+    response = client.get("/api/changes?limit=0")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_changes_tombstones(async_session: AsyncSession, override_get_db):
+    """Test that deleted rows appear as tombstones."""
+    client = TestClient(app)
+    brand = client.post("/api/brands", json={"name": "Brand"}).json()["id"]
+    feed = client.post(
+        "/api/feeds",
+        json={"brand_id": brand, "name": "Grower", "feed_type": "pellet"},
+    ).json()["id"]
+    _, page = sync(client)
+
+    await async_session.execute(delete(Feed).where(Feed.id == feed))
+    await publish_catalog_change(async_session, Feed.__tablename__, [feed], True)
+    await async_session.commit()
+
+    entries, page = sync(client, page["next_since"])
+    assert entries == [("feeds", feed, True)]
+    assert page["changes"][0]["feed"] is None
+    assert sync(client)[0] == [("brands", brand, False), ("feeds", feed, True)]
@@ -0,0 +1,101 @@
+"""
+Tests for conditional GET support on catalog endpoints.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.etag import etag_matches, get_catalog_versions, make_etag
+from showstock.main import app
+from showstock.models import Brand, Feed
+from showstock.models.feed import FeedType
+from showstock.notify import publish_catalog_change
+
+
+def test_etag_matches():
+    """Test If-None-Match comparison."""
+    etag = make_etag("a", 1)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag != make_etag("a", 2)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+@pytest.mark.asyncio
+async def test_get_catalog_versions(async_session: AsyncSession):
+    """Test reading table versions, defaulting to zero."""
+    assert await get_catalog_versions(async_session, ["brands"]) == {"brands": 0}
+    await publish_catalog_change(async_session, "brands")
+    await async_session.commit()
+    assert await get_catalog_versions(async_session, ["brands", "feeds"]) == {
+        "brands": 1,
+        "feeds": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_brand_list_not_modified(async_session: AsyncSession, override_get_db):
+    """Test conditional requests against the brand list."""
+    client = TestClient(app)
+    client.post("/api/brands", json={"name": "Brand 1"})
+
+    response = client.get("/api/brands")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = client.get("/api/brands", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    # Different query parameters are a different representation
+    response = client.get(
+        "/api/brands", params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    # A write changes the ETag
+    client.post("/api/brands", json={"name": "Brand 2"})
+    response = client.get("/api/brands", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_feed_detail_not_modified(async_session: AsyncSession, override_get_db):
+    """Test conditional requests against feed detail and list endpoints."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+    feed = Feed(brand_id=brand.id, name="Feed", feed_type=FeedType.PELLET)
+    async_session.add(feed)
+    await async_session.commit()
+
+    client = TestClient(app)
+    response = client.get(f"/api/feeds/{feed.id}")
+    etag = response.headers["etag"]
+    response = client.get(f"/api/feeds/{feed.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Each feed and the list have their own ETag
+    response = client.get("/api/feeds", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    # Writes to other feeds leave this feed's ETag alone, as feed writes
+    # leave brand ETags alone
+    brand_etag = client.get(f"/api/brands/{brand.id}").headers["etag"]
+    client.post(
+        "/api/feeds",
+        json={"brand_id": brand.id, "name": "Feed 2", "feed_type": "pellet"},
+    )
+    response = client.get(f"/api/feeds/{feed.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    response = client.get(
+        f"/api/brands/{brand.id}", headers={"If-None-Match": brand_etag}
+    )
+    assert response.status_code == 304
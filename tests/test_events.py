@@ -0,0 +1,130 @@
+"""
+Tests for the server-sent event stream of catalog changes.
+"""
+
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.events import CatalogBroadcaster, TooManySubscribers
+from showstock.main import app
+from showstock.models import Brand, Feed
+from showstock.models.feed import FeedType
+from showstock.notify import publish_catalog_change
+from showstock.pagination import decode_cursor
+
+
+def parse_event(frame):
+    """Split a rendered event into its type, decoded ID and data."""
+    fields = dict(line.split(": ", 1) for line in frame.strip().split("\n"))
+    return fields["event"], decode_cursor(fields["id"]), json.loads(fields["data"])
+
+
+async def next_frame(stream):
+    """Read the next frame of a stream, failing rather than hanging."""
+    return await asyncio.wait_for(anext(stream), 1)
+
+
+async def write_brand(db: AsyncSession, name: str) -> Brand:
+    """Create a brand and record it in the changefeed."""
+    brand = Brand(name=name)
+    db.add(brand)
+    await db.flush()
+    await publish_catalog_change(db, Brand.__tablename__, [brand.id])
+    await db.commit()
+    return brand
+
+
+@pytest.mark.asyncio
+async def test_broadcast_fans_out(async_session: AsyncSession, test_engine):
+    """Test that one changefeed read reaches every subscriber."""
+    await write_brand(async_session, "Before")
+    broadcaster = CatalogBroadcaster(
+        test_engine, poll_interval=0.01, max_subscribers=2, queue_size=10, heartbeat=5
+    )
+    subscriptions = [await broadcaster.subscribe() for _ in range(2)]
+    with pytest.raises(TooManySubscribers):
+        await broadcaster.subscribe()
+    streams = [subscription.stream() for subscription in subscriptions]
+    for stream in streams:
+        event, since, data = parse_event(await next_frame(stream))
+        assert (event, since) == ("ready", 1)
+        assert decode_cursor(data["since"]) == 1
+
+    brand = await write_brand(async_session, "After")
+    feed = Feed(brand_id=brand.id, name="Grower", feed_type=FeedType.PELLET)
+    async_session.add(feed)
+    await async_session.flush()
+    await publish_catalog_change(async_session, Feed.__tablename__, [feed.id])
+    await async_session.commit()
+
+    assert await broadcaster.poll() is False
+    for stream in streams:
+        event, seq, data = parse_event(await next_frame(stream))
+        assert (event, seq) == ("brands", 2)
+        assert data == {
+            "table": "brands",
+            "id": brand.id,
+            "deleted": False,
+            "brand": {"id": brand.id, "name": "After", "version": 1},
+        }
+        event, seq, data = parse_event(await next_frame(stream))
+        assert (event, seq) == ("feeds", 3)
+        assert data["feed"]["feed_type"] == "pellet"
+
+    # Closing a stream frees its slot
+    await streams[0].aclose()
+    assert broadcaster.subscriber_count == 1
+    await broadcaster.subscribe()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_resyncs(async_session: AsyncSession, test_engine):
+    """Test that a subscriber whose queue overflows is told to resync."""
+    broadcaster = CatalogBroadcaster(
+        test_engine, poll_interval=0.01, max_subscribers=2, queue_size=1, heartbeat=5
+    )
+    slow = await broadcaster.subscribe()
+    fast = await broadcaster.subscribe()
+    slow_stream, fast_stream = slow.stream(), fast.stream()
+    await next_frame(slow_stream)
+    await next_frame(fast_stream)
+
+    await write_brand(async_session, "First")
+    await broadcaster.poll()
+    assert parse_event(await next_frame(fast_stream))[:2] == ("brands", 1)
+    await write_brand(async_session, "Second")
+    await broadcaster.poll()
+
+    # The slow subscriber still held the first event and loses both
+    assert broadcaster.subscriber_count == 1
+    event, since, _ = parse_event(await next_frame(slow_stream))
+    assert (event, since) == ("resync", 0)
+    with pytest.raises(StopAsyncIteration):
+        await next_frame(slow_stream)
+    assert parse_event(await next_frame(fast_stream))[:2] == ("brands", 2)
+
+
+@pytest.mark.asyncio
+async def test_heartbeat(test_engine):
+    """Test that idle streams send keepalive comments."""
+    broadcaster = CatalogBroadcaster(
+        test_engine, poll_interval=1, max_subscribers=1, queue_size=1, heartbeat=0.01
+    )
+    stream = (await broadcaster.subscribe()).stream()
+    await next_frame(stream)
+    assert await next_frame(stream) == ": keepalive\n\n"
+    await stream.aclose()
+
+
+def test_event_stream_subscriber_limit():
+    """Test that the event stream refuses subscribers over the limit."""
+    with patch("showstock.main.catalog_events") as mock_events:
+        mock_events.subscribe = AsyncMock(side_effect=TooManySubscribers())
+        response = TestClient(app).get("/events")
+    assert response.status_code == 503
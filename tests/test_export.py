@@ -0,0 +1,110 @@
+"""
+Tests for the feed catalog export.
+"""
+
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.export import ExportFormat, stream_feeds
+from showstock.main import app
+from showstock.models import Brand, Feed
+from showstock.models.feed import FeedType
+
+
+@pytest.fixture
+async def catalog(async_session: AsyncSession):
+    """Create a brand with a few feeds."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+
+    feeds = [
+        Feed(
+            brand_id=brand.id,
+            name="Feed 1",
+            density=1.5,
+            feed_type=FeedType.PELLET,
+            weight=50.0,
+            cost=25.99,
+        ),
+        Feed(brand_id=brand.id, name="Feed, 2", feed_type=FeedType.PULVERIZED),
+        Feed(brand_id=brand.id, name="Feed 3", feed_type=FeedType.PELLET),
+    ]
+    async_session.add_all(feeds)
+    await async_session.commit()
+    return brand, feeds
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(catalog, override_get_db):
+    """Test exporting feeds as newline-delimited JSON."""
+    brand, feeds = catalog
+    client = TestClient(app)
+    response = client.get("/api/feeds/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "feeds.ndjson" in response.headers["content-disposition"]
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == ["Feed 1", "Feed, 2", "Feed 3"]
+    assert rows[0] == {
+        "id": feeds[0].id,
+        "brand_id": brand.id,
+        "name": "Feed 1",
+        "density": 1.5,
+        "feed_type": "pellet",
+        "weight": 50.0,
+        "cost": 25.99,
+    }
+    assert rows[1]["cost"] is None
+    assert "brand_name" not in rows[0]
+
+
+@pytest.mark.asyncio
+async def test_export_csv_with_brand(catalog, override_get_db):
+    """Test exporting feeds as CSV joined with the brand name."""
+    client = TestClient(app)
+    response = client.get(
+        "/api/feeds/export", params={"format": "csv", "include_brand": True}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["name"] for row in rows] == ["Feed 1", "Feed, 2", "Feed 3"]
+    assert rows[0]["feed_type"] == "pellet"
+    assert rows[1]["feed_type"] == "pulverized"
+    assert rows[1]["cost"] == ""
+    assert all(row["brand_name"] == "Test Brand" for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_export_invalid_format(override_get_db):
+    """Test rejecting an unknown export format."""
+    client = TestClient(app)
+    response = client.get("/api/feeds/export", params={"format": "xml"})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_stream_feeds_batches(catalog, async_session: AsyncSession):
+    """Test that the export is produced one bounded batch at a time."""
+    chunks = [
+        chunk
+        async for chunk in stream_feeds(
+            async_session, ExportFormat.NDJSON, batch_size=2
+        )
+    ]
+    assert [len(chunk.splitlines()) for chunk in chunks] == [2, 1]
+
+    chunks = [
+        chunk
+        async for chunk in stream_feeds(async_session, ExportFormat.CSV, batch_size=2)
+    ]
+    assert chunks[0].startswith("id,brand_id,name,")
+    assert [len(chunk.splitlines()) for chunk in chunks] == [1, 2, 1]
@@ -0,0 +1,167 @@
+"""
+Tests for feed consumption forecasting.
+"""
+
+import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.forecast import Granularity, forecast_consumption
+from showstock.main import app
+from showstock.models import Animal, Brand, Feed, RationAssignment, User
+from showstock.models.animal import Species
+from showstock.models.feed import FeedType
+
+START = datetime.date(2024, 3, 1)
+
+
+async def _setup_barn(session: AsyncSession):
+    """Create two owners, a priced and an unpriced feed, and assignments."""
+    owners = [
+        User(given_name="Ada", family_name="Lee"),
+        User(given_name="B", family_name="C"),
+    ]
+    brand = Brand(name="Test Brand")
+    session.add_all(owners + [brand])
+    await session.flush()
+    grower = Feed(
+        brand_id=brand.id,
+        name="Grower",
+        feed_type=FeedType.PELLET,
+        cost=20.0,
+        weight=25.0,
+    )
+    hay = Feed(brand_id=brand.id, name="Hay", feed_type=FeedType.PULVERIZED)
+    animals = [
+        Animal(owner_id=owners[0].id, name="Steer", species=Species.CATTLE),
+        Animal(owner_id=owners[0].id, name="Heifer", species=Species.CATTLE),
+        Animal(owner_id=owners[1].id, name="Wether", species=Species.SHEEP),
+    ]
+    session.add_all([grower, hay] + animals)
+    await session.flush()
+    session.add_all(
+        [
+            # Both cattle on grower from the start, one switching after 3 days
+            RationAssignment(
+                animal_id=animals[0].id,
+                feed_id=grower.id,
+                amount=5.0,
+                start_date=START - datetime.timedelta(days=10),
+            ),
+            RationAssignment(
+                animal_id=animals[1].id,
+                feed_id=grower.id,
+                amount=5.0,
+                start_date=START,
+                end_date=START + datetime.timedelta(days=2),
+            ),
+            RationAssignment(
+                animal_id=animals[1].id,
+                feed_id=hay.id,
+                amount=2.0,
+                start_date=START + datetime.timedelta(days=3),
+            ),
+            RationAssignment(
+                animal_id=animals[2].id,
+                feed_id=grower.id,
+                amount=1.0,
+                start_date=START + datetime.timedelta(days=8),
+            ),
+            # Ended before the range
+            RationAssignment(
+                animal_id=animals[2].id,
+                feed_id=hay.id,
+                amount=9.0,
+                start_date=START - datetime.timedelta(days=5),
+                end_date=START - datetime.timedelta(days=1),
+            ),
+        ]
+    )
+    await session.commit()
+    return owners, grower, hay
+
+
+@pytest.mark.asyncio
+async def test_forecast_consumption(async_session: AsyncSession):
+    """Test daily and weekly consumption and spend."""
+    owners, grower, hay = await _setup_barn(async_session)
+    end = START + datetime.timedelta(days=9)
+
+    forecast = await forecast_consumption(async_session, START, end)
+    assert len(forecast.periods) == 10
+    by_feed = {feed.feed_id: feed for feed in forecast.feeds}
+    assert by_feed[grower.id].amounts == [10.0] * 3 + [5.0] * 5 + [6.0] * 2
+    assert by_feed[grower.id].total_amount == pytest.approx(67.0)
+    # Grower costs 0.8 per kg; hay has no cost
+    assert by_feed[grower.id].total_cost == pytest.approx(53.6)
+    assert by_feed[hay.id].amounts == [0.0] * 3 + [2.0] * 7
+    assert by_feed[hay.id].total_cost is None
+    assert forecast.unpriced_feed_ids == [hay.id]
+    assert forecast.costs[0] == pytest.approx(8.0)
+    assert forecast.total_cost == pytest.approx(53.6)
+
+    weekly = await forecast_consumption(async_session, START, end, Granularity.WEEK)
+    assert weekly.periods == [START, START + datetime.timedelta(days=7)]
+    by_feed = {feed.feed_id: feed for feed in weekly.feeds}
+    assert by_feed[grower.id].amounts == pytest.approx([50.0, 17.0])
+
+    owned = await forecast_consumption(async_session, START, end, owner_id=owners[1].id)
+    assert [feed.feed_id for feed in owned.feeds] == [grower.id]
+    assert owned.feeds[0].total_amount == pytest.approx(2.0)
+
+
+@pytest.mark.asyncio
+async def test_forecast_endpoint(async_session: AsyncSession, override_get_db):
+    """Test creating animals, assigning rations and forecasting over HTTP."""
+    user = User(given_name="Ada", family_name="Lee")
+    brand = Brand(name="Test Brand")
+    async_session.add_all([user, brand])
+    await async_session.flush()
+    feed = Feed(
+        brand_id=brand.id,
+        name="Grower",
+        feed_type=FeedType.PELLET,
+        cost=20.0,
+        weight=25.0,
+    )
+    async_session.add(feed)
+    await async_session.commit()
+
+    client = TestClient(app)
+    response = client.post(
+        "/api/animals",
+        json={"owner_id": user.id, "name": "Steer", "species": "cattle"},
+    )
+    assert response.status_code == 201
+    animal_id = response.json()["id"]
+    assert client.get(f"/api/animals?owner_id={user.id}").json()[0]["id"] == animal_id
+
+    response = client.post(
+        f"/api/animals/{animal_id}/rations",
+        json={"feed_id": feed.id, "amount": 4.0, "start_date": "2024-03-01"},
+    )
+    assert response.status_code == 201
+    assert client.get(f"/api/animals/{animal_id}/rations").json()[0]["amount"] == 4.0
+
+    response = client.get(
+        "/api/forecast/consumption?start=2024-03-01&end=2024-03-14&granularity=week"
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["feeds"][0]["amounts"] == [28.0, 28.0]
+    assert data["total_cost"] == pytest.approx(44.8)
+
+    response = client.get("/api/forecast/consumption?start=2024-03-14&end=2024-03-01")
+    assert response.status_code == 400
+    response = client.post(
+        "/api/animals",
+        json={"owner_id": 999, "name": "Stray", "species": "goat"},
+    )
+    assert response.status_code == 404
+    response = client.post(
+        f"/api/animals/{animal_id}/rations",
+        json={"feed_id": 999, "amount": 1.0, "start_date": "2024-03-01"},
+    )
+    assert response.status_code == 404
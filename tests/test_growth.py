@@ -0,0 +1,123 @@
+"""
+Tests for show animal growth simulation.
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.growth import COEFFICIENTS, simulate_growth
+from showstock.main import app
+from showstock.models import (
+    Animal,
+    Brand,
+    Feed,
+    NutrientProfile,
+    RationAssignment,
+    User,
+)
+from showstock.models.animal import Species
+from showstock.models.feed import FeedType
+
+
+def test_simulate_growth():
+    """Test energy, protein and maximum gain limits across animals."""
+    coefficients = {name: np.zeros(4) for name in COEFFICIENTS}
+    coefficients["gain_energy"] = np.full(4, 10.0)
+    coefficients["gain_protein"] = np.full(4, 0.3)
+    coefficients["max_gain"] = np.full(4, 2.0)
+    energy = np.array([[10.0] * 3, [10.0] * 3, [30.0] * 3, [10.0] * 3])
+    protein = np.array([[1.0] * 3, [1.0] * 3, [1.0] * 3, [0.15] * 3])
+    trajectory = simulate_growth(
+        np.full(4, 100.0), energy, protein, np.array([3, 1, 3, 3]), coefficients
+    )
+    assert trajectory.shape == (4, 4)
+    # Energy-limited, stopped after a day, capped, and protein-limited
+    assert trajectory[0] == pytest.approx([100.0, 101.0, 102.0, 103.0])
+    assert trajectory[1] == pytest.approx([100.0, 101.0, 101.0, 101.0])
+    assert trajectory[2] == pytest.approx([100.0, 102.0, 104.0, 106.0])
+    assert trajectory[3] == pytest.approx([100.0, 100.5, 101.0, 101.5])
+
+
+@pytest.mark.asyncio
+async def test_growth_endpoint(async_session: AsyncSession, override_get_db):
+    """Test projecting a barn toward its shows."""
+    start = datetime.date(2024, 3, 1)
+    user = User(given_name="Ada", family_name="Lee")
+    brand = Brand(name="Test Brand")
+    async_session.add_all([user, brand])
+    await async_session.flush()
+    feed = Feed(brand_id=brand.id, name="Grower", feed_type=FeedType.PELLET)
+    animals = [
+        Animal(
+            owner_id=user.id,
+            name="On Pace",
+            species=Species.CATTLE,
+            weight=300.0,
+            target_weight=312.0,
+            show_date=start + datetime.timedelta(days=10),
+        ),
+        Animal(
+            owner_id=user.id,
+            name="Too Far",
+            species=Species.SHEEP,
+            weight=40.0,
+            target_weight=60.0,
+            show_date=start + datetime.timedelta(days=10),
+        ),
+        Animal(
+            owner_id=user.id,
+            name="Slow",
+            species=Species.CATTLE,
+            weight=300.0,
+            target_weight=380.0,
+            show_date=start + datetime.timedelta(days=40),
+        ),
+        # Not projected without a weight
+        Animal(owner_id=user.id, name="Unweighed", species=Species.GOAT),
+    ]
+    async_session.add_all([feed] + animals)
+    await async_session.flush()
+    async_session.add(
+        NutrientProfile(feed_id=feed.id, crude_protein=14.0, digestible_energy=3.0)
+    )
+    async_session.add_all(
+        [
+            RationAssignment(
+                animal_id=animal.id, feed_id=feed.id, amount=8.0, start_date=start
+            )
+            for animal in animals
+        ]
+    )
+    await async_session.commit()
+
+    client = TestClient(app)
+    response = client.get(f"/api/forecast/growth?owner_id={user.id}&start=2024-03-01")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["unprofiled_feed_ids"] == []
+    growth = {animal["name"]: animal for animal in data["animals"]}
+    assert set(growth) == {"On Pace", "Too Far", "Slow"}
+
+    on_pace = growth["On Pace"]
+    assert len(on_pace["weights"]) == 11
+    assert on_pace["weights"][0] == 300.0
+    # 24 Mcal and 1.12 kg protein a day; energy limits gain to about 1.38 kg
+    assert on_pace["weights"][1] == pytest.approx(301.385, abs=0.01)
+    assert on_pace["status"] == "on_track"
+    assert on_pace["adjustment"] is None
+
+    assert growth["Too Far"]["status"] == "unreachable"
+
+    slow = growth["Slow"]
+    assert len(slow["weights"]) == 41
+    assert slow["status"] == "behind"
+    assert slow["adjustment"]["required_daily_gain"] == pytest.approx(2.0)
+    assert slow["adjustment"]["energy_change"] > 0
+    assert slow["adjustment"]["ration_scale"] > 1
+
+    response = client.get("/api/forecast/growth?owner_id=999")
+    assert response.status_code == 404
@@ -0,0 +1,158 @@
+"""
+Tests for the feed catalog importer.
+"""
+
+import csv
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from unittest.mock import AsyncMock, patch
+
+from showstock.importer import (
+    ImportInterrupted,
+    ImportReject,
+    ImportReport,
+    import_feeds,
+    main,
+    read_catalog,
+)
+from showstock.main import app
+from showstock.models import Brand, Feed
+from showstock.models.feed import FeedType
+
+CATALOG = """Brand,Name,Feed_Type,Density,Weight,Cost
+Acme,Show Pellet,pellet,1.5,50,25.99
+Acme,Show Meal,pulverized,,50,
+Zephyr,Grower,pellet,1.2,40,18.5
+Zephyr,Bad Type,cubes,,,
+,No Brand,pellet,,,
+
+Zephyr,Bad Cost,pellet,,,cheap
+"""
+
+
+def test_read_catalog():
+    """Test parsing catalog rows with their line numbers."""
+    rows = list(read_catalog(io.StringIO(CATALOG)))
+    assert [line for line, _ in rows] == [2, 3, 4, 5, 6, 8]
+    assert rows[0][1]["brand"] == "Acme"
+    assert rows[0][1]["feed_type"] == "pellet"
+
+
+def test_read_catalog_missing_columns():
+    """Test rejecting a catalog without the required columns."""
+    with pytest.raises(ValueError, match="brand, feed_type"):
+        list(read_catalog(io.StringIO("name,cost\nFeed,1\n")))
+    with pytest.raises(ValueError):
+        list(read_catalog(io.StringIO("")))
+
+
+@pytest.mark.asyncio
+async def test_import_feeds(async_session: AsyncSession):
+    """Test loading a catalog in batches with row-level rejects."""
+    async_session.add(Brand(name="Zephyr"))
+    await async_session.commit()
+
+    report = await import_feeds(
+        async_session, read_catalog(io.StringIO(CATALOG)), batch_size=2
+    )
+    assert report.rows_read == 6
+    assert report.feeds_created == 3
+    assert report.brands_resolved == 2
+    assert report.rejected == 3
+    assert [reject.line for reject in report.rejects] == [5, 6, 8]
+    assert report.rejects[0].detail.startswith("feed_type:")
+    assert report.rejects[2].detail.startswith("cost:")
+    assert report.rows_per_second > 0
+
+    result = await async_session.execute(select(Brand.name).order_by(Brand.id))
+    assert result.scalars().all() == ["Zephyr", "Acme"]
+
+    result = await async_session.execute(select(Feed).order_by(Feed.id))
+    feeds = result.scalars().all()
+    assert [feed.name for feed in feeds] == ["Show Pellet", "Show Meal", "Grower"]
+    assert feeds[1].feed_type == FeedType.PULVERIZED
+    assert feeds[1].density is None
+    assert feeds[1].cost is None
+    assert feeds[0].cost == 25.99
+
+
+@pytest.mark.asyncio
+async def test_import_feeds_caps_reported_rejects(async_session: AsyncSession):
+    """Test that the report keeps a bounded number of rejects."""
+    rows = [
+        (line, {"brand": "", "name": "x", "feed_type": "pellet"}) for line in range(5)
+    ]
+    with patch("showstock.importer.MAX_REPORTED_REJECTS", 2):
+        report = await import_feeds(async_session, rows)
+    assert report.rejected == 5
+    assert len(report.rejects) == 2
+
+
+@pytest.mark.asyncio
+async def test_import_feeds_interrupted(async_session: AsyncSession):
+    """Test that a file that cannot be read reports what was already kept."""
+
+    def rows():
+        yield from read_catalog(io.StringIO(CATALOG.split("Zephyr,Bad Type")[0]))
+        raise csv.Error("line contains NUL")
+
+    with pytest.raises(ImportInterrupted, match="line contains NUL") as excinfo:
+        await import_feeds(async_session, rows(), batch_size=2)
+    report = excinfo.value.report
+    assert (report.rows_read, report.feeds_created) == (2, 2)
+    assert "the 2 feeds imported from them were kept" in str(excinfo.value)
+    result = await async_session.execute(select(Feed.name).order_by(Feed.id))
+    assert result.scalars().all() == ["Show Pellet", "Show Meal"]
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint(async_session: AsyncSession, override_get_db):
+    """Test uploading a catalog file."""
+    client = TestClient(app)
+    response = client.post(
+        "/api/feeds/import",
+        files={"file": ("catalog.csv", CATALOG.encode("utf-8-sig"), "text/csv")},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["feeds_created"] == 3
+    assert data["rejected"] == 3
+
+    response = client.post(
+        "/api/feeds/import",
+        files={"file": ("catalog.csv", b"name\nFeed\n", "text/csv")},
+    )
+    assert response.status_code == 400
+    assert "Missing required columns" in response.json()["detail"]
+
+    response = client.post(
+        "/api/feeds/import",
+        files={"file": ("catalog.csv", b"brand,name,feed_type\n\xff\n", "text/csv")},
+    )
+    assert response.status_code == 400
+    assert "decode" in response.json()["detail"]
+
+
+def test_main(tmp_path, capsys):
+    """Test the command-line entry point."""
+    report = ImportReport(
+        rows_read=3,
+        feeds_created=2,
+        brands_resolved=1,
+        rejected=1,
+        elapsed_seconds=0.5,
+        rows_per_second=6.0,
+        rejects=[ImportReject(line=3, detail="feed_type: bad")],
+    )
+    with patch("showstock.importer._import_file", AsyncMock(return_value=report)):
+        assert main(["catalog.csv", "--batch-size", "10"]) == 0
+    captured = capsys.readouterr()
+    assert "created 2 feeds" in captured.out
+    assert "line 3: feed_type: bad" in captured.err
+
+    assert main([str(tmp_path / "missing.csv")]) == 1
+    assert "Import failed" in capsys.readouterr().err
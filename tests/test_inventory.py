@@ -0,0 +1,145 @@
+"""
+Tests for the feed inventory ledger.
+"""
+
+import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.main import app
+from showstock.models import Animal, Brand, Feed, RationAssignment, User
+from showstock.models.animal import Species
+from showstock.models.feed import FeedType
+
+
+@pytest.mark.asyncio
+async def test_inventory_ledger(async_session: AsyncSession, override_get_db):
+    """Test running balances across receipts, usage and adjustments."""
+    user = User(given_name="Ada", family_name="Lee")
+    brand = Brand(name="Test Brand")
+    async_session.add_all([user, brand])
+    await async_session.flush()
+    feed = Feed(brand_id=brand.id, name="Grower", feed_type=FeedType.PELLET)
+    async_session.add(feed)
+    await async_session.commit()
+    # Rejected writes roll back the shared session, expiring these objects
+    user_id, feed_id = user.id, feed.id
+
+    client = TestClient(app)
+    response = client.post("/api/locations", json={"owner_id": user_id, "name": "Barn"})
+    assert response.status_code == 201
+    location_id = response.json()["id"]
+    response = client.post("/api/locations", json={"owner_id": user_id, "name": "Barn"})
+    assert response.status_code == 409
+
+    url = f"/api/locations/{location_id}/inventory"
+    balances = []
+    for kind, quantity in [("receipt", 100.0), ("usage", 30.0), ("adjustment", -5.0)]:
+        response = client.post(
+            url, json={"feed_id": feed_id, "kind": kind, "quantity": quantity}
+        )
+        assert response.status_code == 201
+        balances.append(response.json()["balance"])
+    assert balances == [100.0, 70.0, 65.0]
+
+    response = client.post(
+        url, json={"feed_id": feed_id, "kind": "usage", "quantity": 80.0}
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Only 65 kg in stock"
+    response = client.post(
+        url, json={"feed_id": feed_id, "kind": "usage", "quantity": 0}
+    )
+    assert response.status_code == 422
+    response = client.post(url, json={"feed_id": 999, "kind": "receipt", "quantity": 1})
+    assert response.status_code == 404
+
+    assert client.get(url).json() == [{"feed_id": feed_id, "quantity": 65.0}]
+
+    response = client.get(f"/api/locations/{location_id}/ledger?limit=2")
+    assert [event["quantity"] for event in response.json()] == [100.0, -30.0]
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/api/locations/{location_id}/ledger?after={cursor}")
+    assert [event["balance"] for event in response.json()] == [65.0]
+
+
+@pytest.mark.asyncio
+async def test_days_on_hand(async_session: AsyncSession, override_get_db):
+    """Test combining stock across locations with planned usage."""
+    today = datetime.date(2024, 3, 1)
+    user = User(given_name="Ada", family_name="Lee")
+    brand = Brand(name="Test Brand")
+    async_session.add_all([user, brand])
+    await async_session.flush()
+    feeds = [
+        Feed(brand_id=brand.id, name=name, feed_type=FeedType.PELLET)
+        for name in ("Grower", "Hay", "Spare", "Unstocked")
+    ]
+    animal = Animal(owner_id=user.id, name="Steer", species=Species.CATTLE)
+    async_session.add_all(feeds + [animal])
+    await async_session.flush()
+    grower, hay, spare, unstocked = feeds
+    async_session.add_all(
+        [
+            RationAssignment(
+                animal_id=animal.id, feed_id=grower.id, amount=4.0, start_date=today
+            ),
+            RationAssignment(
+                animal_id=animal.id, feed_id=hay.id, amount=10.0, start_date=today
+            ),
+            RationAssignment(
+                animal_id=animal.id,
+                feed_id=unstocked.id,
+                amount=1.0,
+                start_date=today,
+            ),
+            # Not yet started
+            RationAssignment(
+                animal_id=animal.id,
+                feed_id=spare.id,
+                amount=1.0,
+                start_date=today + datetime.timedelta(days=5),
+            ),
+        ]
+    )
+    await async_session.commit()
+
+    client = TestClient(app)
+    locations = []
+    for name in ("Barn", "Trailer"):
+        response = client.post(
+            "/api/locations", json={"owner_id": user.id, "name": name}
+        )
+        locations.append(response.json()["id"])
+    for location_id, feed_id, quantity in [
+        (locations[0], grower.id, 30.0),
+        (locations[1], grower.id, 12.0),
+        (locations[0], hay.id, 25.0),
+        (locations[1], spare.id, 5.0),
+    ]:
+        client.post(
+            f"/api/locations/{location_id}/inventory",
+            json={"feed_id": feed_id, "kind": "receipt", "quantity": quantity},
+        )
+
+    response = client.get(
+        f"/api/inventory/days-on-hand?owner_id={user.id}&on=2024-03-01"
+    )
+    assert response.status_code == 200
+    summary = [
+        (row["name"], row["quantity"], row["daily_usage"], row["days_on_hand"])
+        for row in response.json()
+    ]
+    assert summary == [
+        ("Unstocked", 0.0, 1.0, 0.0),
+        ("Hay", 25.0, 10.0, 2.5),
+        ("Grower", 42.0, 4.0, 10.5),
+        ("Spare", 5.0, 0.0, None),
+    ]
+    assert response.json()[1]["run_out_date"] == "2024-03-03"
+    assert response.json()[3]["run_out_date"] is None
+
+    response = client.get("/api/inventory/days-on-hand?owner_id=999")
+    assert response.status_code == 404
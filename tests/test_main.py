@@ -1,6 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
 from showstock.main import app, startup_event, shutdown_event
 
@@ -32,17 +32,39 @@ async def test_db_test(override_get_db, test_engine):
 @pytest.mark.asyncio
 async def test_startup_event():
     """Test the startup event."""
-    with patch("showstock.main.init_db") as mock_init_db:
+    with (
+        patch("showstock.main.init_db") as mock_init_db,
+        patch("showstock.main.price_partitions") as mock_partitions,
+        patch("showstock.main.catalog_listener") as mock_listener,
+        patch("showstock.main.catalog_events") as mock_events,
+    ):
+        mock_partitions.start = AsyncMock()
+        mock_listener.start = AsyncMock()
+        mock_events.start = AsyncMock()
         await startup_event()
         mock_init_db.assert_called_once()
+        mock_partitions.start.assert_called_once()
+        mock_listener.start.assert_called_once()
+        mock_events.start.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_shutdown_event():
     """Test the shutdown event."""
-    with patch("showstock.main.close_db") as mock_close_db:
+    with (
+        patch("showstock.main.close_db") as mock_close_db,
+        patch("showstock.main.price_partitions") as mock_partitions,
+        patch("showstock.main.catalog_listener") as mock_listener,
+        patch("showstock.main.catalog_events") as mock_events,
+    ):
+        mock_partitions.stop = AsyncMock()
+        mock_listener.stop = AsyncMock()
+        mock_events.stop = AsyncMock()
         await shutdown_event()
         mock_close_db.assert_called_once()
+        mock_partitions.stop.assert_called_once()
+        mock_listener.stop.assert_called_once()
+        mock_events.stop.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -76,3 +98,10 @@ async def test_db_test_exception():
     result = await db_test(db=mock_session)
     assert result["status"] == "error"
     assert "Test exception" in result["message"]
+
+
+def test_cache_stats():
+    """Test the cache statistics endpoint."""
+    response = client.get("/cache-stats")
+    assert response.status_code == 200
+    assert response.json()["brands"]["hits"] >= 0
@@ -0,0 +1,197 @@
+"""
+Tests for cross-worker catalog cache invalidation.
+"""
+
+import asyncio
+import json
+
+import asyncpg
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.cache import brand_cache, brand_list_cache, feed_cache
+from showstock.main import app
+from showstock.notify import (
+    CATALOG_CHANNEL,
+    CatalogListener,
+    apply_catalog_change,
+    publish_catalog_change,
+    read_catalog_versions,
+)
+
+
+async def wait_for(condition, timeout=2.0):
+    """Wait until a condition holds or fail after a timeout."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_publish_bumps_versions(async_session: AsyncSession, test_engine):
+    """Test that catalog writes bump the table version."""
+    assert await read_catalog_versions(test_engine) == {}
+
+    await publish_catalog_change(async_session, "brands", [1])
+    await publish_catalog_change(async_session, "brands", [2])
+    await publish_catalog_change(async_session, "feeds")
+    await async_session.commit()
+
+    assert await read_catalog_versions(test_engine) == {"brands": 2, "feeds": 1}
+
+
+@pytest.mark.asyncio
+async def test_publish_notifies_on_postgres():
+    """Test that PostgreSQL writes send a NOTIFY with the changed IDs."""
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    # Results carry the last change sequence number handed out
+    db.execute = AsyncMock(return_value=MagicMock(**{"scalar_one.return_value": 2}))
+
+    await publish_catalog_change(db, "feeds", [1, 2])
+    params = db.execute.call_args_list[-1][0][1]
+    assert params["channel"] == CATALOG_CHANNEL
+    assert json.loads(params["payload"]) == {"table": "feeds", "ids": [1, 2]}
+
+    with patch("showstock.notify.MAX_NOTIFY_IDS", 1):
+        await publish_catalog_change(db, "feeds", [1, 2])
+    params = db.execute.call_args_list[-1][0][1]
+    assert json.loads(params["payload"]) == {"table": "feeds", "ids": None}
+
+
+@pytest.mark.asyncio
+async def test_write_endpoints_publish(test_engine, override_get_db):
+    """Test that write endpoints record catalog versions."""
+    client = TestClient(app)
+    brand = client.post("/api/brands", json={"name": "Brand"}).json()
+    client.post("/api/brands/bulk", json=[{"name": "Brand 2"}])
+    client.post(
+        "/api/feeds",
+        json={"brand_id": brand["id"], "name": "Feed", "feed_type": "pellet"},
+    )
+    client.post(
+        "/api/feeds/bulk",
+        json=[{"brand_id": brand["id"], "name": "Feed 2", "feed_type": "pellet"}],
+    )
+
+    versions = await read_catalog_versions(test_engine)
+    assert versions == {"brands": 2, "feeds": 2}
+
+
+def test_apply_catalog_change():
+    """Test invalidating local caches for a change."""
+    brand_cache.set(1, "brand 1")
+    brand_cache.set(2, "brand 2")
+    brand_list_cache.set((100, None), ([], None))
+    feed_cache.set(1, "feed 1")
+    feed_cache.set(2, "feed 2")
+
+    apply_catalog_change("brands", [1])
+    assert len(brand_cache) == 1
+    assert len(brand_list_cache) == 0
+
+    apply_catalog_change("brands")
+    assert len(brand_cache) == 0
+
+    apply_catalog_change("feeds", [2])
+    assert len(feed_cache) == 1
+    apply_catalog_change("feeds")
+    assert len(feed_cache) == 0
+
+    apply_catalog_change("users", [1])
+
+
+@pytest.mark.asyncio
+async def test_listener_polls_versions(test_engine):
+    """Test that the polling fallback invalidates tables whose version moved."""
+    # Versions are fed in directly: polling the in-memory test database would
+    # share its one connection with the writing session
+    versions = {"brands": 1, "feeds": 1}
+    polls = []
+
+    async def read_versions(db_engine):
+        polls.append(dict(versions))
+        return dict(versions)
+
+    listener = CatalogListener(test_engine, poll_interval=0.01)
+    with patch("showstock.notify.read_catalog_versions", read_versions):
+        await listener.start()
+        try:
+            await wait_for(lambda: len(polls) >= 1)
+            feed_cache.set(1, "feed 1")
+            brand_cache.set(1, "brand 1")
+
+            versions["feeds"] = 2
+            await wait_for(lambda: len(feed_cache) == 0)
+            assert len(brand_cache) == 1
+        finally:
+            await listener.stop()
+    await listener.stop()
+
+
+@pytest.mark.asyncio
+async def test_listener_listens_on_postgres():
+    """Test the LISTEN connection lifecycle on PostgreSQL."""
+    termination_callbacks = []
+    connection = MagicMock()
+    connection.add_listener = AsyncMock()
+    connection.add_termination_listener.side_effect = termination_callbacks.append
+    connection.fetchval = AsyncMock()
+    connection.close = AsyncMock()
+
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    engine.url.set.return_value.render_as_string.return_value = "postgresql://db"
+
+    connect = AsyncMock(side_effect=[OSError("refused"), connection, connection])
+    listener = CatalogListener(engine, poll_interval=0.01)
+    with patch("showstock.notify.asyncpg.connect", connect):
+        await listener.start()
+        try:
+            await wait_for(lambda: connection.add_listener.called)
+            channel, callback = connection.add_listener.call_args[0]
+            assert channel == CATALOG_CHANNEL
+
+            feed_cache.set(1, "feed 1")
+            callback(connection, 1, channel, json.dumps({"table": "feeds", "ids": [1]}))
+            assert len(feed_cache) == 0
+            callback(connection, 1, channel, "not json")
+
+            # A dropped connection is closed and re-established
+            await wait_for(lambda: connection.fetchval.called)
+            termination_callbacks[0](connection)
+            await wait_for(lambda: connect.call_count == 3)
+            assert connection.close.called
+        finally:
+            await listener.stop()
+
+
+@pytest.mark.asyncio
+async def test_listener_survives_interface_errors():
+    """Test that a closed connection is replaced rather than ending the task."""
+    broken = MagicMock()
+    broken.add_listener = AsyncMock()
+    broken.fetchval = AsyncMock(side_effect=asyncpg.InterfaceError("closed"))
+    broken.close = AsyncMock(side_effect=asyncpg.InterfaceError("closed"))
+    healthy = MagicMock()
+    healthy.add_listener = AsyncMock()
+    healthy.fetchval = AsyncMock()
+    healthy.close = AsyncMock()
+
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    engine.url.set.return_value.render_as_string.return_value = "postgresql://db"
+
+    connect = AsyncMock(side_effect=[broken, healthy])
+    listener = CatalogListener(engine, poll_interval=0.01)
+    with patch("showstock.notify.asyncpg.connect", connect):
+        await listener.start()
+        try:
+            await wait_for(lambda: healthy.fetchval.called)
+            assert broken.close.called
+        finally:
+            await listener.stop()
@@ -0,0 +1,134 @@
+"""
+Tests for nutrient profiles and the nutrient matrix.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.main import app
+from showstock.models import Brand, Feed, NutrientProfile
+from showstock.models.feed import FeedType
+from showstock.models.nutrition import NUTRIENTS
+from showstock.notify import apply_catalog_change
+from showstock.nutrition import NutrientMatrix, nutrient_matrix
+
+
+def profile_values(value: float) -> list:
+    """Build a full row of nutrient values."""
+    return [value] * len(NUTRIENTS)
+
+
+def test_nutrient_matrix_rows():
+    """Test inserting, replacing, removing and taking rows."""
+    matrix = NutrientMatrix()
+    for feed_id in range(1, 21):
+        matrix.set(feed_id, profile_values(feed_id))
+    assert len(matrix) == 20
+    assert matrix.values.shape == (20, len(NUTRIENTS))
+
+    matrix.set(3, [None] + profile_values(30)[1:])
+    matrix.remove(1)
+    matrix.remove(99)
+    assert len(matrix) == 19
+    assert 1 not in matrix
+    assert sorted(matrix.ids.tolist()) == list(range(2, 21))
+
+    taken = matrix.take([20, 1, 3])
+    assert taken[0].tolist() == profile_values(20)
+    assert np.isnan(taken[1]).all()
+    assert np.isnan(taken[2, 0])
+    assert taken[2, 1] == 30
+
+    assert np.isnan(NutrientMatrix().take([1])).all()
+
+
+@pytest.mark.asyncio
+async def test_nutrient_matrix_load(async_session: AsyncSession):
+    """Test full loads and incremental refreshes of stale feeds."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.flush()
+    feeds = [
+        Feed(brand_id=brand.id, name=f"Feed {i}", feed_type=FeedType.PELLET)
+        for i in range(3)
+    ]
+    async_session.add_all(feeds)
+    await async_session.flush()
+    async_session.add_all(
+        [
+            NutrientProfile(feed_id=feeds[0].id, crude_protein=16.0),
+            NutrientProfile(feed_id=feeds[1].id, crude_protein=18.0, zinc=120.0),
+        ]
+    )
+    await async_session.commit()
+
+    matrix = NutrientMatrix()
+    await matrix.load(async_session)
+    assert len(matrix) == 2
+    assert matrix.take([feeds[1].id])[0, NUTRIENTS.index("zinc")] == 120.0
+
+    async_session.add(NutrientProfile(feed_id=feeds[2].id, crude_protein=12.0))
+    profile = await async_session.get(NutrientProfile, feeds[0].id)
+    await async_session.delete(profile)
+    await async_session.commit()
+
+    # Only the stale feeds are re-read
+    matrix.invalidate([feeds[0].id, feeds[2].id])
+    with patch.object(matrix, "_reload", AsyncMock()) as reload:
+        await matrix.load(async_session)
+    reload.assert_not_called()
+    assert sorted(matrix.ids.tolist()) == [feeds[1].id, feeds[2].id]
+    assert matrix.take([feeds[2].id])[0, 0] == 12.0
+
+    matrix.invalidate()
+    with patch.object(matrix, "_refresh", AsyncMock()) as refresh:
+        await matrix.load(async_session)
+    refresh.assert_not_called()
+    assert len(matrix) == 2
+
+
+def test_apply_catalog_change_marks_profiles_stale():
+    """Test that nutrient profile notifications reach the matrix."""
+    with patch.object(nutrient_matrix, "invalidate") as invalidate:
+        apply_catalog_change(NutrientProfile.__tablename__, [4, 5])
+    invalidate.assert_called_once_with([4, 5])
+
+
+@pytest.mark.asyncio
+async def test_feed_nutrients_endpoints(async_session: AsyncSession, override_get_db):
+    """Test storing and reading a feed's nutrient profile."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.flush()
+    feed = Feed(brand_id=brand.id, name="Feed", feed_type=FeedType.PELLET)
+    async_session.add(feed)
+    await async_session.commit()
+
+    client = TestClient(app)
+    url = f"/api/feeds/{feed.id}/nutrients"
+    assert client.get(url).status_code == 404
+
+    response = client.put(url, json={"crude_protein": 16.0, "calcium": 0.9})
+    assert response.status_code == 200
+    assert response.json()["feed_id"] == feed.id
+    assert response.json()["crude_fat"] is None
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.json()["crude_protein"] == 16.0
+    matrix = await nutrient_matrix.load(async_session)
+    assert matrix.take([feed.id])[0, NUTRIENTS.index("calcium")] == 0.9
+
+    response = client.put(url, json={"crude_protein": 18.0})
+    assert response.status_code == 200
+    assert client.get(url).json()["calcium"] is None
+    matrix = await nutrient_matrix.load(async_session)
+    assert matrix.take([feed.id])[0, 0] == 18.0
+
+    assert client.put(url, json={"crude_protein": -1}).status_code == 422
+    response = client.put("/api/feeds/999/nutrients", json={})
+    assert response.status_code == 404
@@ -0,0 +1,267 @@
+"""
+Tests for feed price history.
+"""
+
+import asyncio
+import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.main import app
+from showstock.models import Brand, Feed, FeedPrice
+from showstock.models.feed import FeedType
+from showstock.prices import (
+    DEFAULT_PARTITION,
+    PricePartitions,
+    TrendGroup,
+    TrendInterval,
+    ensure_price_partitions,
+    month_partitions,
+    partition_statements,
+    price_trend,
+    record_prices,
+)
+
+UTC = datetime.timezone.utc
+
+
+def test_month_partitions():
+    """Test naming and bounding monthly partitions across a year end."""
+    partitions = month_partitions(datetime.date(2024, 11, 15), 3)
+    assert partitions == [
+        ("feed_prices_2024_11", datetime.date(2024, 11, 1), datetime.date(2024, 12, 1)),
+        ("feed_prices_2024_12", datetime.date(2024, 12, 1), datetime.date(2025, 1, 1)),
+        ("feed_prices_2025_01", datetime.date(2025, 1, 1), datetime.date(2025, 2, 1)),
+    ]
+
+
+def test_partition_statements():
+    """Test that a new partition takes over its month from the default one."""
+    create, move, attach = partition_statements(
+        "feed_prices_2024_06", datetime.date(2024, 6, 1), datetime.date(2024, 7, 1)
+    )
+    assert create.startswith("CREATE TABLE feed_prices_2024_06 (LIKE feed_prices")
+    assert f"DELETE FROM {DEFAULT_PARTITION}" in move
+    assert "'2024-06-01 00:00+00' AND recorded_at < '2024-07-01 00:00+00'" in move
+    assert attach == (
+        "ALTER TABLE feed_prices ATTACH PARTITION feed_prices_2024_06 "
+        "FOR VALUES FROM ('2024-06-01 00:00+00') TO ('2024-07-01 00:00+00')"
+    )
+
+
+@pytest.mark.asyncio
+async def test_partitions_checked_on_schedule():
+    """Test that partitions are checked at startup and again every interval."""
+    with patch("showstock.prices.ensure_price_partitions", AsyncMock()) as ensure:
+        partitions = PricePartitions(None, interval=0.01)
+        await partitions.start()
+        assert ensure.await_count == 1
+        await asyncio.sleep(0.05)
+        await partitions.stop()
+    assert ensure.await_count > 2
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_partitions_follow_month_rollover(postgres_engine):
+    """Test that a later month's partition takes the prices the default caught."""
+    async with postgres_engine.begin() as connection:
+        await connection.execute(
+            text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF feed_prices DEFAULT")
+        )
+        brand_id = (
+            await connection.execute(
+                text("INSERT INTO brands (name) VALUES ('Brand') RETURNING id")
+            )
+        ).scalar()
+        feed_id = (
+            await connection.execute(
+                text(
+                    "INSERT INTO feeds (brand_id, name, feed_type) "
+                    "VALUES (:brand_id, 'Feed', 'PELLET') RETURNING id"
+                ),
+                {"brand_id": brand_id},
+            )
+        ).scalar()
+
+    january = datetime.datetime(2024, 1, 15, tzinfo=UTC)
+    with patch("showstock.prices._now", return_value=january):
+        await ensure_price_partitions(postgres_engine)
+    # Recorded past the partitions created in January
+    async with postgres_engine.begin() as connection:
+        await connection.execute(
+            text(
+                "INSERT INTO feed_prices (feed_id, recorded_at, cost) "
+                "VALUES (:feed_id, '2024-06-10 12:00+00', 5)"
+            ),
+            {"feed_id": feed_id},
+        )
+
+    may = datetime.datetime(2024, 5, 20, tzinfo=UTC)
+    with patch("showstock.prices._now", return_value=may):
+        await ensure_price_partitions(postgres_engine)
+    async with postgres_engine.connect() as connection:
+        result = await connection.execute(
+            text("SELECT tableoid::regclass::text, cost FROM feed_prices")
+        )
+        assert result.all() == [("feed_prices_2024_06", 5.0)]
+        result = await connection.execute(
+            text(
+                "SELECT count(*) FROM pg_inherits "
+                "WHERE inhparent = 'feed_prices'::regclass"
+            )
+        )
+        # January to August, and the default
+        assert result.scalar() == 9
+
+
+async def _setup_history(session: AsyncSession):
+    """Create three feeds with prices recorded over two months."""
+    brands = [Brand(name="Brand A"), Brand(name="Brand B")]
+    session.add_all(brands)
+    await session.flush()
+    feeds = [
+        Feed(brand_id=brands[0].id, name="A1", feed_type=FeedType.PELLET, weight=10.0),
+        Feed(brand_id=brands[0].id, name="A2", feed_type=FeedType.PULVERIZED),
+        Feed(brand_id=brands[1].id, name="B1", feed_type=FeedType.PELLET, weight=20.0),
+    ]
+    session.add_all(feeds)
+    await session.flush()
+    a1, a2, b1 = (feed.id for feed in feeds)
+    await record_prices(
+        session, [(a1, 10.0), (a2, 30.0)], datetime.datetime(2024, 1, 5, tzinfo=UTC)
+    )
+    await record_prices(
+        session, [(a1, 20.0), (b1, 40.0)], datetime.datetime(2024, 1, 20, tzinfo=UTC)
+    )
+    await record_prices(
+        session, [(a1, 12.0), (a2, None)], datetime.datetime(2024, 2, 3, tzinfo=UTC)
+    )
+    await session.commit()
+    return brands, feeds
+
+
+@pytest.mark.asyncio
+async def test_price_trend(async_session: AsyncSession):
+    """Test aggregating prices per month and week by brand and feed type."""
+    brands, _ = await _setup_history(async_session)
+    start, end = datetime.date(2024, 1, 1), datetime.date(2024, 2, 29)
+
+    points = await price_trend(async_session, start, end)
+    summary = [
+        (point.period, point.brand_id, point.changes, point.average_cost)
+        for point in points
+    ]
+    assert summary == [
+        (datetime.date(2024, 1, 1), brands[0].id, 3, pytest.approx(20.0)),
+        (datetime.date(2024, 1, 1), brands[1].id, 1, pytest.approx(40.0)),
+        # The cleared cost is not counted
+        (datetime.date(2024, 2, 1), brands[0].id, 1, pytest.approx(12.0)),
+    ]
+    assert points[0].min_cost == 10.0
+    assert points[0].max_cost == 30.0
+    # Only A1 has a weight: 1.0 and 2.0 per unit weight
+    assert points[0].average_cost_per_weight == pytest.approx(1.5)
+
+    points = await price_trend(
+        async_session, start, end, TrendInterval.WEEK, TrendGroup.FEED_TYPE
+    )
+    assert [(point.period, point.feed_type) for point in points] == [
+        # Mondays on or before each price
+        (datetime.date(2024, 1, 1), FeedType.PELLET),
+        (datetime.date(2024, 1, 1), FeedType.PULVERIZED),
+        (datetime.date(2024, 1, 15), FeedType.PELLET),
+        (datetime.date(2024, 1, 29), FeedType.PELLET),
+    ]
+
+    points = await price_trend(async_session, datetime.date(2024, 1, 20), end)
+    assert sum(point.changes for point in points) == 3
+
+
+@pytest.mark.asyncio
+async def test_price_endpoints(async_session: AsyncSession, override_get_db):
+    """Test as-of prices and trends over HTTP."""
+    brands, (a1, a2, b1) = await _setup_history(async_session)
+    client = TestClient(app)
+
+    response = client.get("/api/feeds/prices?at=2024-01-10T00:00:00")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": a1.id, "cost": 10.0},
+        {"id": a2.id, "cost": 30.0},
+        {"id": b1.id, "cost": None},
+    ]
+
+    response = client.get("/api/feeds/prices?at=2024-03-01T00:00:00%2B02:00&limit=2")
+    assert response.json() == [
+        {"id": a1.id, "cost": 12.0},
+        {"id": a2.id, "cost": None},
+    ]
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/api/feeds/prices?at=2024-03-01T00:00:00&after={cursor}")
+    assert response.json() == [{"id": b1.id, "cost": 40.0}]
+
+    response = client.get(
+        f"/api/feeds/prices?at=2024-01-25T00:00:00&brand_id={brands[0].id}"
+    )
+    assert [row["cost"] for row in response.json()] == [20.0, 30.0]
+
+    response = client.get(
+        "/api/prices/trend?start=2024-01-01&end=2024-01-31&group_by=feed_type"
+    )
+    assert response.status_code == 200
+    assert [(point["feed_type"], point["changes"]) for point in response.json()] == [
+        ("pellet", 3),
+        ("pulverized", 1),
+    ]
+    response = client.get("/api/prices/trend?start=2024-02-01&end=2024-01-01")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_create_feed_records_price(async_session: AsyncSession, override_get_db):
+    """Test that created feeds start their price history."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.commit()
+
+    client = TestClient(app)
+    client.post(
+        "/api/feeds",
+        json={"brand_id": brand.id, "name": "Single", "feed_type": "pellet", "cost": 9},
+    )
+    client.post(
+        "/api/feeds/bulk",
+        json=[{"brand_id": brand.id, "name": "Bulk", "feed_type": "pellet"}],
+    )
+    result = await async_session.execute(
+        select(Feed.name, FeedPrice.cost)
+        .join(FeedPrice, FeedPrice.feed_id == Feed.id)
+        .order_by(Feed.id)
+    )
+    assert result.all() == [("Single", 9.0), ("Bulk", None)]
+
+
+@pytest.mark.asyncio
+async def test_record_prices_same_moment(async_session: AsyncSession):
+    """Test that a second cost at the same moment replaces the first."""
+    brand = Brand(name="Brand")
+    async_session.add(brand)
+    await async_session.flush()
+    feed = Feed(brand_id=brand.id, name="Feed", feed_type=FeedType.PELLET)
+    async_session.add(feed)
+    await async_session.flush()
+    at = datetime.datetime(2024, 1, 5, tzinfo=UTC)
+
+    await record_prices(async_session, [(feed.id, 10.0), (feed.id, 11.0)], at)
+    await record_prices(async_session, [(feed.id, 12.0)], at)
+    await async_session.commit()
+
+    result = await async_session.execute(
+        select(FeedPrice.cost).where(FeedPrice.feed_id == feed.id)
+    )
+    assert result.scalars().all() == [12.0]
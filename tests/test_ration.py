@@ -0,0 +1,169 @@
+"""
+Tests for least-cost ration formulation.
+"""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.main import app
+from showstock.models import Brand, Feed, NutrientProfile
+from showstock.models.feed import FeedType
+from showstock.ration import InfeasibleRation, solve_ration
+
+
+def test_solve_ration():
+    """Test picking the cheapest mix that meets nutrient bounds."""
+    costs = np.array([1.0, 3.0, 0.5])
+    # Columns: protein, fat
+    contents = np.array([[0.2, 0.2], [0.4, 0.0], [0.0, 0.5]])
+    amounts = solve_ration(
+        costs,
+        contents,
+        minimums=np.array([1.0, -np.inf]),
+        maximums=np.array([np.inf, 0.6]),
+        max_intake=10.0,
+    )
+    # Protein is cheapest from the first feed but its fat is capped
+    assert amounts == pytest.approx([3.0, 1.0, 0.0])
+
+    with pytest.raises(InfeasibleRation):
+        solve_ration(
+            costs,
+            contents,
+            minimums=np.array([1.0, -np.inf]),
+            maximums=np.array([np.inf, np.inf]),
+            max_intake=2.0,
+        )
+
+
+@pytest.mark.asyncio
+async def test_optimize_ration_endpoint(async_session: AsyncSession, override_get_db):
+    """Test formulating a ration from the catalog."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.flush()
+    feeds = [
+        Feed(
+            brand_id=brand.id,
+            name=name,
+            feed_type=FeedType.PELLET,
+            cost=cost,
+            weight=25.0,
+        )
+        for name, cost in [("Grower", 10.0), ("Booster", 30.0), ("No Profile", 1.0)]
+    ]
+    async_session.add_all(feeds)
+    await async_session.flush()
+    async_session.add_all(
+        [
+            NutrientProfile(feed_id=feeds[0].id, crude_protein=16.0, crude_fat=3.0),
+            NutrientProfile(feed_id=feeds[1].id, crude_protein=40.0, crude_fat=1.0),
+        ]
+    )
+    await async_session.commit()
+
+    client = TestClient(app)
+    request = {
+        "requirements": [{"nutrient": "crude_protein", "minimum": 0.4}],
+        "max_intake": 3.0,
+    }
+    response = client.post("/api/rations/optimize", json=request)
+    assert response.status_code == 200
+    data = response.json()
+    # 2.5 kg of grower supplies 0.4 kg protein for $1.00
+    assert [item["name"] for item in data["items"]] == ["Grower"]
+    assert data["intake"] == pytest.approx(2.5)
+    assert data["cost"] == pytest.approx(1.0)
+    assert data["nutrients"]["crude_protein"] == pytest.approx(0.4)
+
+    # A tighter intake limit needs some of the denser booster
+    response = client.post("/api/rations/optimize", json={**request, "max_intake": 2.0})
+    assert response.status_code == 200
+    assert {item["name"] for item in response.json()["items"]} == {
+        "Grower",
+        "Booster",
+    }
+    assert response.json()["intake"] == pytest.approx(2.0)
+
+    response = client.post("/api/rations/optimize", json={**request, "max_intake": 0.5})
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith("No ration meets the requirements")
+
+    response = client.post(
+        "/api/rations/optimize",
+        json={"requirements": [{"nutrient": "unobtainium"}], "max_intake": 1},
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_evaluate_rations_endpoint(async_session: AsyncSession, override_get_db):
+    """Test computing totals for several rations at once."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.flush()
+    feeds = [
+        Feed(
+            brand_id=brand.id,
+            name="Grower",
+            feed_type=FeedType.PELLET,
+            cost=10.0,
+            weight=25.0,
+            density=0.5,
+        ),
+        Feed(brand_id=brand.id, name="Hay", feed_type=FeedType.PULVERIZED),
+    ]
+    async_session.add_all(feeds)
+    await async_session.flush()
+    async_session.add(
+        NutrientProfile(feed_id=feeds[0].id, crude_protein=16.0, zinc=100.0)
+    )
+    await async_session.commit()
+    grower, hay = feeds[0].id, feeds[1].id
+
+    client = TestClient(app)
+    response = client.post(
+        "/api/rations/evaluate",
+        json={
+            "rations": [
+                {str(grower): 2.0},
+                {str(grower): 1.0, str(hay): 3.0},
+                {str(grower): 1.0, str(hay): 0},
+                {},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    first, second, third, empty = response.json()
+    assert first["cost"] == pytest.approx(0.8)
+    assert first["weight"] == 2.0
+    assert first["volume"] == pytest.approx(4.0)
+    assert first["nutrients"]["crude_protein"] == pytest.approx(0.32)
+    assert first["nutrients"]["zinc"] == pytest.approx(200.0)
+    assert first["nutrients"]["crude_fat"] is None
+
+    # Hay has no cost, density or profile, so those totals are unknown
+    assert second["weight"] == 4.0
+    assert second["cost"] is None
+    assert second["volume"] is None
+    assert second["nutrients"]["crude_protein"] is None
+
+    # Zero amounts are ignored
+    assert third["cost"] == pytest.approx(0.4)
+    assert empty == {
+        "cost": 0.0,
+        "weight": 0.0,
+        "volume": 0.0,
+        "nutrients": {nutrient: 0.0 for nutrient in first["nutrients"]},
+    }
+
+    response = client.post(
+        "/api/rations/evaluate", json={"rations": [{"999": 1.0}, {"998": 2.0}]}
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Unknown feeds: 998, 999"
+
+    response = client.post("/api/rations/evaluate", json={"rations": [{"1": -1}]})
+    assert response.status_code == 422
@@ -0,0 +1,115 @@
+"""
+Tests for name search and autocomplete.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.main import app
+from showstock.models import Brand, Feed
+from showstock.models.feed import FeedType
+from showstock.search import PrefixIndex, SearchKind, _escape_like, search_catalog
+
+
+def test_prefix_index():
+    """Test prefix matching on names and on words within them."""
+    index = PrefixIndex()
+    index.build(
+        [
+            (SearchKind.BRAND, 1, "Purina"),
+            (SearchKind.FEED, 1, "Purina Layer  Pellets"),
+            (SearchKind.FEED, 2, "Layer Crumbles"),
+            (SearchKind.FEED, 3, "Layer Layer"),
+        ]
+    )
+
+    hits = index.search("PUR", 10)
+    assert [(hit.kind, hit.id) for hit in hits] == [
+        (SearchKind.BRAND, 1),
+        (SearchKind.FEED, 1),
+    ]
+    assert hits[1].name == "Purina Layer  Pellets"
+
+    # Each entry appears once, even when several of its words match
+    assert [hit.id for hit in index.search("layer", 10)] == [3, 2, 1]
+    assert [hit.id for hit in index.search("layer  pel", 10)] == [1]
+    assert [hit.id for hit in index.search("layer", 2)] == [3, 2]
+    assert index.search("pur", 10, [SearchKind.FEED])[0].id == 1
+    assert index.search("zzz", 10) == []
+
+
+def test_escape_like():
+    """Test that LIKE wildcards in queries are matched literally."""
+    assert _escape_like("16%_mix\\") == "16\\%\\_mix\\\\"
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint(async_session: AsyncSession, override_get_db):
+    """Test searching feeds and brands through the API."""
+    brand = Brand(name="Purina")
+    async_session.add(brand)
+    await async_session.commit()
+    async_session.add_all(
+        [
+            Feed(brand_id=brand.id, name="Layer Pellets", feed_type=FeedType.PELLET),
+            Feed(brand_id=brand.id, name="Pullet Grower", feed_type=FeedType.PELLET),
+        ]
+    )
+    await async_session.commit()
+
+    client = TestClient(app)
+    response = client.get("/api/search", params={"q": "pu"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"kind": "feed", "id": 2, "name": "Pullet Grower"},
+        {"kind": "brand", "id": brand.id, "name": "Purina"},
+    ]
+    assert "etag" in response.headers
+
+    response = client.get("/api/search", params={"q": "pu", "kind": "brand"})
+    assert [hit["name"] for hit in response.json()] == ["Purina"]
+
+    # Writes through the API bump the catalog version and rebuild the index
+    response = client.post(
+        "/api/feeds",
+        json={"brand_id": brand.id, "name": "Purina Scratch", "feed_type": "pellet"},
+    )
+    assert response.status_code == 201
+    response = client.get("/api/search", params={"q": "scr"})
+    assert [hit["name"] for hit in response.json()] == ["Purina Scratch"]
+
+    assert client.get("/api/search", params={"q": "p"}).status_code == 422
+    # The minimum length applies once whitespace is collapsed
+    assert client.get("/api/search", params={"q": "   "}).status_code == 422
+    assert client.get("/api/search", params={"q": " p "}).status_code == 422
+    response = client.get("/api/search", params={"q": "  PU "})
+    assert [hit["name"] for hit in response.json()] == [
+        "Pullet Grower",
+        "Purina",
+        "Purina Scratch",
+    ]
+    response = client.get("/api/search", params={"q": "pu", "limit": 51})
+    assert response.status_code == 422
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_search_trigram(postgres_engine):
+    """Test pg_trgm search: prefix matches first, then similar words."""
+    async with AsyncSession(postgres_engine) as session:
+        brand = Brand(name="Purina")
+        session.add(brand)
+        await session.flush()
+        session.add_all(
+            [
+                Feed(brand_id=brand.id, name=name, feed_type=FeedType.PELLET)
+                for name in ("Purina Layer Pellets", "Layer Crumbles", "Hay Cubes")
+            ]
+        )
+        await session.commit()
+
+        hits = await search_catalog(session, "layer", 10)
+        assert [hit.name for hit in hits] == ["Layer Crumbles", "Purina Layer Pellets"]
+        hits = await search_catalog(session, "pur", 10, [SearchKind.BRAND])
+        assert [(hit.kind, hit.name) for hit in hits] == [(SearchKind.BRAND, "Purina")]
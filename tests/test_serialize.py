@@ -0,0 +1,59 @@
+"""
+Tests for the lean row serializer.
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from showstock.api import BrandResponse, FeedResponse
+from showstock.main import app
+from showstock.models import Feed
+from showstock.models.feed import FeedType
+from showstock.serialize import RowSerializer
+
+
+def test_row_serializer_matches_response_model():
+    """Test that serialized rows match the response model's JSON."""
+    serializer = RowSerializer(FeedResponse)
+    rows = [
+        (1, 2, "Feed", 1.5, FeedType.PELLET, 50, 25.99, 1),
+        (2, 2, "Feed 2", None, FeedType.PULVERIZED, None, None, 3),
+    ]
+    expected = [
+        FeedResponse.model_validate(dict(zip(serializer.fields, row))).model_dump(
+            mode="json"
+        )
+        for row in rows
+    ]
+    assert json.loads(serializer.dump(rows)) == expected
+    assert serializer.dump([]) == b"[]"
+
+
+def test_row_serializer_fields():
+    """Test serializing a subset of fields."""
+    serializer = RowSerializer(FeedResponse, ["id", "cost"])
+    assert serializer.columns(Feed) == [Feed.id, Feed.cost]
+    assert json.loads(serializer.dump([(1, 2.5)])) == [{"id": 1, "cost": 2.5}]
+
+
+def test_row_serializer_expand():
+    """Test nesting related objects read from trailing columns."""
+    serializer = RowSerializer(FeedResponse, ["name"], [("brand", BrandResponse)])
+    assert serializer.width == 4
+    rows = [("Feed", 2, "Brand", 1, 7)]
+    assert json.loads(serializer.dump(rows)) == [
+        {"name": "Feed", "brand": {"id": 2, "name": "Brand", "version": 1}}
+    ]
+
+
+def test_list_schemas_unchanged():
+    """Test that list endpoints still document their response models."""
+    schema = TestClient(app).get("/openapi.json").json()
+    for path, model in [("/api/feeds", FeedResponse), ("/api/brands", BrandResponse)]:
+        content = schema["paths"][path]["get"]["responses"]["200"]["content"]
+        response_schema = content["application/json"]["schema"]
+        assert response_schema["type"] == "array"
+        assert response_schema["items"] == {
+            "$ref": f"#/components/schemas/{model.__name__}"
+        }
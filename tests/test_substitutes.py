@@ -0,0 +1,126 @@
+"""
+Tests for the nearest-substitute finder.
+"""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from showstock.main import app
+from showstock.models import Brand, Feed, NutrientProfile
+from showstock.models.feed import FeedType
+from showstock.substitutes import _standardize, build_snapshot
+
+
+def brute_force(snapshot, ids, types, raw, feed_id, k):
+    """Find nearest feeds by scanning every point."""
+    vectors = _standardize(raw, snapshot.mean, snapshot.scale)
+    row = np.flatnonzero(ids == feed_id)[0]
+    same = (types == types[row]) & (ids != feed_id)
+    distances = np.linalg.norm(vectors[same] - vectors[row], axis=1)
+    return sorted(zip(distances.tolist(), ids[same].tolist()))[:k]
+
+
+def test_snapshot_nearest_and_updates(monkeypatch):
+    """Test tree queries, before and after incremental updates."""
+    rng = np.random.default_rng(0)
+    ids = np.arange(1, 201)
+    types = rng.integers(0, 2, 200).astype(np.int8)
+    raw = rng.normal(size=(200, 4))
+    raw[5, 1] = np.nan
+    snapshot = build_snapshot(ids, types, raw)
+
+    for feed_id in [1, 6, 150]:
+        assert snapshot.nearest(feed_id, 5) == pytest.approx(
+            brute_force(snapshot, ids, types, raw, feed_id, 5)
+        )
+    assert snapshot.nearest(999, 5) is None
+
+    # Change a point, switch a feed's type, remove one and add another
+    raw = raw.copy()
+    raw[10] = raw[20] + 0.001
+    types = types.copy()
+    types[10] = types[20]
+    types[30] = 1 - types[30]
+    keep = ids != 40
+    ids = np.append(ids[keep], 500)
+    types = np.append(types[keep], types[0])
+    raw = np.vstack([raw[keep], raw[0] * 1.001])
+    updated = snapshot.updated(ids, types, raw)
+    assert len(updated.overlay_ids) == 3
+    assert updated.trees is snapshot.trees
+
+    assert updated.nearest(21, 1)[0][1] == 11
+    assert updated.nearest(40, 5) is None
+    for feed_id in [1, 11, 21, 31, 500]:
+        assert updated.nearest(feed_id, 5) == pytest.approx(
+            brute_force(updated, ids, types, raw, feed_id, 5)
+        )
+
+    # Changing most points rebuilds the trees
+    monkeypatch.setattr("showstock.substitutes.MIN_REBUILD_ROWS", 10)
+    rebuilt = updated.updated(ids, types, raw + 1.0)
+    assert rebuilt.trees is not snapshot.trees
+    assert len(rebuilt.overlay_ids) == 0
+
+
+@pytest.mark.asyncio
+async def test_substitutes_endpoint(async_session: AsyncSession, override_get_db):
+    """Test finding substitutes through the API."""
+    brand = Brand(name="Test Brand")
+    async_session.add(brand)
+    await async_session.flush()
+    feeds = [
+        Feed(
+            brand_id=brand.id,
+            name=name,
+            feed_type=feed_type,
+            cost=20.0,
+            weight=50.0,
+            density=1.0,
+        )
+        for name, feed_type in [
+            ("Layer 16", FeedType.PELLET),
+            ("Layer 17", FeedType.PELLET),
+            ("Grower 22", FeedType.PELLET),
+            ("Layer Mash 16", FeedType.PULVERIZED),
+            ("Unprofiled", FeedType.PELLET),
+        ]
+    ]
+    async_session.add_all(feeds)
+    await async_session.flush()
+    async_session.add_all(
+        [
+            NutrientProfile(feed_id=feeds[0].id, crude_protein=16.0, calcium=4.0),
+            NutrientProfile(feed_id=feeds[1].id, crude_protein=17.0, calcium=4.0),
+            NutrientProfile(feed_id=feeds[2].id, crude_protein=22.0, calcium=1.0),
+            NutrientProfile(feed_id=feeds[3].id, crude_protein=16.0, calcium=4.0),
+        ]
+    )
+    await async_session.commit()
+
+    client = TestClient(app)
+    response = client.get(f"/api/feeds/{feeds[0].id}/substitutes")
+    assert response.status_code == 200
+    data = response.json()
+    assert [feed["name"] for feed in data] == ["Layer 17", "Grower 22"]
+    assert data[0]["distance"] < data[1]["distance"]
+    assert data[0]["feed_type"] == "pellet"
+
+    response = client.get(f"/api/feeds/{feeds[0].id}/substitutes", params={"k": 1})
+    assert [feed["name"] for feed in response.json()] == ["Layer 17"]
+
+    # A profile written through the API is picked up incrementally
+    response = client.put(
+        f"/api/feeds/{feeds[2].id}/nutrients",
+        json={"crude_protein": 16.0, "calcium": 4.0},
+    )
+    assert response.status_code == 200
+    response = client.get(f"/api/feeds/{feeds[0].id}/substitutes")
+    assert response.json()[0]["name"] == "Grower 22"
+
+    response = client.get(f"/api/feeds/{feeds[4].id}/substitutes")
+    assert response.status_code == 404
+    response = client.get(f"/api/feeds/{feeds[0].id}/substitutes", params={"k": 0})
+    assert response.status_code == 422
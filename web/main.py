@@ -1,6 +1,8 @@
+import json
 from pathlib import Path
+from typing import Optional
 
-from fastapi import FastAPI, Depends, Request
+from fastapi import FastAPI, Depends, Request, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from showstock.api import get_brands, get_feeds
 from showstock.db import get_db, init_db, close_db
 from showstock.main import app as api_app
-
+from showstock.pagination import NEXT_CURSOR_HEADER
 
 BASE_DIR = Path(__file__).resolve().parent
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
@@ -30,9 +32,25 @@ async def shutdown_event() -> None:
 
 
 @app.get("/", response_class=HTMLResponse)
-async def index(request: Request, db: AsyncSession = Depends(get_db)):
-    brands = await get_brands(db)
-    feeds = await get_feeds(db)
+async def index(
+    request: Request,
+    brands_after: Optional[str] = None,
+    feeds_after: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    # Brands and feeds are paged through the API listings' cursors
+    brand_page, feed_page = Response(), Response()
+    brands = await get_brands(brand_page, after=brands_after, db=db)
+    feeds = await get_feeds(feed_page, after=feeds_after, db=db)
     return templates.TemplateResponse(
-        "index.html", {"request": request, "brands": brands, "feeds": feeds}
+        "index.html",
+        {
+            "request": request,
+            "brands": json.loads(brands.body),
+            "feeds": json.loads(feeds.body),
+            "next_brands": brand_page.headers.get(NEXT_CURSOR_HEADER),
+            "next_feeds": feed_page.headers.get(NEXT_CURSOR_HEADER),
+            "brands_after": brands_after,
+            "feeds_after": feeds_after,
+        },
     )